@@ -0,0 +1,86 @@
+import time
+
+from backend import config, profiling
+
+# aiomysql is only needed when DB_ASYNC=1
+try:
+    import aiomysql
+except ImportError:
+    aiomysql = None
+
+pool = None
+
+
+async def init_pool():
+    global pool
+
+    if aiomysql is None:
+        raise RuntimeError("DB_ASYNC=1 requires the 'aiomysql' package.")
+
+    pool = await aiomysql.create_pool(
+        host=config.DB_CONFIG["host"],
+        port=config.DB_CONFIG["port"],
+        user=config.DB_CONFIG["user"],
+        password=config.DB_CONFIG["password"],
+        db=config.DB_CONFIG["database"],
+        minsize=config.DB_ASYNC_POOL_MIN,
+        maxsize=config.DB_ASYNC_POOL_MAX,
+        pool_recycle=config.DB_POOL_RECYCLE,
+        autocommit=False,
+    )
+
+
+async def close_pool():
+    global pool
+
+    if pool is not None:
+        pool.close()
+        await pool.wait_closed()
+        pool = None
+
+
+async def get_async_db():
+    """FastAPI dependency: async counterpart of backend.db.get_db."""
+    start = time.perf_counter()
+    async with pool.acquire() as conn:
+        profiling.record_acquire(time.perf_counter() - start)
+        try:
+            yield conn
+        finally:
+            # Never hand the next caller a half-finished transaction
+            await conn.rollback()
+
+
+async def fetchone(conn, sql, params=()):
+    with profiling.timed_query(sql) as timing:
+        async with conn.cursor(aiomysql.DictCursor) as cursor:
+            await cursor.execute(sql, params)
+            row = await cursor.fetchone()
+            timing["rows"] = int(row is not None)
+            return row
+
+
+async def fetchall(conn, sql, params=()):
+    with profiling.timed_query(sql) as timing:
+        async with conn.cursor(aiomysql.DictCursor) as cursor:
+            await cursor.execute(sql, params)
+            rows = await cursor.fetchall()
+            timing["rows"] = len(rows)
+            return rows
+
+
+async def execute(conn, sql, params=()):
+    """Run a write statement and return (rowcount, lastrowid)."""
+    with profiling.timed_query(sql) as timing:
+        async with conn.cursor() as cursor:
+            await cursor.execute(sql, params)
+            timing["rows"] = cursor.rowcount
+            return cursor.rowcount, cursor.lastrowid
+
+
+async def executemany(conn, sql, rows):
+    with profiling.timed_query(sql) as timing:
+        async with conn.cursor() as cursor:
+            await cursor.executemany(sql, rows)
+            timing["rows"] = cursor.rowcount
+            return cursor.rowcount
@@ -0,0 +1,245 @@
+"""
+Compare the single-pass /agent/analytics against the old six-query version.
+
+Reports round trips and wall time for both and checks they agree.
+--seed N first creates a synthetic agent with N tickets (removed again
+unless --keep is given).
+
+    python -m backend.benchmarks.agent_analytics --seed 100000
+    python -m backend.benchmarks.agent_analytics --agent someone@agency.com
+"""
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from backend.db import _connect
+from backend.routes.agent import AGENT_SALES_SQL, summarize_agent_sales
+
+AIRLINE = "Bench Analytics Air"
+AIRPLANE = "BENCH-A1"
+AGENT = "bench-agent@example.com"
+AIRPORTS = [("BA1", "Bench City 1"), ("BA2", "Bench City 2"), ("BA3", "Bench City 3"),
+            ("BA4", "Bench City 4"), ("BA5", "Bench City 5"), ("BA6", "Bench City 6")]
+
+
+class CountingCursor:
+    """Counts execute() calls, i.e. round trips."""
+
+    def __init__(self, cursor, counter):
+        self._cursor = cursor
+        self._counter = counter
+
+    def execute(self, *args, **kwargs):
+        self._counter[0] += 1
+        return self._cursor.execute(*args, **kwargs)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def legacy_agent_analytics(cursor, email, now):
+    """The six-query implementation this benchmark replaces."""
+    last_30 = now - timedelta(days=30)
+    last_90 = now - timedelta(days=90)
+    last_year = now - timedelta(days=365)
+
+    cursor.execute("""
+        SELECT COUNT(*) AS tickets_sold,
+               SUM(T.price_charged * 0.10) AS total_commission,
+               AVG(T.price_charged * 0.10) AS avg_commission
+        FROM purchase P JOIN ticket T ON P.ticket_id = T.ticket_id
+        WHERE P.agent_email = %s AND P.purchase_date >= %s
+    """, (email, last_30))
+    summary = cursor.fetchone()
+
+    cursor.execute("""
+        SELECT DATE_FORMAT(P.purchase_date, '%Y-%m') AS month, COUNT(*) AS tickets,
+               SUM(T.price_charged * 0.10) AS commission
+        FROM purchase P JOIN ticket T ON P.ticket_id = T.ticket_id
+        WHERE P.agent_email = %s AND P.purchase_date >= DATE_SUB(CURDATE(), INTERVAL 12 MONTH)
+        GROUP BY month ORDER BY month ASC
+    """, (email,))
+    monthly = cursor.fetchall()
+
+    cursor.execute("""
+        SELECT C.name AS customer_name, COUNT(*) AS ticket_count
+        FROM purchase P JOIN customer C ON P.customer_email = C.email
+        WHERE P.agent_email = %s
+        GROUP BY customer_name ORDER BY ticket_count DESC LIMIT 5
+    """, (email,))
+    top_tickets = cursor.fetchall()
+
+    cursor.execute("""
+        SELECT C.name AS customer_name, SUM(T.price_charged * 0.10) AS commission_earned
+        FROM purchase P JOIN ticket T ON P.ticket_id = T.ticket_id
+        JOIN customer C ON P.customer_email = C.email
+        WHERE P.agent_email = %s
+        GROUP BY customer_name ORDER BY commission_earned DESC LIMIT 5
+    """, (email,))
+    top_commission = cursor.fetchall()
+
+    destinations = []
+    for since in (last_90, last_year):
+        cursor.execute("""
+            SELECT F.arrival_airport AS city, COUNT(*) AS count
+            FROM purchase P JOIN ticket T ON P.ticket_id = T.ticket_id
+            JOIN flight F ON T.flight_num = F.flight_num AND T.airline_name = F.airline_name
+            WHERE P.purchase_date >= %s AND P.agent_email = %s
+            GROUP BY city ORDER BY count DESC LIMIT 5
+        """, (since, email))
+        destinations.append(cursor.fetchall())
+
+    return {
+        "summary": {
+            "tickets_sold": summary["tickets_sold"] or 0,
+            "total_commission": float(summary["total_commission"] or 0),
+            "avg_commission": float(summary["avg_commission"] or 0),
+        },
+        "monthly": monthly,
+        "top_tickets": top_tickets,
+        "top_commission": top_commission,
+        "top_destinations_3m": destinations[0],
+        "top_destinations_year": destinations[1],
+    }
+
+
+def seed(conn, tickets):
+    cursor = conn.cursor()
+    cursor.execute("INSERT IGNORE INTO airline (name) VALUES (%s)", (AIRLINE,))
+    cursor.executemany("INSERT IGNORE INTO airport (name, city) VALUES (%s, %s)", AIRPORTS)
+    cursor.execute("INSERT IGNORE INTO booking_agent (email, password) VALUES (%s, 'x')", (AGENT,))
+    cursor.execute("INSERT IGNORE INTO airplane (airplane_id, airline_name) VALUES (%s, %s)", (AIRPLANE, AIRLINE))
+    cursor.execute(
+        """
+        INSERT IGNORE INTO seat_class (class, airplane_id, airline_name, capacity, price_factor)
+        VALUES ('Economy', %s, %s, 1000000, 1.00)
+        """,
+        (AIRPLANE, AIRLINE)
+    )
+
+    flights = []
+    for i in range(50):
+        dep, arr = random.sample(AIRPORTS, 2)
+        when = datetime.now() + timedelta(days=random.randint(-300, 60))
+        flights.append((f"BA{i:04d}", AIRLINE, AIRPLANE, dep[0], when, arr[0], when + timedelta(hours=3)))
+    cursor.executemany(
+        """
+        INSERT IGNORE INTO flight (flight_num, airline_name, airplane_id, departure_airport,
+                                   departure_time, arrival_airport, arrival_time, status, price)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, 'upcoming', 100)
+        """,
+        flights
+    )
+
+    customers = [(f"bench-cust-{i}@example.com", f"Bench Customer {i}") for i in range(500)]
+    cursor.executemany(
+        "INSERT IGNORE INTO customer (email, name, password) VALUES (%s, %s, 'x')",
+        customers
+    )
+    conn.commit()
+
+    today = date.today()
+    for start in range(0, tickets, 5000):
+        batch = min(5000, tickets - start)
+        rows = [random.choice(flights) for _ in range(batch)]
+
+        cursor.executemany(
+            """
+            INSERT INTO ticket (seat_class, airplane_id, flight_num, airline_name, price_charged)
+            VALUES ('Economy', %s, %s, %s, %s)
+            """,
+            [(AIRPLANE, f[0], AIRLINE, random.randint(50, 2000)) for f in rows]
+        )
+        first_id = cursor.lastrowid
+        cursor.executemany(
+            "INSERT INTO purchase (ticket_id, customer_email, agent_email, purchase_date) VALUES (%s, %s, %s, %s)",
+            [
+                (first_id + i, random.choice(customers)[0], AGENT, today - timedelta(days=random.randint(0, 700)))
+                for i in range(batch)
+            ]
+        )
+        conn.commit()
+
+    cursor.close()
+
+
+def teardown(conn):
+    cursor = conn.cursor()
+    cursor.execute(
+        "DELETE P FROM purchase P JOIN ticket T ON P.ticket_id = T.ticket_id WHERE T.airline_name=%s",
+        (AIRLINE,)
+    )
+    for table in ("ticket", "seat_inventory", "flight", "seat_class", "airplane"):
+        cursor.execute(f"DELETE FROM {table} WHERE airline_name=%s", (AIRLINE,))
+    conn.commit()
+    cursor.close()
+
+
+def timed(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark agent analytics.")
+    parser.add_argument("--agent", default=AGENT)
+    parser.add_argument("--seed", type=int, default=0, help="create a synthetic agent with N tickets")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--keep", action="store_true", help="keep the seeded data")
+    args = parser.parse_args()
+
+    conn = _connect()
+
+    if args.seed:
+        print(f"Seeding {args.seed} tickets for {AGENT}...")
+        seed(conn, args.seed)
+
+    now = datetime.now()
+
+    def run_legacy():
+        counter = [0]
+        cursor = CountingCursor(conn.cursor(dictionary=True, buffered=True), counter)
+        try:
+            return legacy_agent_analytics(cursor, args.agent, now), counter[0]
+        finally:
+            cursor.close()
+
+    def run_single_pass():
+        counter = [0]
+        cursor = CountingCursor(conn.cursor(), counter)
+        try:
+            cursor.execute(AGENT_SALES_SQL, (args.agent,))
+            return summarize_agent_sales(cursor, now), counter[0]
+        finally:
+            cursor.close()
+
+    (legacy, legacy_trips), legacy_time = timed(run_legacy, args.repeat)
+    (single, single_trips), single_time = timed(run_single_pass, args.repeat)
+
+    print(f"agent: {args.agent}")
+    print(f"{'':12} {'round trips':>12} {'best wall time':>16}")
+    print(f"{'six queries':12} {legacy_trips:>12} {legacy_time * 1000:>13.1f} ms")
+    print(f"{'single pass':12} {single_trips:>12} {single_time * 1000:>13.1f} ms")
+
+    same_summary = legacy["summary"]["tickets_sold"] == single["summary"]["tickets_sold"]
+    same_monthly = [(m["month"], m["tickets"]) for m in legacy["monthly"]] == \
+                   [(m["month"], m["tickets"]) for m in single["monthly"]]
+    print(f"results agree: summary={same_summary} monthly={same_monthly}")
+
+    if args.seed and not args.keep:
+        teardown(conn)
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Regression check for the ticket -> flight join key.
+
+Seeds several airlines that reuse the same flight numbers, sells tickets
+to one customer through one agent, then runs the customer/agent flight
+queries with the old flight_num-only join and with the composite
+(airline_name, flight_num) join from backend/queries.py. The old join
+returns one row per airline sharing the number; the new one returns
+exactly one row per ticket.
+
+    python -m backend.benchmarks.composite_join --airlines 8 --tickets 5000
+"""
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from backend.db import _connect
+from backend.routes import agent, customer
+
+PREFIX = "Join Bench Air"
+AIRPLANE = "JB-1"
+CUSTOMER = "join-bench@example.com"
+AGENT = "join-bench-agent@example.com"
+FLIGHTS_PER_AIRLINE = 20
+
+# Queries as they were before the composite-key fix
+OLD_CUSTOMER_SQL = """
+    SELECT F.flight_num, F.airline_name, F.departure_airport, F.arrival_airport,
+           F.departure_time, F.arrival_time, F.status,
+           T.seat_class, T.price_charged, P.purchase_date
+    FROM purchase P
+    JOIN ticket T ON P.ticket_id = T.ticket_id
+    JOIN flight F ON T.flight_num = F.flight_num
+    WHERE P.customer_email = %s
+"""
+
+OLD_AGENT_SQL = """
+    SELECT T.ticket_id, C.name AS customer_name, F.airline_name, F.flight_num,
+           F.departure_airport AS from_airport, F.arrival_airport AS to_airport,
+           F.departure_time, F.arrival_time, T.price_charged
+    FROM purchase P
+    JOIN ticket T ON P.ticket_id = T.ticket_id
+    JOIN flight F ON T.flight_num = F.flight_num
+    JOIN customer C ON P.customer_email = C.email
+    WHERE P.agent_email = %s
+    ORDER BY P.purchase_date DESC
+"""
+
+CASES = [
+    ("customer flights", OLD_CUSTOMER_SQL, customer.DASHBOARD_FLIGHTS_SQL, CUSTOMER),
+    ("agent flights", OLD_AGENT_SQL, agent.FLIGHT_HISTORY_SQL + "ORDER BY P.purchase_date DESC", AGENT),
+]
+
+
+def airline_names(count):
+    return [f"{PREFIX} {i}" for i in range(count)]
+
+
+def setup(conn, airlines, tickets):
+    teardown(conn, airlines)
+    cursor = conn.cursor()
+
+    cursor.execute("INSERT IGNORE INTO airport (name, city) VALUES ('JBA', 'Join A'), ('JBB', 'Join B')")
+    cursor.execute("INSERT IGNORE INTO customer (email, name, password) VALUES (%s, 'Join Bench', 'x')", (CUSTOMER,))
+    cursor.execute("INSERT IGNORE INTO booking_agent (email, password) VALUES (%s, 'x')", (AGENT,))
+
+    flights = []
+    for airline in airline_names(airlines):
+        cursor.execute("INSERT IGNORE INTO airline (name) VALUES (%s)", (airline,))
+        cursor.execute("INSERT INTO airplane (airplane_id, airline_name) VALUES (%s, %s)", (AIRPLANE, airline))
+        cursor.execute(
+            """
+            INSERT INTO seat_class (class, airplane_id, airline_name, capacity, price_factor)
+            VALUES ('Economy', %s, %s, 1000000, 1.00)
+            """,
+            (AIRPLANE, airline)
+        )
+        for n in range(FLIGHTS_PER_AIRLINE):
+            # Same flight numbers in every airline
+            when = datetime.now() + timedelta(days=random.randint(-200, 200))
+            flights.append((f"JB{n:03d}", airline, AIRPLANE, when, when + timedelta(hours=2)))
+
+    cursor.executemany(
+        """
+        INSERT INTO flight (flight_num, airline_name, airplane_id, departure_airport,
+                            departure_time, arrival_airport, arrival_time, status, price)
+        VALUES (%s, %s, %s, 'JBA', %s, 'JBB', %s, 'upcoming', 100)
+        """,
+        flights
+    )
+
+    sold = [random.choice(flights) for _ in range(tickets)]
+    cursor.executemany(
+        """
+        INSERT INTO ticket (seat_class, airplane_id, flight_num, airline_name, price_charged)
+        VALUES ('Economy', %s, %s, %s, 100)
+        """,
+        [(AIRPLANE, f[0], f[1]) for f in sold]
+    )
+    first_id = cursor.lastrowid
+    cursor.executemany(
+        "INSERT INTO purchase (ticket_id, customer_email, agent_email, purchase_date) VALUES (%s, %s, %s, %s)",
+        [(first_id + i, CUSTOMER, AGENT, date.today()) for i in range(tickets)]
+    )
+
+    conn.commit()
+    cursor.close()
+
+
+def teardown(conn, airlines):
+    cursor = conn.cursor()
+    for airline in airline_names(airlines):
+        cursor.execute(
+            "DELETE P FROM purchase P JOIN ticket T ON P.ticket_id = T.ticket_id WHERE T.airline_name=%s",
+            (airline,)
+        )
+        for table in ("ticket", "seat_inventory", "flight", "seat_class", "airplane"):
+            cursor.execute(f"DELETE FROM {table} WHERE airline_name=%s", (airline,))
+    conn.commit()
+    cursor.close()
+
+
+def run(conn, sql, email, repeat):
+    cursor = conn.cursor(dictionary=True)
+    best = None
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            cursor.execute(sql, (email,))
+            rows = cursor.fetchall()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+    finally:
+        cursor.close()
+    return len(rows), best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare flight_num-only and composite-key joins.")
+    parser.add_argument("--airlines", type=int, default=8, help="airlines sharing the same flight numbers")
+    parser.add_argument("--tickets", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--keep", action="store_true", help="keep the seeded data")
+    args = parser.parse_args()
+
+    conn = _connect()
+    setup(conn, args.airlines, args.tickets)
+
+    print(f"{args.airlines} airlines sharing {FLIGHTS_PER_AIRLINE} flight numbers, {args.tickets} tickets")
+    print(f"{'query':18} {'join':10} {'rows':>8} {'best ms':>9}")
+
+    ok = True
+    for label, old_sql, new_sql, email in CASES:
+        for join, sql in (("flight_num", old_sql), ("composite", new_sql)):
+            rows, best = run(conn, sql, email, args.repeat)
+            print(f"{label:18} {join:10} {rows:>8} {best * 1000:>9.1f}")
+            if join == "composite" and rows != args.tickets:
+                ok = False
+
+    print("composite join returns one row per ticket:", ok)
+
+    if not args.keep:
+        teardown(conn, args.airlines)
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""
+Generate a synthetic air_reservation dataset for load testing.
+
+Everything it creates is namespaced ("Load Air N" airlines, "L0001"
+airports, load-*@example.com accounts) so it can live next to real
+data and be removed again with --drop. Seat inventory, the sales
+rollups and flight_search are filled in to match the generated tickets.
+
+    python -m backend.benchmarks.datagen --airlines 20 --airports 200 \\
+        --flights 50000 --tickets 2000000 --customers 100000 --agents 200
+    python -m backend.benchmarks.datagen --drop
+
+Needs a MySQL database with the schema from create_table.sql. The SQL
+in the app is MySQL-specific, so there is no SQLite stand-in.
+"""
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta
+
+import bcrypt
+
+from backend import config, flight_search, rollups
+from backend.db import _connect
+
+AIRLINE_PREFIX = "Load Air"
+AIRPORT_PREFIX = "L"
+EMAIL_PREFIX = "load-"
+PASSWORD = "password"
+
+AIRPLANES_PER_AIRLINE = 5
+SEAT_CLASSES = [("Economy", 150, 1.00), ("Business", 30, 2.50), ("First", 8, 5.00)]
+CLASS_WEIGHTS = [85, 12, 3]
+
+BATCH = 10000
+
+
+def _batched(cursor, sql, rows):
+    for start in range(0, len(rows), BATCH):
+        cursor.executemany(sql, rows[start:start + BATCH])
+
+
+def airline_names(count):
+    return [f"{AIRLINE_PREFIX} {i}" for i in range(count)]
+
+
+def generate(conn, airlines, airports, flights, tickets, customers, agents, seed=None):
+    rng = random.Random(seed)
+    cursor = conn.cursor()
+    today = date.today()
+    password = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(config.BCRYPT_ROUNDS)).decode()
+
+    # 1️⃣ Reference data
+    airline_list = airline_names(airlines)
+    airport_list = [(f"{AIRPORT_PREFIX}{i:04d}", f"Loadville {i}") for i in range(airports)]
+
+    cursor.executemany("INSERT INTO airline (name) VALUES (%s)", [(a,) for a in airline_list])
+    cursor.executemany("INSERT INTO airport (name, city) VALUES (%s, %s)", airport_list)
+
+    planes = [(f"LP-{p}", a) for a in airline_list for p in range(AIRPLANES_PER_AIRLINE)]
+    cursor.executemany("INSERT INTO airplane (airplane_id, airline_name) VALUES (%s, %s)", planes)
+    cursor.executemany(
+        """
+        INSERT INTO seat_class (class, airplane_id, airline_name, capacity, price_factor)
+        VALUES (%s, %s, %s, %s, %s)
+        """,
+        [(c, p, a, cap, factor) for p, a in planes for c, cap, factor in SEAT_CLASSES]
+    )
+
+    # 2️⃣ Accounts
+    customer_list = [f"{EMAIL_PREFIX}customer-{i}@example.com" for i in range(customers)]
+    agent_list = [f"{EMAIL_PREFIX}agent-{i}@example.com" for i in range(agents)]
+
+    _batched(
+        cursor,
+        "INSERT INTO customer (email, name, password) VALUES (%s, %s, %s)",
+        [(email, f"Load Customer {i}", password) for i, email in enumerate(customer_list)]
+    )
+    _batched(cursor, "INSERT INTO booking_agent (email, password) VALUES (%s, %s)",
+             [(email, password) for email in agent_list])
+    cursor.executemany(
+        """
+        INSERT INTO airline_staff (email, password, first_name, last_name, date_of_birth, airline_name, permission)
+        VALUES (%s, %s, 'Load', 'Staff', '1990-01-01', %s, 'both')
+        """,
+        [(f"{EMAIL_PREFIX}staff-{i}@example.com", password, a) for i, a in enumerate(airline_list)]
+    )
+
+    # Each agent works for a few airlines
+    agents_of = {a: [] for a in airline_list}
+    authorizations = []
+    for email in agent_list:
+        for airline in rng.sample(airline_list, min(3, airlines)):
+            agents_of[airline].append(email)
+            authorizations.append((email, airline))
+    cursor.executemany(
+        "INSERT INTO agent_airline_authorization (agent_email, airline_name) VALUES (%s, %s)",
+        authorizations
+    )
+    conn.commit()
+
+    # 3️⃣ Flights
+    flight_list = []
+    now = datetime.now().replace(second=0, microsecond=0)
+    for n in range(flights):
+        airline = airline_list[n % airlines]
+        dep, arr = rng.sample(airport_list, 2)
+        departure = now + timedelta(minutes=rng.randint(-365 * 24 * 60, 180 * 24 * 60))
+        flight_list.append((
+            f"LD{n:06d}", airline, f"LP-{rng.randrange(AIRPLANES_PER_AIRLINE)}",
+            dep[0], departure, arr[0], departure + timedelta(minutes=rng.randint(60, 14 * 60)),
+            rng.choice(["upcoming", "upcoming", "upcoming", "delayed"]),
+            rng.randint(80, 1500),
+        ))
+
+    _batched(
+        cursor,
+        """
+        INSERT INTO flight (flight_num, airline_name, airplane_id, departure_airport, departure_time,
+                            arrival_airport, arrival_time, status, price)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """,
+        flight_list
+    )
+    conn.commit()
+
+    # 4️⃣ Tickets + purchases, never above capacity
+    capacity = {c: cap for c, cap, _ in SEAT_CLASSES}
+    factor = {c: f for c, _, f in SEAT_CLASSES}
+    class_names = [c for c, _, _ in SEAT_CLASSES]
+    sold = {}
+
+    ticket_rows, purchase_meta = [], []
+    max_tickets = flights * sum(capacity.values())
+    if tickets > max_tickets:
+        print(f"Capping tickets at total capacity ({max_tickets}).")
+        tickets = max_tickets
+
+    issued = 0
+    while issued < tickets:
+        flight = flight_list[rng.randrange(flights)]
+        seat_class = rng.choices(class_names, CLASS_WEIGHTS)[0]
+        key = (flight[1], flight[0], seat_class)
+
+        if sold.get(key, 0) >= capacity[seat_class]:
+            seat_class = next((c for c in class_names if sold.get((flight[1], flight[0], c), 0) < capacity[c]), None)
+            if seat_class is None:
+                continue
+            key = (flight[1], flight[0], seat_class)
+
+        sold[key] = sold.get(key, 0) + 1
+        issued += 1
+
+        ticket_rows.append((seat_class, flight[2], flight[0], flight[1], round(flight[8] * factor[seat_class], 2)))
+
+        bought = min(flight[4].date() - timedelta(days=rng.randint(1, 90)), today)
+        agent = rng.choice(agents_of[flight[1]]) if agents_of[flight[1]] and rng.random() < 0.3 else None
+        purchase_meta.append((rng.choice(customer_list), agent, bought))
+
+        if len(ticket_rows) == BATCH or issued == tickets:
+            _insert_sales(cursor, ticket_rows, purchase_meta)
+            conn.commit()
+            ticket_rows, purchase_meta = [], []
+            print(f"  {issued}/{tickets} tickets", end="\r")
+
+    print()
+
+    # 5️⃣ Seat counters, analytics rollups and search rows
+    cursor.executemany(
+        """
+        INSERT INTO seat_inventory (airline_name, flight_num, seat_class, capacity, seats_remaining)
+        VALUES (%s, %s, %s, %s, %s)
+        """,
+        [
+            (f[1], f[0], c, capacity[c], capacity[c] - sold.get((f[1], f[0], c), 0))
+            for f in flight_list for c in class_names
+        ]
+    )
+    conn.commit()
+    cursor.close()
+
+    rollups.rebuild(conn)
+    flight_search.rebuild(conn)
+
+
+def _insert_sales(cursor, ticket_rows, purchase_meta):
+    # The ids of a multi-row INSERT are increasing but not necessarily
+    # consecutive (innodb_autoinc_lock_mode=2), so read them back. Only this
+    # script writes "Load Air" tickets, so those above the previous maximum
+    # are this batch's, in insert order.
+    cursor.execute("SELECT COALESCE(MAX(ticket_id), 0) FROM ticket")
+    (last_id,) = cursor.fetchone()
+
+    cursor.executemany(
+        """
+        INSERT INTO ticket (seat_class, airplane_id, flight_num, airline_name, price_charged)
+        VALUES (%s, %s, %s, %s, %s)
+        """,
+        ticket_rows
+    )
+    cursor.execute(
+        "SELECT ticket_id FROM ticket WHERE ticket_id > %s AND airline_name LIKE %s ORDER BY ticket_id",
+        (last_id, f"{AIRLINE_PREFIX} %")
+    )
+    ticket_ids = [ticket_id for (ticket_id,) in cursor.fetchall()]
+
+    cursor.executemany(
+        "INSERT INTO purchase (ticket_id, customer_email, agent_email, purchase_date) VALUES (%s, %s, %s, %s)",
+        [(ticket_id, c, a, d) for ticket_id, (c, a, d) in zip(ticket_ids, purchase_meta)]
+    )
+
+
+def drop(conn):
+    cursor = conn.cursor()
+    like_airline = f"{AIRLINE_PREFIX} %"
+    like_email = f"{EMAIL_PREFIX}%@example.com"
+
+    cursor.execute(
+        "DELETE P FROM purchase P JOIN ticket T ON P.ticket_id = T.ticket_id WHERE T.airline_name LIKE %s",
+        (like_airline,)
+    )
+    for table in ("sales_agent_daily", "sales_destination_daily", "sales_customer_daily",
+                  "ticket", "seat_inventory", "flight_search", "flight", "seat_class", "airplane",
+                  "agent_airline_authorization", "airline_staff"):
+        cursor.execute(f"DELETE FROM {table} WHERE airline_name LIKE %s", (like_airline,))
+        conn.commit()
+
+    cursor.execute("DELETE FROM airline WHERE name LIKE %s", (like_airline,))
+    cursor.execute("DELETE FROM booking_agent WHERE email LIKE %s", (like_email,))
+    cursor.execute("DELETE FROM customer WHERE email LIKE %s", (like_email,))
+    cursor.execute(
+        "DELETE FROM airport WHERE name LIKE %s AND city LIKE 'Loadville %'",
+        (f"{AIRPORT_PREFIX}%",)
+    )
+    conn.commit()
+    cursor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate (or --drop) a synthetic load-test dataset.")
+    parser.add_argument("--airlines", type=int, default=10)
+    parser.add_argument("--airports", type=int, default=100)
+    parser.add_argument("--flights", type=int, default=10000)
+    parser.add_argument("--tickets", type=int, default=500000)
+    parser.add_argument("--customers", type=int, default=20000)
+    parser.add_argument("--agents", type=int, default=100)
+    parser.add_argument("--seed", type=int, help="random seed, for a reproducible dataset")
+    parser.add_argument("--drop", action="store_true", help="remove the synthetic dataset and exit")
+    args = parser.parse_args()
+
+    conn = _connect()
+    start = time.perf_counter()
+
+    print("Removing previous synthetic data...")
+    drop(conn)
+
+    if not args.drop:
+        print(f"Generating {args.airlines} airlines, {args.airports} airports, {args.flights} flights, "
+              f"{args.tickets} tickets...")
+        generate(conn, args.airlines, args.airports, args.flights, args.tickets,
+                 args.customers, args.agents, args.seed)
+
+    conn.close()
+    print(f"Done in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+Load test for the API against the synthetic dataset from datagen.py.
+
+Concurrent clients replay a weighted mix of requests (flight search,
+ticket purchase, customer dashboard, staff analytics) and the run
+reports throughput and p50/p95/p99 latency per endpoint. By default the
+app is driven in-process through an ASGI transport; --url drives a
+running server over HTTP instead.
+
+    python -m backend.benchmarks.load --concurrency 32 --duration 30
+    python -m backend.benchmarks.load --url http://localhost:8000 --mix search=90,purchase=10
+    python -m backend.benchmarks.load --json run.json --compare baseline.json
+
+With --compare, endpoints whose p95 grew more than --threshold percent
+over the baseline are reported and the exit status is 1.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+
+import httpx
+
+from backend.benchmarks.datagen import AIRLINE_PREFIX, EMAIL_PREFIX
+from backend.db import _connect
+
+DEFAULT_MIX = "search=70,purchase=10,customer_dashboard=15,staff_analytics=5"
+SAMPLE_SIZE = 2000
+
+ROUTES_SQL = """
+    SELECT DISTINCT D.city AS from_city, A.city AS to_city, DATE(F.departure_time) AS day
+    FROM flight F
+    JOIN airport D ON F.departure_airport = D.name
+    JOIN airport A ON F.arrival_airport = A.name
+    WHERE F.airline_name LIKE %s
+      AND F.departure_time > NOW()
+    LIMIT %s
+"""
+
+SEATS_SQL = """
+    SELECT S.airline_name, S.flight_num, S.seat_class
+    FROM seat_inventory S
+    JOIN flight F
+        ON S.airline_name = F.airline_name
+       AND S.flight_num = F.flight_num
+    WHERE S.airline_name LIKE %s
+      AND S.seats_remaining > 0
+      AND F.departure_time > NOW()
+    LIMIT %s
+"""
+
+
+def load_samples(airline_prefix):
+    """Request inputs taken from the database, so every request hits real rows."""
+    conn = _connect()
+    cursor = conn.cursor(dictionary=True)
+    like = f"{airline_prefix}%"
+
+    cursor.execute(ROUTES_SQL, (like, SAMPLE_SIZE))
+    routes = cursor.fetchall()
+    cursor.execute(SEATS_SQL, (like, SAMPLE_SIZE))
+    seats = cursor.fetchall()
+    cursor.execute("SELECT email FROM customer WHERE email LIKE %s LIMIT %s", (f"{EMAIL_PREFIX}%", SAMPLE_SIZE))
+    customers = [row["email"] for row in cursor.fetchall()]
+    cursor.execute("SELECT email FROM airline_staff WHERE airline_name LIKE %s", (like,))
+    staff = [row["email"] for row in cursor.fetchall()]
+
+    cursor.close()
+    conn.close()
+
+    if not (routes and seats and customers and staff):
+        sys.exit("No synthetic data found; run `python -m backend.benchmarks.datagen` first.")
+    return {"routes": routes, "seats": seats, "customers": customers, "staff": staff}
+
+
+# ------------------------------------------
+# Scenarios: (method, url, json body)
+# ------------------------------------------
+
+def search(samples, rng):
+    route = rng.choice(samples["routes"])
+    params = {"from_loc": route["from_city"], "to_loc": route["to_city"], "date": str(route["day"])}
+    return "GET", "/flights/search", params, None
+
+
+def purchase(samples, rng):
+    seat = rng.choice(samples["seats"])
+    return "POST", "/tickets/purchase", None, {**seat, "customer_email": rng.choice(samples["customers"])}
+
+
+def customer_dashboard(samples, rng):
+    return "GET", f"/customer/dashboard/{rng.choice(samples['customers'])}", None, None
+
+
+def staff_analytics(samples, rng):
+    return "GET", f"/staff/analytics/{rng.choice(samples['staff'])}", None, None
+
+
+SCENARIOS = {
+    "search": search,
+    "purchase": purchase,
+    "customer_dashboard": customer_dashboard,
+    "staff_analytics": staff_analytics,
+}
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"unknown scenario {name!r} (choose from {', '.join(SCENARIOS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+# ------------------------------------------
+# Driver
+# ------------------------------------------
+
+async def client_loop(client, samples, mix, deadline, budget, results, seed):
+    rng = random.Random(seed)
+    names, weights = list(mix), list(mix.values())
+
+    while time.perf_counter() < deadline and budget["left"] > 0:
+        budget["left"] -= 1
+        name = rng.choices(names, weights)[0]
+        method, url, params, body = SCENARIOS[name](samples, rng)
+
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, params=params, json=body)
+            status = response.status_code
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        results[name].append((time.perf_counter() - start, status))
+
+
+async def run(app_or_url, samples, mix, concurrency, duration, requests, seed):
+    results = defaultdict(list)
+    budget = {"left": requests or float("inf")}
+    deadline = time.perf_counter() + duration
+
+    if isinstance(app_or_url, str):
+        client = httpx.AsyncClient(base_url=app_or_url, timeout=60)
+    else:
+        transport = httpx.ASGITransport(app=app_or_url)
+        client = httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60)
+
+    async with client:
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            client_loop(client, samples, mix, deadline, budget, results, (seed or 0) + i)
+            for i in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - start
+
+    return results, elapsed
+
+
+async def run_in_process(*args):
+    from backend.main import app
+
+    async with app.router.lifespan_context(app):
+        return await run(app, *args)
+
+
+# ------------------------------------------
+# Report
+# ------------------------------------------
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+def summarize(results, elapsed):
+    report = {}
+    for name, samples in sorted(results.items()):
+        latencies = sorted(t * 1000 for t, _ in samples)
+        statuses = Counter(str(s) for _, s in samples)
+        report[name] = {
+            "requests": len(samples),
+            "rps": round(len(samples) / elapsed, 1),
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            "p99_ms": round(percentile(latencies, 99), 2),
+            "errors": sum(n for s, n in statuses.items() if not s.startswith("2")),
+            "statuses": dict(statuses),
+        }
+    return report
+
+
+def print_report(report, elapsed):
+    total = sum(r["requests"] for r in report.values())
+    print(f"\n{total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s)\n")
+    print(f"{'endpoint':20} {'reqs':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for name, r in report.items():
+        print(f"{name:20} {r['requests']:>7} {r['rps']:>8} {r['p50_ms']:>8} "
+              f"{r['p95_ms']:>8} {r['p99_ms']:>8} {r['errors']:>7}")
+
+
+def compare(report, baseline, threshold):
+    """Endpoints whose p95 is more than `threshold` percent above the baseline."""
+    regressions = []
+    for name, r in report.items():
+        before = baseline.get(name)
+        if not before or not before["p95_ms"]:
+            continue
+        change = (r["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100
+        print(f"  {name:20} p95 {before['p95_ms']:>8} -> {r['p95_ms']:>8} ms ({change:+.0f}%)")
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the API with a weighted request mix.")
+    parser.add_argument("--url", help="drive a running server instead of the app in-process")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument("--requests", type=int, help="stop after this many requests")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX))
+    parser.add_argument("--airline-prefix", default=AIRLINE_PREFIX, help="airlines to sample flights from")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--compare", help="baseline report to compare p95 against")
+    parser.add_argument("--threshold", type=float, default=20, help="allowed p95 growth in percent")
+    args = parser.parse_args()
+
+    samples = load_samples(args.airline_prefix)
+    run_args = (samples, args.mix, args.concurrency, args.duration, args.requests, args.seed)
+
+    if args.url:
+        results, elapsed = asyncio.run(run(args.url, *run_args))
+    else:
+        results, elapsed = asyncio.run(run_in_process(*run_args))
+
+    report = summarize(results, elapsed)
+    print_report(report, elapsed)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {args.compare}:")
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"p95 regressed more than {args.threshold:.0f}%: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Concurrency stress test for the purchase engine.
+
+Creates a throwaway flight with one seat class, fires many parallel
+purchases at it and checks that exactly `capacity` seats were sold.
+Needs a MySQL database with the schema from create_table.sql.
+
+    python -m backend.benchmarks.purchase_stress --capacity 150 --requests 3000 --workers 64
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+
+from backend.db import _connect
+from backend.pool import ConnectionPool
+from backend.purchase import CREATE_INVENTORY_SQL, purchase_seat
+
+AIRLINE = "Stress Test Air"
+AIRPLANE = "STRESS-1"
+FLIGHT = "STRESS-001"
+SEAT_CLASS = "Economy"
+CUSTOMER = "stress@example.com"
+
+
+def setup(conn, capacity):
+    cursor = conn.cursor()
+    teardown(conn)
+
+    cursor.execute("INSERT IGNORE INTO airline (name) VALUES (%s)", (AIRLINE,))
+    cursor.execute("INSERT IGNORE INTO airport (name, city) VALUES ('STA', 'Stress A'), ('STB', 'Stress B')")
+    cursor.execute(
+        "INSERT IGNORE INTO customer (email, name, password) VALUES (%s, 'Stress', 'x')",
+        (CUSTOMER,)
+    )
+    cursor.execute(
+        "INSERT INTO airplane (airplane_id, airline_name) VALUES (%s, %s)",
+        (AIRPLANE, AIRLINE)
+    )
+    cursor.execute(
+        """
+        INSERT INTO seat_class (class, airplane_id, airline_name, capacity, price_factor)
+        VALUES (%s, %s, %s, %s, 1.00)
+        """,
+        (SEAT_CLASS, AIRPLANE, AIRLINE, capacity)
+    )
+    cursor.execute(
+        """
+        INSERT INTO flight (flight_num, airline_name, airplane_id,
+                            departure_airport, departure_time,
+                            arrival_airport, arrival_time, status, price)
+        VALUES (%s, %s, %s, 'STA', NOW() + INTERVAL 30 DAY,
+                'STB', NOW() + INTERVAL 31 DAY, 'upcoming', 100)
+        """,
+        (FLIGHT, AIRLINE, AIRPLANE)
+    )
+    cursor.execute(CREATE_INVENTORY_SQL, (FLIGHT, AIRLINE, AIRPLANE))
+
+    conn.commit()
+    cursor.close()
+
+
+def teardown(conn):
+    cursor = conn.cursor()
+    cursor.execute(
+        "DELETE P FROM purchase P JOIN ticket T ON P.ticket_id = T.ticket_id WHERE T.airline_name=%s",
+        (AIRLINE,)
+    )
+    for table in ("ticket", "seat_inventory", "flight", "seat_class", "airplane"):
+        cursor.execute(f"DELETE FROM {table} WHERE airline_name=%s", (AIRLINE,))
+    conn.commit()
+    cursor.close()
+
+
+def count_sold(conn):
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT COUNT(*) FROM ticket WHERE airline_name=%s AND flight_num=%s AND seat_class=%s",
+        (AIRLINE, FLIGHT, SEAT_CLASS)
+    )
+    sold = cursor.fetchone()[0]
+    cursor.execute(
+        "SELECT seats_remaining FROM seat_inventory WHERE airline_name=%s AND flight_num=%s AND seat_class=%s",
+        (AIRLINE, FLIGHT, SEAT_CLASS)
+    )
+    remaining = cursor.fetchone()[0]
+    cursor.close()
+    return sold, remaining
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--capacity", type=int, default=150)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--workers", type=int, default=64)
+    parser.add_argument("--keep", action="store_true", help="leave the test flight in place")
+    args = parser.parse_args()
+
+    pool = ConnectionPool(_connect, size=args.workers, max_overflow=0, timeout=60)
+
+    with pool.get("stress:setup") as conn:
+        setup(conn, args.capacity)
+
+    outcomes = {"sold": 0, "sold_out": 0, "error": 0}
+
+    def buy(_):
+        with pool.get("stress:purchase") as conn:
+            try:
+                purchase_seat(conn, CUSTOMER, None, AIRLINE, FLIGHT, SEAT_CLASS)
+                return "sold"
+            except HTTPException as e:
+                return "sold_out" if "sold out" in str(e.detail) else "error"
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        for outcome in executor.map(buy, range(args.requests)):
+            outcomes[outcome] += 1
+    elapsed = time.perf_counter() - start
+
+    with pool.get("stress:verify") as conn:
+        sold, remaining = count_sold(conn)
+        if not args.keep:
+            teardown(conn)
+
+    pool.dispose()
+
+    print(f"{args.requests} purchases, {args.workers} workers, {elapsed:.2f}s "
+          f"({args.requests / elapsed:.0f} req/s)")
+    print(f"outcomes: {outcomes}")
+    print(f"tickets in DB: {sold}, capacity: {args.capacity}, seats_remaining: {remaining}")
+
+    assert sold == args.capacity, f"sold {sold} != capacity {args.capacity}"
+    assert outcomes["sold"] == args.capacity, "engine reported a different number of sales"
+    assert remaining == 0, f"seats_remaining is {remaining}, expected 0"
+    print("OK: no oversell")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Serialization cost of a large flight list, before and after FastJSONResponse.
+
+Builds rows shaped like /staff/flights (datetime, Decimal, strings) and
+times the response body three ways:
+
+    before    dict rows (dictionary cursor) -> jsonable_encoder -> JSONResponse
+    after     tuple rows (fetch_rows) -> FastJSONResponse
+    fallback  same as after, with the stdlib json encoder instead of orjson
+
+Also checks that every variant decodes to the same JSON. Needs no database.
+
+    python -m backend.benchmarks.serialization --rows 5000 --repeat 20
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from backend import responses
+from backend.responses import FastJSONResponse, Rows
+
+COLUMNS = (
+    "flight_num", "airline_name", "airplane_id", "departure_airport", "arrival_airport",
+    "departure_time", "arrival_time", "status", "price", "depart_city", "arrive_city",
+)
+
+
+def make_rows(count):
+    start = datetime(2025, 1, 1, 8, 30)
+    rows = []
+    for i in range(count):
+        departure = start + timedelta(minutes=37 * i)
+        rows.append((
+            f"BF{i:05d}", "Bench Air", f"BA-{i % 12}", "JFK", "NRT",
+            departure, departure + timedelta(hours=13, minutes=50), "upcoming",
+            Decimal(f"{300 + i % 900}.{i % 100:02d}"), "New York", "Tokyo",
+        ))
+    return rows
+
+
+def before(rows):
+    # What the dictionary cursor + plain dict return used to do
+    flights = [dict(zip(COLUMNS, row)) for row in rows]
+    return JSONResponse(jsonable_encoder({"count": len(flights), "flights": flights})).body
+
+
+def after(rows):
+    return FastJSONResponse({"count": len(rows), "flights": Rows(COLUMNS, rows)}).body
+
+
+def fallback(rows):
+    with mock.patch.object(responses, "orjson", None):
+        return after(rows)
+
+
+def best_of(fn, rows, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = fn(rows)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time JSON serialization of a large flight list.")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    variants = [("before", before), ("after", after), ("fallback", fallback)]
+    if responses.orjson is None:
+        print("orjson is not installed; 'after' uses the stdlib encoder too.")
+
+    print(f"{args.rows} rows, best of {args.repeat}")
+    print(f"{'variant':10} {'ms':>9} {'KiB':>8} {'speedup':>8}")
+
+    baseline = None
+    decoded = []
+    for name, fn in variants:
+        best, body = best_of(fn, rows, args.repeat)
+        baseline = baseline or best
+        decoded.append(json.loads(body))
+        print(f"{name:10} {best * 1000:>9.1f} {len(body) / 1024:>8.0f} {baseline / best:>7.1f}x")
+
+    print("identical JSON:", all(d == decoded[0] for d in decoded))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Airport departure / arrival boards.
+
+    GET /flights/board/{airport}          one snapshot
+    GET /flights/board/{airport}/stream   Server-Sent Events
+
+A board is every departure and arrival of an airport in a window around
+now, read from flight_search in one statement: departures by its
+primary key (departure_airport, departure_date, ...), arrivals by
+idx_flight_search_arrival. Screens on the same airport and window share
+one cached board for BOARD_CACHE_TTL seconds; live_status is recomputed
+on every read (see flight_status.py).
+
+The stream sends
+
+    event: board     the whole board, on connect and every BOARD_RESYNC seconds
+    event: flight    one flight, as soon as staff change its status
+
+plus a comment line every BOARD_KEEPALIVE seconds so proxies keep the
+connection open. Status changes reach the streams of the worker that
+handled them straight away and every other worker at the next resync.
+"""
+import asyncio
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from backend import config, events, refdata
+from backend.cache import TTLCache
+from backend.db import db_connection
+from backend.flight_status import with_live_status
+from backend.responses import dumps
+
+MAX_HOURS_BEFORE = 24
+MAX_HOURS_AFTER = 48
+STREAM_QUEUE = 100
+
+board_cache = TTLCache("boards", config.BOARD_CACHE_TTL, 1000)
+
+BOARD_COLUMNS = """
+    airline_name, flight_num, departure_airport, arrival_airport,
+    depart_city, arrive_city, departure_time, arrival_time, status
+"""
+
+BOARD_SQL = f"""
+    SELECT 'departure' AS board, {BOARD_COLUMNS}
+    FROM flight_search
+    WHERE departure_airport = %s
+      AND departure_date BETWEEN %s AND %s
+      AND departure_time BETWEEN %s AND %s
+    UNION ALL
+    SELECT 'arrival' AS board, {BOARD_COLUMNS}
+    FROM flight_search
+    WHERE arrival_airport = %s
+      AND arrival_time BETWEEN %s AND %s
+"""
+
+
+def _window(hours_before, hours_after):
+    if not 0 <= hours_before <= MAX_HOURS_BEFORE:
+        raise HTTPException(400, detail=f"hours_before must be between 0 and {MAX_HOURS_BEFORE}.")
+    if not 1 <= hours_after <= MAX_HOURS_AFTER:
+        raise HTTPException(400, detail=f"hours_after must be between 1 and {MAX_HOURS_AFTER}.")
+
+
+def _load_board(conn, airport, hours_before, hours_after):
+    now = datetime.now()
+    start, end = now - timedelta(hours=hours_before), now + timedelta(hours=hours_after)
+
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(BOARD_SQL, (airport, start.date(), end.date(), start, end, airport, start, end))
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+
+    departures = sorted((r for r in rows if r["board"] == "departure"), key=lambda r: r["departure_time"])
+    arrivals = sorted((r for r in rows if r["board"] == "arrival"), key=lambda r: r["arrival_time"])
+    return departures, arrivals
+
+
+def board(conn, airport, hours_before=1, hours_after=12):
+    """{"airport", "generated_at", "departures", "arrivals"}; 404 for an unknown airport."""
+    _window(hours_before, hours_after)
+
+    # Resolve to the stored code, which also keys the cache and the streams
+    codes = {a["name"].casefold(): a["name"] for a in refdata.airports(conn)}
+    airport = codes.get(airport.strip().casefold())
+    if airport is None:
+        raise HTTPException(404, detail="Airport not found.")
+
+    departures, arrivals = board_cache.get_or_load(
+        (airport, hours_before, hours_after),
+        lambda: _load_board(conn, airport, hours_before, hours_after)
+    )
+
+    now = datetime.now()
+    return {
+        "airport": airport,
+        "generated_at": now,
+        "departures": [with_live_status(f, now) for f in departures],
+        "arrivals": [with_live_status(f, now) for f in arrivals],
+    }
+
+
+# ------------------------------------------
+# Push updates
+# ------------------------------------------
+
+class BoardHub:
+    """
+    Open streams per airport. publish() is called from the request thread
+    that committed the change; each stream's queue lives on the event loop
+    that serves it, so messages are handed over with call_soon_threadsafe.
+    """
+
+    def __init__(self):
+        self._streams = defaultdict(set)    # airport -> {(loop, queue)}
+        self._lock = threading.Lock()
+
+    def subscribe(self, airport):
+        queue = asyncio.Queue(STREAM_QUEUE)
+        with self._lock:
+            self._streams[airport].add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, airport, queue):
+        with self._lock:
+            self._streams[airport] = {s for s in self._streams[airport] if s[1] is not queue}
+            if not self._streams[airport]:
+                del self._streams[airport]
+
+    def publish(self, airports, message):
+        with self._lock:
+            streams = [s for airport in airports for s in self._streams.get(airport, ())]
+        for loop, queue in streams:
+            loop.call_soon_threadsafe(_offer, queue, message)
+
+    def count(self):
+        with self._lock:
+            return sum(len(s) for s in self._streams.values())
+
+
+def _offer(queue, message):
+    try:
+        queue.put_nowait(message)
+    except asyncio.QueueFull:
+        # A screen that stopped reading; it catches up at the next resync
+        pass
+
+
+hub = BoardHub()
+
+
+@events.subscribe("flight_status_changed")
+def _on_flight_status_changed(airline_name, flight_num, status, flight):
+    airports = {flight["departure_airport"], flight["arrival_airport"]}
+    board_cache.invalidate_where(lambda key, _: key[0] in airports)
+    hub.publish(airports, with_live_status(flight))
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: ".encode() + dumps(data) + b"\n\n"
+
+
+def _snapshot(airport, hours_before, hours_after, tag):
+    with db_connection(tag) as conn:
+        return board(conn, airport, hours_before, hours_after)
+
+
+async def first_snapshot(airport, hours_before, hours_after, tag):
+    """Board for a new stream; raises (before any bytes are sent) for bad input."""
+    return await run_in_threadpool(_snapshot, airport, hours_before, hours_after, tag)
+
+
+async def board_stream(snapshot, hours_before, hours_after, tag):
+    airport = snapshot["airport"]
+    queue = hub.subscribe(airport)
+    loop = asyncio.get_running_loop()
+
+    try:
+        while True:
+            yield _sse("board", snapshot)
+
+            resync_at = loop.time() + config.BOARD_RESYNC
+            while (remaining := resync_at - loop.time()) > 0:
+                try:
+                    flight = await asyncio.wait_for(queue.get(), min(remaining, config.BOARD_KEEPALIVE))
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                yield _sse("flight", flight)
+
+            snapshot = await run_in_threadpool(_snapshot, airport, hours_before, hours_after, tag)
+
+    finally:
+        hub.unsubscribe(airport, queue)
@@ -0,0 +1,76 @@
+import os
+import secrets
+
+
+def _env_int(name, default):
+    return int(os.getenv(name, default))
+
+
+def _env_float(name, default):
+    return float(os.getenv(name, default))
+
+
+# MySQL credentials (override with environment variables in production)
+DB_CONFIG = {
+    "host": os.getenv("DB_HOST", "localhost"),
+    "port": _env_int("DB_PORT", 3306),
+    "user": os.getenv("DB_USER", "root"),
+    "password": os.getenv("DB_PASSWORD", ""),
+    "database": os.getenv("DB_NAME", "air_reservation"),
+}
+
+# Connection pool
+DB_POOL_SIZE = _env_int("DB_POOL_SIZE", 10)            # connections kept open
+DB_POOL_MAX_OVERFLOW = _env_int("DB_POOL_MAX_OVERFLOW", 10)  # extra connections under burst
+DB_POOL_TIMEOUT = _env_float("DB_POOL_TIMEOUT", 10)    # seconds to wait for a free connection
+DB_POOL_RECYCLE = _env_float("DB_POOL_RECYCLE", 1800)  # reopen connections idle longer than this
+DB_POOL_PING_AFTER = _env_float("DB_POOL_PING_AFTER", 5)  # health-check connections idle longer than this
+DB_POOL_LEAK_TIMEOUT = _env_float("DB_POOL_LEAK_TIMEOUT", 60)  # warn when held longer than this
+
+# Serve the hot endpoints (/flights/search, /tickets/purchase, /tickets/sold,
+# /customer/dashboard) from the asyncio driver instead of the threadpool
+DB_ASYNC = os.getenv("DB_ASYNC", "0") == "1"
+DB_ASYNC_POOL_MIN = _env_int("DB_ASYNC_POOL_MIN", 1)
+DB_ASYNC_POOL_MAX = _env_int("DB_ASYNC_POOL_MAX", 50)
+
+# Reference data cache (airlines, airplanes, seat classes, flight prices)
+REFDATA_CACHE_TTL = _env_float("REFDATA_CACHE_TTL", 300)
+REFDATA_CACHE_SIZE = _env_int("REFDATA_CACHE_SIZE", 4096)
+
+# Per-user dashboard cache (customer/agent/staff landing pages)
+DASHBOARD_CACHE_TTL = _env_float("DASHBOARD_CACHE_TTL", 30)
+DASHBOARD_CACHE_SIZE = _env_int("DASHBOARD_CACHE_SIZE", 10000)
+
+# Flight rows behind /flights/status and the batch lookup; live status is
+# recomputed per read, so this only bounds how late a staff edit shows up
+# on other worker processes
+FLIGHT_STATUS_CACHE_TTL = _env_float("FLIGHT_STATUS_CACHE_TTL", 5)
+FLIGHT_STATUS_CACHE_SIZE = _env_int("FLIGHT_STATUS_CACHE_SIZE", 10000)
+
+# Airport departure/arrival boards. Screens on the same airport share one
+# cached board; streams resend the whole board every BOARD_RESYNC seconds
+BOARD_CACHE_TTL = _env_float("BOARD_CACHE_TTL", 5)
+BOARD_RESYNC = _env_float("BOARD_RESYNC", 60)
+BOARD_KEEPALIVE = _env_float("BOARD_KEEPALIVE", 15)
+
+# bcrypt runs in a separate process pool. At most WORKERS + QUEUE hashes are
+# in flight; further login/register requests get 429 instead of piling up.
+BCRYPT_ROUNDS = _env_int("BCRYPT_ROUNDS", 12)
+PASSWORD_HASH_WORKERS = _env_int("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1))
+PASSWORD_HASH_QUEUE = _env_int("PASSWORD_HASH_QUEUE", 16)
+
+# Session tokens issued by /auth/login. Set SESSION_SECRET when running more
+# than one worker process, or tokens from one worker are ignored by the others.
+SESSION_SECRET = os.getenv("SESSION_SECRET") or secrets.token_urlsafe(32)
+SESSION_TTL = _env_float("SESSION_TTL", 12 * 3600)
+
+# Update the analytics rollup tables right after each purchase commits.
+# Set to 0 to maintain them with `python -m backend.rollups rebuild` instead.
+ROLLUPS_INLINE = os.getenv("ROLLUPS_INLINE", "1") == "1"
+
+# Per-request profiling (Server-Timing header + GET /debug/profile).
+# Off by default: the header and the store expose query text and timings.
+PROFILING = os.getenv("PROFILING", "0") == "1"
+# Mount the unauthenticated /debug/* routes (caches, pool, hashing, profiles)
+DEBUG_ENDPOINTS = os.getenv("DEBUG_ENDPOINTS", "0") == "1"
+PROFILE_HISTORY = _env_int("PROFILE_HISTORY", 500)  # recent requests kept for /debug/profile
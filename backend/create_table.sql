@@ -35,6 +35,10 @@ CREATE TABLE flight (
         CHECK (status IN ('upcoming','in-progress','delayed')),
     price DECIMAL(10,2) NOT NULL CHECK (price > 0),
     PRIMARY KEY (airline_name, flight_num),
+    INDEX idx_flight_departure (departure_airport, departure_time),
+    INDEX idx_flight_arrival (arrival_airport, departure_time),
+    INDEX idx_flight_airline_time (airline_name, departure_time),
+    INDEX idx_flight_airline_status (airline_name, status),
     FOREIGN KEY (airline_name) REFERENCES airline(name),
     FOREIGN KEY (airline_name, airplane_id) REFERENCES airplane(airline_name, airplane_id),
     FOREIGN KEY (arrival_airport) REFERENCES airport(name),
@@ -78,6 +82,7 @@ CREATE TABLE ticket (
     flight_num VARCHAR(15) NOT NULL,
     airline_name VARCHAR(50) NOT NULL,
     price_charged DECIMAL(10,2) NOT NULL CHECK (price_charged > 0),
+    INDEX idx_ticket_flight_class (airline_name, flight_num, seat_class),
     FOREIGN KEY (airline_name, flight_num) REFERENCES flight(airline_name, flight_num),
     FOREIGN KEY (airline_name, airplane_id, seat_class)
         REFERENCES seat_class(airline_name, airplane_id, class)
@@ -122,7 +127,75 @@ CREATE TABLE purchase (
     customer_email VARCHAR(50) NOT NULL,
     agent_email VARCHAR(50),
     purchase_date DATE NOT NULL,
+    INDEX idx_purchase_customer_date (customer_email, purchase_date),
+    INDEX idx_purchase_agent_date (agent_email, purchase_date),
+    INDEX idx_purchase_date (purchase_date),
     FOREIGN KEY (ticket_id) REFERENCES ticket(ticket_id),
     FOREIGN KEY (customer_email) REFERENCES customer(email),
     FOREIGN KEY (agent_email) REFERENCES booking_agent(email)
 );
+
+-- Seats left per flight and seat class
+-- Decremented atomically on purchase so capacity checks never COUNT(*) tickets
+CREATE TABLE seat_inventory (
+    airline_name VARCHAR(50) NOT NULL,
+    flight_num VARCHAR(15) NOT NULL,
+    seat_class VARCHAR(50) NOT NULL,
+    capacity INT NOT NULL,
+    seats_remaining INT NOT NULL CHECK (seats_remaining >= 0),
+    PRIMARY KEY (airline_name, flight_num, seat_class),
+    FOREIGN KEY (airline_name, flight_num) REFERENCES flight(airline_name, flight_num)
+        ON DELETE CASCADE
+);
+
+-- Denormalized search rows, one per flight (see backend/flight_search.py)
+-- Clustered on the search columns so /flights/search is one range scan
+CREATE TABLE flight_search (
+    airline_name VARCHAR(50) NOT NULL,
+    flight_num VARCHAR(15) NOT NULL,
+    airplane_id VARCHAR(15) NOT NULL,
+    departure_airport VARCHAR(50) NOT NULL,
+    arrival_airport VARCHAR(50) NOT NULL,
+    depart_city VARCHAR(50) NOT NULL,
+    arrive_city VARCHAR(50) NOT NULL,
+    departure_date DATE NOT NULL,
+    departure_time DATETIME NOT NULL,
+    arrival_time DATETIME NOT NULL,
+    status VARCHAR(12),
+    price DECIMAL(10,2) NOT NULL,
+    min_price DECIMAL(10,2),
+    seats_remaining INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (departure_airport, departure_date, arrival_airport, departure_time, airline_name, flight_num),
+    UNIQUE KEY uq_flight_search_flight (airline_name, flight_num),
+    INDEX idx_flight_search_date (departure_date, departure_time),
+    INDEX idx_flight_search_arrival (arrival_airport, arrival_time),
+    FOREIGN KEY (airline_name, flight_num) REFERENCES flight(airline_name, flight_num)
+        ON DELETE CASCADE
+);
+
+-- Daily sales rollups for staff analytics (see backend/rollups.py)
+-- agent_email = '' for tickets sold without a booking agent
+CREATE TABLE sales_agent_daily (
+    airline_name VARCHAR(50) NOT NULL,
+    sale_date DATE NOT NULL,
+    agent_email VARCHAR(50) NOT NULL DEFAULT '',
+    tickets INT NOT NULL DEFAULT 0,
+    revenue DECIMAL(14,2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (airline_name, sale_date, agent_email)
+);
+
+CREATE TABLE sales_destination_daily (
+    airline_name VARCHAR(50) NOT NULL,
+    sale_date DATE NOT NULL,
+    destination_city VARCHAR(50) NOT NULL,
+    tickets INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (airline_name, sale_date, destination_city)
+);
+
+CREATE TABLE sales_customer_daily (
+    airline_name VARCHAR(50) NOT NULL,
+    sale_date DATE NOT NULL,
+    customer_email VARCHAR(50) NOT NULL,
+    tickets INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (airline_name, sale_date, customer_email)
+);
@@ -0,0 +1,60 @@
+from backend import config, events
+from backend.cache import TTLCache
+
+# ------------------------------------------
+# Landing-page dashboards, cached per principal.
+#
+# Keys are (role, email) with role in customer / agent / staff. Entries
+# are dropped as soon as a purchase or flight change that they show
+# commits; the short TTL covers "upcoming vs. past" drifting with time
+# and writes made by other worker processes.
+# ------------------------------------------
+
+dashboard_cache = TTLCache("dashboards", config.DASHBOARD_CACHE_TTL, config.DASHBOARD_CACHE_SIZE)
+
+
+def _shows_flight(payload, airline_name, flight_num):
+    flight = payload.get("next_upcoming")
+    return bool(flight) and flight["airline_name"] == airline_name and flight["flight_num"] == flight_num
+
+
+def _invalidate_staff(airline_name):
+    dashboard_cache.invalidate_where(
+        lambda key, payload: key[0] == "staff" and payload["airline"] == airline_name
+    )
+
+
+# ------------------------------------------
+# Invalidation hooks
+# ------------------------------------------
+@events.subscribe("tickets_purchased")
+def _on_tickets_purchased(sales):
+    """sales: (airline_name, agent_email, customer_email) per ticket sold."""
+    airlines = set()
+
+    for airline_name, agent_email, customer_email in sales:
+        dashboard_cache.invalidate(("customer", customer_email))
+        if agent_email:
+            dashboard_cache.invalidate(("agent", agent_email))
+        airlines.add(airline_name)
+
+    for airline_name in airlines:
+        _invalidate_staff(airline_name)
+
+
+@events.subscribe("flight_status_changed")
+def _on_flight_status_changed(airline_name, flight_num, status, flight):
+    _invalidate_staff(airline_name)
+    dashboard_cache.invalidate_where(
+        lambda key, payload: key[0] == "customer" and _shows_flight(payload, airline_name, flight_num)
+    )
+
+
+@events.subscribe("flight_created")
+def _on_flight_created(airline_name, flight_num):
+    _invalidate_staff(airline_name)
+
+
+@events.subscribe("flights_created")
+def _on_flights_created(airline_name, flight_nums):
+    _invalidate_staff(airline_name)
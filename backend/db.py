@@ -1,9 +1,95 @@
+import time
+from contextlib import contextmanager
+
 import mysql.connector
+from fastapi import Request
+
+from backend import config, profiling
+from backend.pool import ConnectionPool
+
+
+def _connect():
+    return mysql.connector.connect(**config.DB_CONFIG)
+
+
+pool = ConnectionPool(
+    _connect,
+    size=config.DB_POOL_SIZE,
+    max_overflow=config.DB_POOL_MAX_OVERFLOW,
+    timeout=config.DB_POOL_TIMEOUT,
+    recycle=config.DB_POOL_RECYCLE,
+    ping_after=config.DB_POOL_PING_AFTER,
+    leak_timeout=config.DB_POOL_LEAK_TIMEOUT,
+)
+
+
+def get_connection(tag=None):
+    """Check a connection out of the pool. close() returns it."""
+    return profiling.instrument(pool.get(tag))
+
+
+def stream_query(sql, params, tag, batch_size, dictionary=False):
+    """
+    Yield fetchmany() batches from an unbuffered cursor on a connection of
+    its own (a streamed response body outlives the request dependency).
+
+    When the consumer stops early (client disconnected) the rest of the
+    result is still on the wire. Closing the cursor or rolling back would
+    first read every remaining row, so the connection is discarded
+    instead of going back to the pool.
+    """
+    conn = get_connection(tag)
+    cursor = None
+    finished = False
+
+    try:
+        cursor = conn.cursor(dictionary=dictionary)
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                finished = True
+                break
+            yield rows
+
+    finally:
+        try:
+            if finished:
+                cursor.close()
+            else:
+                conn.discard()
+        finally:
+            conn.close()
+
+
+@contextmanager
+def db_connection(tag=None):
+    """Context manager for code outside a request (scripts, background jobs)."""
+    start = time.perf_counter()
+    conn = pool.get(tag)
+    profiling.record_acquire(time.perf_counter() - start)
+
+    conn = profiling.instrument(conn)
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def get_db(request: Request):
+    """
+    FastAPI dependency: one pooled connection per request, always
+    returned to the pool, even when the handler raises.
+    """
+    route = request.scope.get("route")
+    tag = f"{request.method} {route.path if route else request.url.path}"
+
+    start = time.perf_counter()
+    conn = pool.get(tag)
+    profiling.record_acquire(time.perf_counter() - start)
 
-def get_connection():
-    return mysql.connector.connect(
-        host="localhost",
-        user="root",
-        password="",
-        database="air_reservation"
-    )
+    conn = profiling.instrument(conn)
+    try:
+        yield conn
+    finally:
+        conn.close()
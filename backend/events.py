@@ -0,0 +1,31 @@
+import logging
+from collections import defaultdict
+
+logger = logging.getLogger("backend.events")
+
+# In-process hooks fired after a write commits, e.g.
+#   airport_added(name, city)
+#   airplane_added(airline_name, airplane_id)
+#   airplanes_added(airline_name, airplane_ids)  bulk fleet import
+#   flight_created(airline_name, flight_num)
+#   flights_created(airline_name, flight_nums)  bulk schedule import
+#   flight_status_changed(airline_name, flight_num, status, flight)  flight: the updated row
+#   tickets_purchased(sales)  sales: [(airline_name, agent_email, customer_email), ...]
+_subscribers = defaultdict(list)
+
+
+def subscribe(event):
+    """Decorator: call fn(**payload) whenever `event` is published."""
+    def register(fn):
+        _subscribers[event].append(fn)
+        return fn
+    return register
+
+
+def publish(event, **payload):
+    # A failing subscriber must never fail the request that already committed
+    for fn in _subscribers[event]:
+        try:
+            fn(**payload)
+        except Exception:
+            logger.exception("Subscriber %s failed for event %s", fn.__name__, event)
@@ -0,0 +1,163 @@
+"""
+Run EXPLAIN on every SQL statement in the backend and flag full scans.
+
+Statements are the string literals in backend/ (routes, purchase engine,
+reference data, rollups, ...) and the module-level *_SQL constants built
+with backend/queries.py that are a whole SELECT ... FROM, UPDATE ... SET
+or DELETE FROM, plus INSERT ... SELECT. Queries assembled inside
+functions (f-strings, concatenation) and docstrings are not covered.
+Each %s is replaced by a sample literal before explaining.
+
+    python -m backend.explain
+    python -m backend.explain backend/routes/staff.py --verbose
+
+Exits with status 1 when a statement scans a whole table or index (other
+than the small reference tables) or cannot be explained, so it can run
+in CI against a database built from create_table.sql + insert.sql.
+"""
+import argparse
+import ast
+import importlib
+import re
+import sys
+from pathlib import Path
+
+from backend.db import db_connection
+
+BACKEND = Path(__file__).resolve().parent
+SKIP_DIRS = {"benchmarks", "migrations", "__pycache__"}
+
+# A handful of rows each; scanning them is cheaper than an index lookup
+SMALL_TABLES = {"airline", "airport"}
+
+STATEMENT = re.compile(r"^\s*(SELECT|INSERT|UPDATE|DELETE)\b", re.IGNORECASE)
+# The clause that makes each kind a complete statement rather than a fragment
+# ("SELECT", "\nSELECT\n    " in a builder); INSERT ... VALUES reads nothing
+COMPLETE = {
+    "SELECT": re.compile(r"\bFROM\s+\w", re.IGNORECASE),
+    "INSERT": re.compile(r"\bSELECT\b.+\bFROM\s+\w", re.IGNORECASE | re.DOTALL),
+    "UPDATE": re.compile(r"^\s*UPDATE\s+\w+.*\bSET\b", re.IGNORECASE | re.DOTALL),
+    "DELETE": re.compile(r"^\s*DELETE\s+FROM\s+\w", re.IGNORECASE),
+}
+LIMIT_PARAM = re.compile(r"\bLIMIT\s+%s", re.IGNORECASE)
+
+# Valid as a string, a DATE and a DATETIME, so indexes stay usable
+SAMPLE_VALUE = "'2024-01-01 00:00:00'"
+
+
+def source_files(paths):
+    for path in paths:
+        path = Path(path)
+        if path.is_file():
+            yield path
+            continue
+        for file in sorted(path.rglob("*.py")):
+            # This module's own keyword literals are not queries
+            if file.resolve() == Path(__file__).resolve():
+                continue
+            if not SKIP_DIRS & set(file.relative_to(path).parts):
+                yield file
+
+
+def _is_statement(text):
+    match = STATEMENT.match(text)
+    return bool(match) and bool(COMPLETE[match.group(1).upper()].search(text))
+
+
+def find_statements(file, seen):
+    """
+    (location, sql) for string literals and built *_SQL constants in a module,
+    skipping statements already in `seen` (e.g. constants imported from elsewhere).
+    """
+    tree = ast.parse(file.read_text(), str(file))
+
+    # Pieces of f-strings and docstrings are never a statement on their own
+    skip = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.JoinedStr):
+            skip.update(id(value) for value in node.values)
+        elif isinstance(node, ast.Expr):
+            skip.add(id(node.value))
+
+    for node in ast.walk(tree):
+        if id(node) in skip:
+            continue
+        if isinstance(node, ast.Constant) and isinstance(node.value, str) and _is_statement(node.value):
+            seen.add(node.value)
+            yield node.lineno, node.value
+
+    module = importlib.import_module(".".join(file.relative_to(BACKEND.parent).with_suffix("").parts))
+    for name, value in vars(module).items():
+        if name.endswith("_SQL") and isinstance(value, str) and value not in seen and _is_statement(value):
+            seen.add(value)
+            yield name, value
+
+
+def bind_sample_params(sql):
+    sql = LIMIT_PARAM.sub("LIMIT 1", sql)
+    return sql.replace("%s", SAMPLE_VALUE)
+
+
+def problems(plan):
+    """(table, access type) of every plan row that reads a whole table or index."""
+    found = []
+    for row in plan:
+        table = row["table"] or ""
+        if table.startswith("<") or table in SMALL_TABLES:
+            continue
+        if row["type"] in ("ALL", "index"):
+            found.append((table, row["type"]))
+    return found
+
+
+def format_plan(plan):
+    return "\n".join(
+        f"      {row['table']}: type={row['type']} key={row['key']} rows={row['rows']} {row['Extra'] or ''}"
+        for row in plan
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN the backend's SQL and flag full scans.")
+    parser.add_argument("paths", nargs="*", default=[str(BACKEND)])
+    parser.add_argument("--verbose", action="store_true", help="print every plan, not just flagged ones")
+    args = parser.parse_args()
+
+    checked = flagged = failed = 0
+    seen = set()
+
+    with db_connection("explain") as conn:
+        cursor = conn.cursor(dictionary=True)
+
+        for file in source_files(args.paths):
+            for location, sql in find_statements(file, seen):
+                where = f"{file.relative_to(BACKEND.parent)}:{location}"
+                checked += 1
+
+                try:
+                    cursor.execute("EXPLAIN " + bind_sample_params(sql))
+                    plan = cursor.fetchall()
+                except Exception as e:
+                    failed += 1
+                    print(f"ERROR {where}: {e}")
+                    continue
+
+                scans = problems(plan)
+                if scans:
+                    flagged += 1
+                    tables = ", ".join(f"{t} ({kind})" for t, kind in scans)
+                    print(f"SCAN  {where}: {tables}")
+                    print(format_plan(plan))
+                elif args.verbose:
+                    print(f"ok    {where}")
+                    print(format_plan(plan))
+
+        cursor.close()
+        conn.rollback()
+
+    print(f"\n{checked} statements explained, {flagged} with full scans, {failed} errors.")
+    sys.exit(1 if flagged or failed else 0)
+
+
+if __name__ == "__main__":
+    main()
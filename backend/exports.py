@@ -0,0 +1,142 @@
+"""
+Streaming sales export (GET /staff/export_sales/{email}).
+
+One row per ticket sold by an airline in a purchase-date range
+(purchase + ticket + flight), as CSV or Parquet. Rows come off an
+unbuffered cursor EXPORT_BATCH at a time and each batch is encoded and
+sent before the next is read, so memory stays flat however many rows
+match: a year of sales costs the worker no more than a day.
+
+Parquet needs pyarrow (`pip install pyarrow`); each batch becomes one
+row group and the footer is written after the last.
+"""
+import csv
+import io
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+from backend.db import stream_query
+from backend.queries import JOIN_FLIGHT, JOIN_TICKET, purchases
+
+# pyarrow is optional: only format=parquet needs it
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+EXPORT_BATCH = 5000
+FORMATS = ("csv", "parquet")
+
+EXPORT_COLUMNS = (
+    "P.ticket_id",
+    "P.purchase_date",
+    "P.customer_email",
+    "P.agent_email",
+    "T.flight_num",
+    "T.airplane_id",
+    "T.seat_class",
+    "T.price_charged",
+    "F.departure_airport",
+    "F.arrival_airport",
+    "F.departure_time",
+    "F.arrival_time",
+    "F.status",
+)
+HEADER = tuple(column.split(".")[1] for column in EXPORT_COLUMNS)
+
+# Sorted by idx_purchase_date (purchase_date, ticket_id), so no filesort
+SALES_EXPORT_SQL = purchases(
+    EXPORT_COLUMNS,
+    ["T.airline_name = %s", "P.purchase_date BETWEEN %s AND %s"],
+    joins=[JOIN_TICKET, JOIN_FLIGHT],
+    order_by="P.purchase_date, P.ticket_id"
+)
+
+if pa is not None:
+    _TYPES = {
+        "ticket_id": pa.int64(),
+        "purchase_date": pa.date32(),
+        "price_charged": pa.decimal128(10, 2),
+        "departure_time": pa.timestamp("s"),
+        "arrival_time": pa.timestamp("s"),
+    }
+    PARQUET_SCHEMA = pa.schema([(name, _TYPES.get(name, pa.string())) for name in HEADER])
+
+
+def _csv_stream(batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(HEADER)
+
+    for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+
+    # No sales in range: still a valid CSV with its header
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+class _ChunkSink:
+    """Write-only file for ParquetWriter that hands back what was written so far."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def _parquet_stream(batches):
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, PARQUET_SCHEMA, compression="snappy")
+
+    try:
+        for rows in batches:
+            data = {name: [row[i] for row in rows] for i, name in enumerate(HEADER)}
+            writer.write_table(pa.Table.from_pydict(data, schema=PARQUET_SCHEMA))
+            yield sink.drain()
+    finally:
+        writer.close()
+
+    yield sink.drain()
+
+
+def sales_export(airline_name, start, end, fmt, tag):
+    """StreamingResponse with every sale of airline_name purchased between start and end (inclusive)."""
+    if fmt not in FORMATS:
+        raise HTTPException(400, detail="format must be 'csv' or 'parquet'.")
+    if fmt == "parquet" and pa is None:
+        raise HTTPException(400, detail="Parquet export needs pyarrow installed on the server; use format=csv.")
+    if start > end:
+        raise HTTPException(400, detail="start must be on or before end.")
+
+    batches = stream_query(SALES_EXPORT_SQL, (airline_name, start, end), tag, EXPORT_BATCH)
+    filename = f"sales_{airline_name.replace(' ', '_')}_{start}_{end}.{fmt}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+
+    if fmt == "csv":
+        return StreamingResponse(_csv_stream(batches), media_type="text/csv", headers=headers)
+    return StreamingResponse(_parquet_stream(batches), media_type="application/vnd.apache.parquet", headers=headers)
@@ -0,0 +1,141 @@
+"""
+Bulk fleet import (POST /staff/import_fleet/{email}).
+
+Takes many airplanes with their seat-class layouts in one JSON body:
+
+    {"airplanes": [
+        {"airplane_id": "P-1", "seat_classes": [
+            {"class": "Economy", "capacity": 150, "price_factor": 1},
+            {"class": "Business", "capacity": 30, "price_factor": 2.5}]},
+        ...
+    ], "dry_run": false}
+
+Each airplane is validated in memory against the airline's existing
+fleet and the rest of the request; ids and class names are compared
+ignoring case, as the table collation does. The valid ones go in with two
+multi-row INSERTs (airplane, seat_class) in a single transaction;
+invalid ones are listed in the report and skipped.
+"""
+from backend import events
+
+MAX_FLEET_AIRPLANES = 5000
+AIRPLANE_ID_LENGTH = 15
+CLASS_NAME_LENGTH = 50
+MAX_PRICE_FACTOR = 99.99    # DECIMAL(4,2)
+
+INSERT_AIRPLANE_SQL = "INSERT INTO airplane (airplane_id, airline_name) VALUES (%s, %s)"
+
+INSERT_SEAT_CLASS_SQL = """
+    INSERT INTO seat_class (class, airplane_id, airline_name, capacity, price_factor)
+    VALUES (%s, %s, %s, %s, %s)
+"""
+
+
+class FleetError(ValueError):
+    """A request that cannot be imported at all."""
+
+
+def seat_class_rows(seat_classes):
+    """[(class, capacity, price_factor), ...] from a seat-class list, or ValueError."""
+    if not isinstance(seat_classes, list) or len(seat_classes) == 0:
+        raise ValueError("At least one seat class must be provided.")
+
+    rows, names = [], set()
+    for idx, sc in enumerate(seat_classes, start=1):
+        if not isinstance(sc, dict):
+            raise ValueError(f"Seat class #{idx}: must be an object.")
+        class_name = str(sc.get("class") or "").strip()
+        if not class_name:
+            raise ValueError(f"Seat class #{idx}: Class name is required.")
+        if len(class_name) > CLASS_NAME_LENGTH:
+            raise ValueError(f"Seat class '{class_name}': Class name is longer than {CLASS_NAME_LENGTH} characters.")
+        if class_name.casefold() in names:
+            raise ValueError(f"Seat class '{class_name}' is listed twice.")
+
+        try:
+            capacity = int(sc.get("capacity"))
+            price_factor = float(sc.get("price_factor"))
+        except (TypeError, ValueError):
+            raise ValueError(
+                f"Seat class '{class_name}': Capacity must be an integer and price factor must be a number."
+            )
+
+        if capacity <= 0:
+            raise ValueError(f"Seat class '{class_name}': Capacity must be greater than 0.")
+        if not 0 < price_factor <= MAX_PRICE_FACTOR:
+            raise ValueError(
+                f"Seat class '{class_name}': Price factor must be greater than 0 and at most {MAX_PRICE_FACTOR}."
+            )
+
+        names.add(class_name.casefold())
+        rows.append((class_name, capacity, price_factor))
+    return rows
+
+
+def import_fleet(conn, airline_name, airplanes, dry_run=False):
+    if not isinstance(airplanes, list) or not airplanes:
+        raise FleetError("Provide a non-empty 'airplanes' list.")
+    if len(airplanes) > MAX_FLEET_AIRPLANES:
+        raise FleetError(f"At most {MAX_FLEET_AIRPLANES} airplanes per request; split it up.")
+
+    cursor = conn.cursor()
+    errors = []
+    valid = []      # (airplane_id, [(class, capacity, price_factor), ...])
+
+    try:
+        cursor.execute("SELECT airplane_id FROM airplane WHERE airline_name = %s", (airline_name,))
+        existing = {airplane_id.casefold() for (airplane_id,) in cursor.fetchall()}
+        seen = set()
+
+        # 1️⃣ Validate every airplane in memory
+        for index, plane in enumerate(airplanes):
+            airplane_id = str(plane.get("airplane_id") or "").strip() if isinstance(plane, dict) else ""
+            try:
+                if not isinstance(plane, dict):
+                    raise ValueError("Each airplane must be an object.")
+                if not airplane_id:
+                    raise ValueError("Airplane ID is required.")
+                if len(airplane_id) > AIRPLANE_ID_LENGTH:
+                    raise ValueError(f"Airplane ID is longer than {AIRPLANE_ID_LENGTH} characters.")
+                if airplane_id.casefold() in existing:
+                    raise ValueError(f"Airplane '{airplane_id}' already exists for {airline_name}.")
+                if airplane_id.casefold() in seen:
+                    raise ValueError(f"Airplane '{airplane_id}' appears earlier in this request.")
+                classes = seat_class_rows(plane.get("seat_classes"))
+            except ValueError as e:
+                errors.append({"index": index, "airplane_id": airplane_id or None, "error": str(e)})
+                continue
+
+            seen.add(airplane_id.casefold())
+            valid.append((airplane_id, classes))
+
+        # 2️⃣ One transaction, one multi-row INSERT per table
+        imported = []
+        if valid and not dry_run:
+            try:
+                cursor.executemany(INSERT_AIRPLANE_SQL, [(a, airline_name) for a, _ in valid])
+                cursor.executemany(
+                    INSERT_SEAT_CLASS_SQL,
+                    [(c, a, airline_name, cap, factor) for a, classes in valid for c, cap, factor in classes]
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+            imported = [a for a, _ in valid]
+            events.publish("airplanes_added", airline_name=airline_name, airplane_ids=imported)
+
+    finally:
+        cursor.close()
+
+    return {
+        "success": not errors,
+        "dry_run": dry_run,
+        "airplanes": len(airplanes),
+        "valid": len(valid),
+        "imported": len(imported),
+        "seat_classes": sum(len(classes) for _, classes in valid) if imported else 0,
+        "failed": len(errors),
+        "errors": errors,
+    }
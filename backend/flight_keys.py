@@ -0,0 +1,43 @@
+"""
+(airline_name, flight_num) keys from request bodies, and matching them
+back to rows.
+
+MySQL compares these columns with a case-insensitive collation, so
+("jet blue", "ub100") finds the row stored as ("Jet Blue", "UB100").
+Results read back from the database have to be matched the same way,
+never by exact dict lookup on the caller's spelling.
+"""
+from fastapi import HTTPException
+
+
+def fold(key):
+    """Case-insensitive form of a key, for dict lookups and duplicate checks."""
+    return tuple(value.casefold() for value in key)
+
+
+def flight_keys(data, max_flights):
+    """
+    Unique keys from {"flights": [{"airline_name", "flight_num"}, ...]}, in
+    request order. Values are stripped strings (a JSON 100 becomes "100");
+    keys differing only in case count once.
+    """
+    flights = data.get("flights")
+
+    if not isinstance(flights, list) or len(flights) == 0:
+        raise HTTPException(status_code=400, detail="At least one flight is required.")
+    if len(flights) > max_flights:
+        raise HTTPException(status_code=400, detail=f"At most {max_flights} flights per request.")
+
+    keys = {}
+    for flight in flights:
+        if not isinstance(flight, dict):
+            raise HTTPException(status_code=400, detail="Each flight needs airline_name and flight_num.")
+
+        airline_name = str(flight.get("airline_name") or "").strip()
+        flight_num = str(flight.get("flight_num") if flight.get("flight_num") is not None else "").strip()
+        if not airline_name or not flight_num:
+            raise HTTPException(status_code=400, detail="Each flight needs airline_name and flight_num.")
+
+        keys.setdefault(fold((airline_name, flight_num)), (airline_name, flight_num))
+
+    return list(keys.values())
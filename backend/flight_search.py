@@ -0,0 +1,173 @@
+"""
+Denormalized table behind /flights/search.
+
+flight_search holds one row per flight with everything a search result
+shows: airport codes and cities, the departure date, times, status,
+base price, the cheapest seat class fare and the seats left. Its
+primary key starts with the search columns
+
+    (departure_airport, departure_date, arrival_airport, departure_time, ...)
+
+so a search is a range scan of the clustered index: no joins, no
+DATE(...) on every row, and no lookup back into flight.
+
+Staff writes keep it current in the same transaction:
+
+    staff create_flight          refresh(cursor, airline, flight_num)
+    staff import_schedule        refresh_many(cursor, airline, flight_nums)
+    staff update_flight_status   update_status(...)
+
+Purchases call claim_seats(conn, ...) right after they commit, in a
+short transaction of their own. The per-flight row would otherwise be
+locked until the purchase commits, so buyers of different seat classes
+on the same flight would wait on each other. seats_remaining here is a
+search hint that can trail a sale by a moment; seat_inventory (and
+/tickets/availability) is the authority.
+
+and can be recomputed from flight / airport / seat_class / seat_inventory:
+
+    python -m backend.flight_search rebuild
+"""
+import argparse
+import logging
+
+from backend import async_db
+
+logger = logging.getLogger("backend.flight_search")
+
+SEARCH_COLUMNS = """
+    airline_name, flight_num, airplane_id,
+    departure_airport, arrival_airport, depart_city, arrive_city,
+    departure_date, departure_time, arrival_time, status, price,
+    min_price, seats_remaining
+"""
+
+_INSERT_FLIGHTS = f"""
+    INSERT INTO flight_search ({SEARCH_COLUMNS})
+    SELECT
+        F.airline_name, F.flight_num, F.airplane_id,
+        F.departure_airport, F.arrival_airport, A1.city, A2.city,
+        DATE(F.departure_time), F.departure_time, F.arrival_time, F.status, F.price,
+        (
+            SELECT MIN(ROUND(F.price * S.price_factor, 2))
+            FROM seat_class S
+            WHERE S.airline_name = F.airline_name AND S.airplane_id = F.airplane_id
+        ),
+        (
+            SELECT COALESCE(SUM(I.seats_remaining), 0)
+            FROM seat_inventory I
+            WHERE I.airline_name = F.airline_name AND I.flight_num = F.flight_num
+        )
+    FROM flight F
+    JOIN airport A1 ON F.departure_airport = A1.name
+    JOIN airport A2 ON F.arrival_airport = A2.name
+"""
+
+_UPSERT = """
+    ON DUPLICATE KEY UPDATE
+        airplane_id = VALUES(airplane_id),
+        departure_airport = VALUES(departure_airport),
+        arrival_airport = VALUES(arrival_airport),
+        depart_city = VALUES(depart_city),
+        arrive_city = VALUES(arrive_city),
+        departure_date = VALUES(departure_date),
+        departure_time = VALUES(departure_time),
+        arrival_time = VALUES(arrival_time),
+        status = VALUES(status),
+        price = VALUES(price),
+        min_price = VALUES(min_price),
+        seats_remaining = VALUES(seats_remaining)
+"""
+
+# One flight, inserted or brought up to date
+REFRESH_SQL = _INSERT_FLIGHTS + """
+    WHERE F.airline_name = %s AND F.flight_num = %s
+""" + _UPSERT
+
+UPDATE_STATUS_SQL = """
+    UPDATE flight_search SET status = %s
+    WHERE airline_name = %s AND flight_num = %s
+"""
+
+# Same delta as the seat_inventory decrement, so no re-aggregation per sale
+CLAIM_SEATS_SQL = """
+    UPDATE flight_search SET seats_remaining = seats_remaining - %s
+    WHERE airline_name = %s AND flight_num = %s
+"""
+
+
+def refresh(cursor, airline_name, flight_num):
+    cursor.execute(REFRESH_SQL, (airline_name, flight_num))
+
+
+def refresh_many(cursor, airline_name, flight_nums):
+    """refresh() for many flights of one airline in a single statement."""
+    keys = ", ".join(["%s"] * len(flight_nums))
+    sql = _INSERT_FLIGHTS + f"WHERE F.airline_name = %s AND F.flight_num IN ({keys})" + _UPSERT
+    cursor.execute(sql, [airline_name, *flight_nums])
+
+
+def update_status(cursor, airline_name, flight_num, status):
+    cursor.execute(UPDATE_STATUS_SQL, (status, airline_name, flight_num))
+
+
+def claim_seats(conn, claims):
+    """claims: [(seats, airline_name, flight_num), ...] of a committed purchase."""
+    cursor = None
+
+    try:
+        cursor = conn.cursor()
+        cursor.executemany(CLAIM_SEATS_SQL, sorted(claims, key=lambda c: c[1:]))
+        conn.commit()
+
+    except Exception:
+        # The sale stands; only the search hint is off until the next rebuild
+        conn.rollback()
+        logger.exception("flight_search seat count update failed; run `python -m backend.flight_search rebuild`")
+
+    finally:
+        if cursor is not None:
+            cursor.close()
+
+
+async def claim_seats_async(conn, claims):
+    try:
+        await async_db.executemany(conn, CLAIM_SEATS_SQL, sorted(claims, key=lambda c: c[1:]))
+        await conn.commit()
+
+    except Exception:
+        await conn.rollback()
+        logger.exception("flight_search seat count update failed; run `python -m backend.flight_search rebuild`")
+
+
+def rebuild(conn):
+    """Upsert every flight (a full scan of flight, by design). Deleted flights cascade."""
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute(_INSERT_FLIGHTS + _UPSERT)
+        conn.commit()
+
+    except Exception:
+        conn.rollback()
+        raise
+
+    finally:
+        cursor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the flight_search table.")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.parse_args()
+
+    from backend.db import db_connection
+
+    with db_connection("flight_search:rebuild") as conn:
+        rebuild(conn)
+
+    print("flight_search rebuilt.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Live flight status for /flights/status and departure boards.
+
+The stored status is what staff set (upcoming / delayed / in-progress);
+the live status also depends on the clock and is derived in Python from
+the same row, so a lookup is one indexed query (or none):
+
+    landed       arrival time has passed
+    in-progress  between departure and arrival, or set by staff
+    delayed      set by staff, not yet arrived
+    boarding     within BOARDING_WINDOW of departure
+    scheduled    otherwise
+
+Flight rows are cached for FLIGHT_STATUS_CACHE_TTL seconds; the live
+status is recomputed on every read, so the cache never serves a stale
+"scheduled" once boarding starts. A status change by staff drops the
+cached row at once.
+"""
+from datetime import datetime, timedelta
+
+from backend import config, events
+from backend.cache import TTLCache
+from backend.flight_keys import fold
+
+BOARDING_WINDOW = timedelta(minutes=45)
+MAX_STATUS_FLIGHTS = 500
+
+status_cache = TTLCache("flight_status", config.FLIGHT_STATUS_CACHE_TTL, config.FLIGHT_STATUS_CACHE_SIZE)
+
+STATUS_COLUMNS = """
+    airline_name, flight_num, airplane_id,
+    departure_airport, arrival_airport,
+    departure_time, arrival_time, status, price
+"""
+
+
+def _status_sql(flight_count):
+    keys = ", ".join(["(%s, %s)"] * flight_count)
+    return f"""
+        SELECT {STATUS_COLUMNS}
+        FROM flight
+        WHERE (airline_name, flight_num) IN ({keys})
+    """
+
+
+def live_status(flight, now=None):
+    now = now or datetime.now()
+
+    if now >= flight["arrival_time"]:
+        return "landed"
+    if flight["status"] == "delayed":
+        return "delayed"
+    if flight["status"] == "in-progress" or now >= flight["departure_time"]:
+        return "in-progress"
+    if now >= flight["departure_time"] - BOARDING_WINDOW:
+        return "boarding"
+    return "scheduled"
+
+
+def with_live_status(flight, now=None):
+    """Copy of a flight row with live_status added (cached rows are shared)."""
+    return {**flight, "live_status": live_status(flight, now)}
+
+
+def flight_statuses(conn, keys):
+    """
+    {(airline_name, flight_num): flight row with live_status} for many
+    flights: cached rows first, then one query for the rest.
+    Keys match rows ignoring case, as the table collation does, and the
+    result is keyed by the caller's spelling. Unknown flights are left out.
+    """
+    keys = list(dict.fromkeys(keys))
+    rows = {}       # fold(key) -> row
+    missing = []
+
+    for key in keys:
+        row = status_cache.get(fold(key))
+        if row is None:
+            missing.append(key)
+        else:
+            rows[fold(key)] = row
+
+    if missing:
+        cursor = conn.cursor(dictionary=True)
+        try:
+            cursor.execute(_status_sql(len(missing)), [v for key in missing for v in key])
+            for row in cursor.fetchall():
+                key = fold((row["airline_name"], row["flight_num"]))
+                status_cache.set(key, row)
+                rows[key] = row
+        finally:
+            cursor.close()
+
+    now = datetime.now()
+    return {key: with_live_status(rows[fold(key)], now) for key in keys if fold(key) in rows}
+
+
+def flight_status(conn, airline_name, flight_num):
+    """One flight with live_status, or None."""
+    return flight_statuses(conn, [(airline_name, flight_num)]).get((airline_name, flight_num))
+
+
+@events.subscribe("flight_status_changed")
+def _on_flight_status_changed(airline_name, flight_num, status, flight):
+    status_cache.invalidate(fold((airline_name, flight_num)))
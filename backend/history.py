@@ -0,0 +1,113 @@
+import base64
+from datetime import datetime
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+from backend.db import stream_query
+from backend.responses import FastJSONResponse, Rows, dumps, fetch_rows
+
+# ------------------------------------------
+# Paging and streaming for ticket/flight history lists.
+#
+# Pages use keyset pagination on (F.departure_time, T.ticket_id): the
+# cursor is the last row of the previous page, so page N costs the same
+# as page 1 (no OFFSET scan). format=ndjson streams every matching row,
+# one JSON object per line, straight off an unbuffered cursor.
+#
+# The base query must select T.ticket_id and F.departure_time, join
+# ticket T and flight F, and end in a WHERE clause.
+# ------------------------------------------
+
+MAX_PAGE_SIZE = 500
+STREAM_BATCH = 500
+
+SECTIONS = ("upcoming", "past")
+
+
+def wants_paging(limit, cursor, format):
+    return limit is not None or cursor is not None or format == "ndjson"
+
+
+def encode_cursor(row):
+    raw = f"{row['departure_time'].isoformat()}|{row['ticket_id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(token):
+    try:
+        departure, ticket_id = base64.urlsafe_b64decode(token.encode()).decode().split("|")
+        return datetime.fromisoformat(departure), int(ticket_id)
+    except Exception:
+        raise HTTPException(400, detail="Invalid cursor.")
+
+
+def history_query(base_sql, params, section=None, cursor=None, limit=None):
+    """
+    Add section filter, keyset condition, ordering and LIMIT to base_sql.
+    upcoming pages run soonest first; past and whole-history pages newest first.
+    """
+    if section is not None and section not in SECTIONS:
+        raise HTTPException(400, detail="section must be 'upcoming' or 'past'.")
+
+    sql = base_sql
+    params = list(params)
+    descending = section != "upcoming"
+    op = "<" if descending else ">"
+
+    if section == "upcoming":
+        sql += " AND F.departure_time >= %s"
+        params.append(datetime.now())
+    elif section == "past":
+        sql += " AND F.departure_time < %s"
+        params.append(datetime.now())
+
+    if cursor:
+        departure, ticket_id = decode_cursor(cursor)
+        sql += f" AND (F.departure_time {op} %s OR (F.departure_time = %s AND T.ticket_id {op} %s))"
+        params += [departure, departure, ticket_id]
+
+    order = "DESC" if descending else "ASC"
+    sql += f" ORDER BY F.departure_time {order}, T.ticket_id {order}"
+
+    if limit is not None:
+        sql += " LIMIT %s"
+        params.append(limit)
+
+    return sql, params
+
+
+def _stream_rows(sql, params, tag):
+    for rows in stream_query(sql, params, tag, STREAM_BATCH, dictionary=True):
+        yield b"".join(dumps(row) + b"\n" for row in rows)
+
+
+def history_response(conn, base_sql, params, tag, section=None, cursor=None, limit=None, format="json"):
+    """One page as {"flights", "next_cursor"}, or an NDJSON stream."""
+    if format not in ("json", "ndjson"):
+        raise HTTPException(400, detail="format must be 'json' or 'ndjson'.")
+    if limit is not None and not 1 <= limit <= MAX_PAGE_SIZE:
+        raise HTTPException(400, detail=f"limit must be between 1 and {MAX_PAGE_SIZE}.")
+
+    if format == "ndjson":
+        sql, params = history_query(base_sql, params, section, cursor, limit)
+        return StreamingResponse(_stream_rows(sql, params, tag), media_type="application/x-ndjson")
+
+    # One extra row tells us whether there is a next page
+    page_size = limit or MAX_PAGE_SIZE
+    sql, params = history_query(base_sql, params, section, cursor, page_size + 1)
+
+    db_cursor = conn.cursor()
+    try:
+        db_cursor.execute(sql, params)
+        rows = fetch_rows(db_cursor)
+    finally:
+        db_cursor.close()
+
+    has_more = len(rows) > page_size
+    page = Rows(rows.columns, rows.rows[:page_size])
+
+    return FastJSONResponse({
+        "flights": page,
+        "next_cursor": encode_cursor(dict(zip(page.columns, page.rows[-1]))) if has_more else None,
+    })
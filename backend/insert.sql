@@ -78,4 +78,46 @@ VALUES
 (1008, 'Economy', 'MU727', 'MU727', 'China Eastern Airlines', 1063.00),
 (1010, 'Economy', 'MU587', 'MU587', 'China Eastern Airlines', 7165.00),
 (1011, 'Business', 'MU587', 'MU587', 'China Eastern Airlines', 31925.50),
-(1012, 'First', 'MU587', 'MU587', 'China Eastern Airlines', 80247.00);
\ No newline at end of file
+(1012, 'First', 'MU587', 'MU587', 'China Eastern Airlines', 80247.00);
+-- Seat counters for every flight, minus the tickets above
+INSERT INTO seat_inventory (airline_name, flight_num, seat_class, capacity, seats_remaining)
+SELECT
+    F.airline_name,
+    F.flight_num,
+    S.class,
+    S.capacity,
+    S.capacity - (
+        SELECT COUNT(*) FROM ticket T
+        WHERE T.airline_name = F.airline_name
+          AND T.flight_num = F.flight_num
+          AND T.seat_class = S.class
+    )
+FROM flight F
+JOIN seat_class S
+    ON S.airline_name = F.airline_name
+   AND S.airplane_id = F.airplane_id;
+
+-- Search rows for every flight (same as: python -m backend.flight_search rebuild)
+INSERT INTO flight_search (
+    airline_name, flight_num, airplane_id,
+    departure_airport, arrival_airport, depart_city, arrive_city,
+    departure_date, departure_time, arrival_time, status, price,
+    min_price, seats_remaining
+)
+SELECT
+    F.airline_name, F.flight_num, F.airplane_id,
+    F.departure_airport, F.arrival_airport, A1.city, A2.city,
+    DATE(F.departure_time), F.departure_time, F.arrival_time, F.status, F.price,
+    (
+        SELECT MIN(ROUND(F.price * S.price_factor, 2))
+        FROM seat_class S
+        WHERE S.airline_name = F.airline_name AND S.airplane_id = F.airplane_id
+    ),
+    (
+        SELECT COALESCE(SUM(I.seats_remaining), 0)
+        FROM seat_inventory I
+        WHERE I.airline_name = F.airline_name AND I.flight_num = F.flight_num
+    )
+FROM flight F
+JOIN airport A1 ON F.departure_airport = A1.name
+JOIN airport A2 ON F.arrival_airport = A2.name;
@@ -0,0 +1,99 @@
+import threading
+
+from backend import refdata
+
+# ------------------------------------------
+# In-memory airport/city index for search boxes.
+#
+# Resolves free text to the set of airport codes whose code or city
+# contains it (same semantics as the old LOWER(...) LIKE '%x%'), so the
+# flight query can use an indexed departure_airport IN (...) lookup.
+# ------------------------------------------
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class LocationIndex:
+    def __init__(self, airports):
+        self.entries = {}       # code -> (code_lower, city_lower, city)
+        self.trigrams = {}      # trigram -> set of codes
+
+        for a in airports:
+            code, city = a["name"], a["city"] or ""
+            code_l, city_l = code.lower(), city.lower()
+            self.entries[code] = (code_l, city_l, city)
+
+            for gram in _trigrams(code_l) | _trigrams(city_l):
+                self.trigrams.setdefault(gram, set()).add(code)
+
+    def _candidates(self, text):
+        if len(text) < 3:
+            return self.entries.keys()
+
+        sets = [self.trigrams.get(g) for g in _trigrams(text)]
+        if not all(sets):
+            return ()
+        return set.intersection(*sorted(sets, key=len))
+
+    def match(self, text):
+        """Airport codes whose code or city contains text. None means no filter."""
+        text = (text or "").strip().lower()
+        if not text:
+            return None
+
+        return {
+            code for code in self._candidates(text)
+            if text in self.entries[code][0] or text in self.entries[code][1]
+        }
+
+    def suggest(self, text, limit=10):
+        """Ranked typeahead: exact code, code prefix, city prefix, word prefix, substring."""
+        text = (text or "").strip().lower()
+        if not text:
+            return []
+
+        ranked = []
+        for code in self.match(text):
+            code_l, city_l, city = self.entries[code]
+
+            if code_l == text:
+                rank = 0
+            elif code_l.startswith(text):
+                rank = 1
+            elif city_l.startswith(text):
+                rank = 2
+            elif any(word.startswith(text) for word in city_l.split()):
+                rank = 3
+            else:
+                rank = 4
+
+            ranked.append((rank, city_l, code_l, {"code": code, "city": city}))
+
+        ranked.sort(key=lambda r: r[:3])
+        return [r[3] for r in ranked[:limit]]
+
+
+# Rebuilt whenever the cached airport list changes (TTL expiry or add_airport)
+_index = None
+_index_source = None
+_lock = threading.Lock()
+
+
+def _index_for(airports):
+    global _index, _index_source
+
+    with _lock:
+        if airports is not _index_source:
+            _index = LocationIndex(airports)
+            _index_source = airports
+        return _index
+
+
+def get_index(conn):
+    return _index_for(refdata.airports(conn))
+
+
+async def get_index_async(conn):
+    return _index_for(await refdata.airports_async(conn))
@@ -1,10 +1,40 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
+from . import async_db, config, metrics
+from .profiling import ProfilingMiddleware
+from .responses import FastJSONResponse
+from .db import pool
+from .passwords import hasher
 from .routes import auth, flights, tickets
 from .routes import agent, customer, staff
+from .routes import debug
+
+
+@asynccontextmanager
+async def lifespan(app):
+    if config.DB_ASYNC:
+        await async_db.init_pool()
+    hasher.start()
+
+    yield
+
+    # Close idle pooled connections on shutdown
+    await async_db.close_pool()
+    pool.dispose()
+    hasher.shutdown()
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
+
+# Query counts and timings per request (Server-Timing header, /debug/profile)
+if config.PROFILING:
+    app.add_middleware(ProfilingMiddleware)
+
+# Request counts and latency per route for /metrics
+app.add_middleware(metrics.MetricsMiddleware)
 
 # Allow React frontend to access backend
 app.add_middleware(
@@ -23,6 +53,15 @@ app.include_router(agent.router)
 app.include_router(customer.router)
 app.include_router(staff.router)
 
+# Internal state and query text; only for development or a private network
+if config.DEBUG_ENDPOINTS:
+    app.include_router(debug.router)
+
 @app.get("/")
 def home():
     return {"message": "FastAPI backend is running!"}
+
+# Prometheus scrape endpoint
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,204 @@
+"""
+Prometheus metrics for GET /metrics, in the text exposition format.
+
+Request counts and latency histograms are recorded per route by
+MetricsMiddleware; purchase outcomes per airline by the purchase
+engine. Pool, cache and password-hashing numbers are read from their
+status() / stats() at scrape time, so those paths pay nothing extra.
+
+No client library is needed; the few metric types used here are small.
+"""
+import bisect
+import threading
+import time
+
+from backend import async_db, events
+from backend.cache import caches
+from backend.db import pool
+from backend.passwords import hasher
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+class Counter:
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_labels(self.labelnames, k)} {v}" for k, v in values]
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._values = {}   # labels -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def render(self):
+        with self._lock:
+            values = sorted((k, list(v)) for k, v in self._values.items())
+
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        names = self.labelnames + ("le",)
+        for labels, series in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels(names, labels + (bound,))} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {series[-1]}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+def _gauge(name, help, samples, kind="gauge"):
+    """samples: [(labels dict, value), ...] read at scrape time."""
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    lines += [f"{name}{_labels(tuple(labels), tuple(labels.values()))} {value}" for labels, value in samples]
+    return lines
+
+
+# ------------------------------------------
+# Recorded metrics
+# ------------------------------------------
+
+REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route and status.", ("method", "route", "status")
+)
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.", ("method", "route")
+)
+PURCHASES = Counter(
+    "ticket_purchases_total", "Seat purchase attempts by airline and outcome (success, soldout, error).",
+    ("airline", "outcome")
+)
+
+
+def record_purchase(airline_name, outcome, count=1):
+    PURCHASES.inc(airline_name or "", outcome, amount=count)
+
+
+@events.subscribe("tickets_purchased")
+def _count_sales(sales):
+    for airline_name, _, _ in sales:
+        record_purchase(airline_name, "success")
+
+
+class MetricsMiddleware:
+    """ASGI middleware: request count and latency per route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # Templated path keeps the label set small (/customer/dashboard/{email})
+            route = scope.get("route")
+            path = route.path if route else "unmatched"
+            REQUESTS.inc(scope["method"], path, str(status))
+            REQUEST_SECONDS.observe(time.perf_counter() - start, scope["method"], path)
+
+
+# ------------------------------------------
+# Scrape
+# ------------------------------------------
+
+def _pool_metrics():
+    status = pool.status()
+    lines = []
+    for key in ("size", "max_overflow", "open", "idle", "checked_out", "overflow"):
+        lines += _gauge(f"db_pool_{key}", f"Connection pool {key.replace('_', ' ')}.", [({}, status[key])])
+    for key in ("leaks", "timeouts", "recycled", "failed_pings"):
+        lines += _gauge(f"db_pool_{key}_total", f"Connection pool {key.replace('_', ' ')}.",
+                        [({}, status[key])], kind="counter")
+
+    if async_db.pool is not None:
+        lines += _gauge("db_async_pool_open", "aiomysql pool connections open.", [({}, async_db.pool.size)])
+        lines += _gauge("db_async_pool_idle", "aiomysql pool connections idle.", [({}, async_db.pool.freesize)])
+    return lines
+
+
+def _cache_metrics():
+    stats = {name: cache.stats() for name, cache in caches.items()}
+    lines = []
+    for key in ("hits", "misses", "evictions", "invalidations"):
+        lines += _gauge(f"cache_{key}_total", f"Cache {key}.",
+                        [({"cache": name}, s[key]) for name, s in stats.items()], kind="counter")
+    lines += _gauge("cache_entries", "Entries currently cached.",
+                    [({"cache": name}, s["size"]) for name, s in stats.items()])
+    lines += _gauge("cache_hit_ratio", "Hits / lookups since start.",
+                    [({"cache": name}, s["hit_ratio"]) for name, s in stats.items()])
+    return lines
+
+
+def _password_metrics():
+    status = hasher.status()
+    lines = []
+    for key in ("workers", "queue_size", "in_flight", "queued"):
+        lines += _gauge(f"password_hash_{key}", f"Password hashing {key.replace('_', ' ')}.",
+                        [({}, status[key])])
+    for key in ("completed", "rejected", "rehashed"):
+        lines += _gauge(f"password_hash_{key}_total", f"Password hashes {key}.",
+                        [({}, status[key])], kind="counter")
+    for key, help in (("hash", "Time inside bcrypt"), ("wait", "Time queued for a worker")):
+        name = f"password_{key}_seconds"
+        lines += _gauge(
+            name, f"{help} (quantiles over the last 1000 operations).",
+            [({"quantile": q}, status[f"{key}_ms"][p] / 1000) for q, p in (("0.5", "p50"), ("0.95", "p95"), ("1", "max"))],
+            kind="summary"
+        )
+        lines += [f"{name}_sum {status[f'{key}_seconds']}", f"{name}_count {status['completed']}"]
+    return lines
+
+
+def render():
+    lines = REQUESTS.render() + REQUEST_SECONDS.render() + PURCHASES.render()
+    lines += _pool_metrics() + _cache_metrics() + _password_metrics()
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,34 @@
+-- Adds the seat_inventory counters used by the purchase engine
+-- and backfills them from existing flights and tickets.
+USE air_reservation;
+
+CREATE TABLE IF NOT EXISTS seat_inventory (
+    airline_name VARCHAR(50) NOT NULL,
+    flight_num VARCHAR(15) NOT NULL,
+    seat_class VARCHAR(50) NOT NULL,
+    capacity INT NOT NULL,
+    seats_remaining INT NOT NULL CHECK (seats_remaining >= 0),
+    PRIMARY KEY (airline_name, flight_num, seat_class),
+    FOREIGN KEY (airline_name, flight_num) REFERENCES flight(airline_name, flight_num)
+        ON DELETE CASCADE
+);
+
+INSERT INTO seat_inventory (airline_name, flight_num, seat_class, capacity, seats_remaining)
+SELECT
+    F.airline_name,
+    F.flight_num,
+    S.class,
+    S.capacity,
+    GREATEST(S.capacity - (
+        SELECT COUNT(*) FROM ticket T
+        WHERE T.airline_name = F.airline_name
+          AND T.flight_num = F.flight_num
+          AND T.seat_class = S.class
+    ), 0)
+FROM flight F
+JOIN seat_class S
+    ON S.airline_name = F.airline_name
+   AND S.airplane_id = F.airplane_id
+ON DUPLICATE KEY UPDATE
+    capacity = VALUES(capacity),
+    seats_remaining = VALUES(seats_remaining);
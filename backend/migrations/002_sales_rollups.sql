@@ -0,0 +1,28 @@
+-- Adds the daily sales rollup tables used by /staff/analytics.
+-- Backfill afterwards with: python -m backend.rollups rebuild
+USE air_reservation;
+
+CREATE TABLE IF NOT EXISTS sales_agent_daily (
+    airline_name VARCHAR(50) NOT NULL,
+    sale_date DATE NOT NULL,
+    agent_email VARCHAR(50) NOT NULL DEFAULT '',
+    tickets INT NOT NULL DEFAULT 0,
+    revenue DECIMAL(14,2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (airline_name, sale_date, agent_email)
+);
+
+CREATE TABLE IF NOT EXISTS sales_destination_daily (
+    airline_name VARCHAR(50) NOT NULL,
+    sale_date DATE NOT NULL,
+    destination_city VARCHAR(50) NOT NULL,
+    tickets INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (airline_name, sale_date, destination_city)
+);
+
+CREATE TABLE IF NOT EXISTS sales_customer_daily (
+    airline_name VARCHAR(50) NOT NULL,
+    sale_date DATE NOT NULL,
+    customer_email VARCHAR(50) NOT NULL,
+    tickets INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (airline_name, sale_date, customer_email)
+);
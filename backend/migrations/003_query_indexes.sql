@@ -0,0 +1,23 @@
+-- Secondary indexes for the WHERE / JOIN / ORDER BY columns the routes use.
+-- Check plans afterwards with: python -m backend.explain
+--
+-- Existing databases keep the single-column indexes InnoDB created for the
+-- foreign keys; the composite ones below start with the same column, so
+-- those can be dropped later if write overhead matters.
+USE air_reservation;
+
+-- /flights/search: departure_airport IN (...) AND departure_time >= NOW()
+CREATE INDEX idx_flight_departure ON flight (departure_airport, departure_time);
+CREATE INDEX idx_flight_arrival ON flight (arrival_airport, departure_time);
+
+-- Staff flights / dashboard: one airline's flights by date and by status
+CREATE INDEX idx_flight_airline_time ON flight (airline_name, departure_time);
+CREATE INDEX idx_flight_airline_status ON flight (airline_name, status);
+
+-- Tickets of one flight and seat class
+CREATE INDEX idx_ticket_flight_class ON ticket (airline_name, flight_num, seat_class);
+
+-- Customer history / spending, agent dashboard / analytics, date-range rollups
+CREATE INDEX idx_purchase_customer_date ON purchase (customer_email, purchase_date);
+CREATE INDEX idx_purchase_agent_date ON purchase (agent_email, purchase_date);
+CREATE INDEX idx_purchase_date ON purchase (purchase_date);
@@ -0,0 +1,25 @@
+-- Adds the denormalized flight_search table read by /flights/search.
+-- Backfill afterwards with: python -m backend.flight_search rebuild
+USE air_reservation;
+
+CREATE TABLE IF NOT EXISTS flight_search (
+    airline_name VARCHAR(50) NOT NULL,
+    flight_num VARCHAR(15) NOT NULL,
+    airplane_id VARCHAR(15) NOT NULL,
+    departure_airport VARCHAR(50) NOT NULL,
+    arrival_airport VARCHAR(50) NOT NULL,
+    depart_city VARCHAR(50) NOT NULL,
+    arrive_city VARCHAR(50) NOT NULL,
+    departure_date DATE NOT NULL,
+    departure_time DATETIME NOT NULL,
+    arrival_time DATETIME NOT NULL,
+    status VARCHAR(12),
+    price DECIMAL(10,2) NOT NULL,
+    min_price DECIMAL(10,2),
+    seats_remaining INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (departure_airport, departure_date, arrival_airport, departure_time, airline_name, flight_num),
+    UNIQUE KEY uq_flight_search_flight (airline_name, flight_num),
+    INDEX idx_flight_search_date (departure_date, departure_time),
+    FOREIGN KEY (airline_name, flight_num) REFERENCES flight(airline_name, flight_num)
+        ON DELETE CASCADE
+);
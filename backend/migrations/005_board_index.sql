@@ -0,0 +1,5 @@
+-- Arrivals half of /flights/board/{airport}: arrival_airport = ? AND arrival_time BETWEEN ? AND ?
+-- (departures use the flight_search primary key)
+USE air_reservation;
+
+CREATE INDEX idx_flight_search_arrival ON flight_search (arrival_airport, arrival_time);
@@ -0,0 +1,6 @@
+-- flight.status is nullable, so flight_search.status must be too; with
+-- NOT NULL, refreshing a flight whose status is NULL fails.
+-- Needed only where 004_flight_search.sql was applied before this fix.
+USE air_reservation;
+
+ALTER TABLE flight_search MODIFY status VARCHAR(12);
@@ -0,0 +1,214 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import bcrypt
+from fastapi import HTTPException
+
+from backend import config
+
+# ------------------------------------------
+# Password hashing off the request threads.
+#
+# bcrypt is deliberately slow (~250ms at cost 12), so it runs in a
+# dedicated process pool. The number of hashes in flight is capped at
+# workers + queue; past that, callers get 429 right away. Login and
+# register await the *_async variants, so a queued hash holds no thread
+# of the threadpool that every other endpoint shares.
+# ------------------------------------------
+
+
+def _hash(password, rounds):
+    start = time.perf_counter()
+    hashed = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds)).decode("utf-8")
+    return hashed, time.perf_counter() - start
+
+
+def _check(password, hashed):
+    start = time.perf_counter()
+    ok = bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
+    return ok, time.perf_counter() - start
+
+
+class PasswordHasher:
+    def __init__(self, workers, queue_size, rounds):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.rounds = rounds
+
+        self._executor = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.rehashed = 0
+        self._hash_times = deque(maxlen=1000)   # seconds spent inside bcrypt
+        self._wait_times = deque(maxlen=1000)   # seconds spent queued for a worker
+        self.hash_seconds = 0.0                 # totals since start, over `completed`
+        self.wait_seconds = 0.0
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a process that already runs threads is unsafe
+                self._executor = ProcessPoolExecutor(
+                    self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _submit(self, fn, *args):
+        """Future of (result, seconds in bcrypt); the slot is freed when it finishes."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HTTPException(
+                status_code=429,
+                detail="Too many sign-ins in progress. Please try again.",
+                headers={"Retry-After": "1"}
+            )
+
+        with self._lock:
+            self.in_flight += 1
+        start = time.perf_counter()
+
+        try:
+            future = self._pool().submit(fn, *args)
+        except Exception:
+            with self._lock:
+                self.in_flight -= 1
+            self._slots.release()
+            raise
+
+        future.add_done_callback(lambda done: self._finished(done, start))
+        return future
+
+    def _finished(self, future, start):
+        with self._lock:
+            self.in_flight -= 1
+            if not future.cancelled() and future.exception() is None:
+                _, spent = future.result()
+                waited = time.perf_counter() - start - spent
+                self.completed += 1
+                self.hash_seconds += spent
+                self.wait_seconds += waited
+                self._hash_times.append(spent)
+                self._wait_times.append(waited)
+        self._slots.release()
+
+    def _run(self, fn, *args):
+        result, _ = self._submit(fn, *args).result()
+        return result
+
+    async def _run_async(self, fn, *args):
+        # Waiting on the pool costs no thread, so a login storm cannot
+        # starve the threadpool the sync endpoints run on
+        result, _ = await asyncio.wrap_future(self._submit(fn, *args))
+        return result
+
+    def hash(self, password):
+        return self._run(_hash, password, self.rounds)
+
+    def check(self, password, hashed):
+        return self._run(_check, password, hashed)
+
+    async def hash_async(self, password):
+        return await self._run_async(_hash, password, self.rounds)
+
+    async def check_async(self, password, hashed):
+        return await self._run_async(_check, password, hashed)
+
+    def needs_rehash(self, hashed):
+        """True when a stored hash was made with a different cost factor."""
+        try:
+            return int(hashed.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def rehash(self, password, hashed):
+        """New hash at the configured cost if `hashed` uses another one, else None."""
+        if not self.needs_rehash(hashed):
+            return None
+
+        new_hash = self.hash(password)
+        with self._lock:
+            self.rehashed += 1
+        return new_hash
+
+    async def rehash_async(self, password, hashed):
+        if not self.needs_rehash(hashed):
+            return None
+
+        new_hash = await self.hash_async(password)
+        with self._lock:
+            self.rehashed += 1
+        return new_hash
+
+    def start(self):
+        """Spawn the workers up front so the first login does not pay for it."""
+        pool = self._pool()
+        for _ in range(self.workers):
+            pool.submit(time.perf_counter)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def status(self):
+        with self._lock:
+            hash_times = sorted(self._hash_times)
+            wait_times = sorted(self._wait_times)
+            return {
+                "workers": self.workers,
+                "queue_size": self.queue_size,
+                "rounds": self.rounds,
+                "in_flight": self.in_flight,
+                "queued": max(0, self.in_flight - self.workers),
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "rehashed": self.rehashed,
+                "hash_ms": _percentiles(hash_times),
+                "wait_ms": _percentiles(wait_times),
+                "hash_seconds": round(self.hash_seconds, 3),
+                "wait_seconds": round(self.wait_seconds, 3),
+            }
+
+
+def _percentiles(samples):
+    if not samples:
+        return {"p50": 0.0, "p95": 0.0, "max": 0.0}
+
+    def at(q):
+        return round(samples[min(len(samples) - 1, int(q * len(samples)))] * 1000, 1)
+
+    return {"p50": at(0.50), "p95": at(0.95), "max": round(samples[-1] * 1000, 1)}
+
+
+hasher = PasswordHasher(
+    config.PASSWORD_HASH_WORKERS,
+    config.PASSWORD_HASH_QUEUE,
+    config.BCRYPT_ROUNDS,
+)
+
+
+def hash_password(password: str) -> str:
+    return hasher.hash(password)
+
+
+def check_password(password: str, hashed: str) -> bool:
+    return hasher.check(password, hashed)
+
+
+async def hash_password_async(password: str) -> str:
+    return await hasher.hash_async(password)
+
+
+async def check_password_async(password: str, hashed: str) -> bool:
+    return await hasher.check_async(password, hashed)
@@ -0,0 +1,234 @@
+import logging
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger("backend.pool")
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection frees up within the checkout timeout."""
+
+
+class PooledConnection:
+    """
+    Proxy handed out by ConnectionPool. Behaves like the underlying
+    mysql connection, except close() returns it to the pool.
+    """
+
+    def __init__(self, pool, raw, created_at, tag):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+        self._tag = tag
+        self._checked_out_at = time.monotonic()
+        self._returned = False
+        self._discard = False
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def close(self):
+        if not self._returned:
+            self._returned = True
+            self._pool._release(self)
+
+    def discard(self):
+        """Close the underlying connection on close() instead of reusing it."""
+        self._discard = True
+
+    def __del__(self):
+        # Handler dropped the connection without closing it
+        if not self._returned:
+            self._returned = True
+            self._pool._reclaim_leaked(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of mysql connections.
+
+    - keeps up to `size` idle connections open, and opens up to
+      `max_overflow` extra ones under burst (closed again on return)
+    - checkout waits up to `timeout` seconds, then raises PoolTimeout
+    - connections idle for more than `recycle` seconds are reopened,
+      and ones idle for more than `ping_after` seconds are pinged first
+    - connections held longer than `leak_timeout` seconds, or garbage
+      collected without being returned, are logged with the route tag
+    """
+
+    def __init__(self, connect, size=10, max_overflow=10, timeout=10,
+                 recycle=1800, ping_after=5, leak_timeout=60):
+        self._connect = connect
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_after = ping_after
+        self.leak_timeout = leak_timeout
+
+        self._idle = deque()          # (raw, created_at, returned_at)
+        self._checked_out = {}        # id(proxy) -> [tag, checked_out_at, warned]
+        self._total = 0               # open connections (idle + checked out)
+        self._cond = threading.Condition()
+
+        self.leaks = 0
+        self.timeouts = 0
+        self.recycled = 0
+        self.failed_pings = 0
+
+    # ------------------------------------------
+    # Checkout
+    # ------------------------------------------
+    def get(self, tag=None):
+        deadline = time.monotonic() + self.timeout
+
+        with self._cond:
+            self._report_long_held()
+
+            while True:
+                if self._idle:
+                    raw, created_at, returned_at = self._idle.pop()
+                    break
+
+                if self._total < self.size + self.max_overflow:
+                    self._total += 1
+                    raw = None
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise PoolTimeout(
+                        f"No database connection available within {self.timeout}s "
+                        f"({self._total} open, all checked out)."
+                    )
+                self._cond.wait(remaining)
+
+        # Network work happens outside the lock
+        try:
+            if raw is None:
+                raw, created_at = self._connect(), time.time()
+            else:
+                raw, created_at = self._check_health(raw, created_at, returned_at)
+        except Exception:
+            with self._cond:
+                self._total -= 1
+                self._cond.notify()
+            raise
+
+        proxy = PooledConnection(self, raw, created_at, tag)
+        with self._cond:
+            self._checked_out[id(proxy)] = [tag, proxy._checked_out_at, False]
+        return proxy
+
+    def _check_health(self, raw, created_at, returned_at):
+        idle_for = time.time() - returned_at
+
+        if self.recycle and idle_for > self.recycle:
+            self.recycled += 1
+            self._close_quietly(raw)
+            return self._connect(), time.time()
+
+        if self.ping_after is not None and idle_for > self.ping_after:
+            try:
+                raw.ping(reconnect=False)
+            except Exception:
+                self.failed_pings += 1
+                self._close_quietly(raw)
+                return self._connect(), time.time()
+
+        return raw, created_at
+
+    # ------------------------------------------
+    # Return
+    # ------------------------------------------
+    def _release(self, proxy):
+        raw = proxy._raw
+
+        # Never hand the next caller a half-finished transaction
+        healthy = False
+        if not proxy._discard:
+            try:
+                raw.rollback()
+                healthy = True
+            except Exception:
+                pass
+
+        with self._cond:
+            self._checked_out.pop(id(proxy), None)
+
+            if healthy and len(self._idle) < self.size:
+                self._idle.append((raw, proxy._created_at, time.time()))
+                raw = None
+            else:
+                self._total -= 1
+
+            self._cond.notify()
+
+        if raw is not None:
+            self._close_quietly(raw)
+
+    def _reclaim_leaked(self, proxy):
+        self.leaks += 1
+        held = time.monotonic() - proxy._checked_out_at
+        logger.warning(
+            "Connection leaked by %s: dropped without close() after %.1fs",
+            proxy._tag or "<unknown>", held
+        )
+        self._release(proxy)
+
+    def _report_long_held(self):
+        if not self.leak_timeout:
+            return
+
+        now = time.monotonic()
+        for entry in self._checked_out.values():
+            tag, checked_out_at, warned = entry
+            held = now - checked_out_at
+            if not warned and held > self.leak_timeout:
+                entry[2] = True
+                logger.warning(
+                    "Connection held by %s for %.1fs (possible leak)",
+                    tag or "<unknown>", held
+                )
+
+    # ------------------------------------------
+    # Housekeeping
+    # ------------------------------------------
+    def status(self):
+        with self._cond:
+            return {
+                "size": self.size,
+                "max_overflow": self.max_overflow,
+                "open": self._total,
+                "idle": len(self._idle),
+                "checked_out": len(self._checked_out),
+                "overflow": max(self._total - self.size, 0),
+                "leaks": self.leaks,
+                "timeouts": self.timeouts,
+                "recycled": self.recycled,
+                "failed_pings": self.failed_pings,
+            }
+
+    def dispose(self):
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._total -= len(idle)
+
+        for raw, _, _ in idle:
+            self._close_quietly(raw)
+
+    @staticmethod
+    def _close_quietly(raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
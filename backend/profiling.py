@@ -0,0 +1,296 @@
+"""
+Per-request profiling.
+
+ProfilingMiddleware starts a RequestProfile for every HTTP request and
+keeps it in a context variable. While it is active:
+
+- get_db / get_async_db record how long the pool checkout took
+- connections from backend.db hand out ProfiledCursor, which records
+  each statement (whitespace-normalized SQL), its time and rows
+- the async_db helpers record their statements the same way
+- ProfiledJSONResponse records the time spent rendering the body
+
+The totals go out in a `Server-Timing` header (visible in the browser's
+network panel), and the last PROFILE_HISTORY requests are kept for
+GET /debug/profile, which lists the slowest ones.
+"""
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from fastapi.responses import JSONResponse
+
+from backend import config
+
+# Statements kept per request; the count and total time include the rest
+MAX_QUERIES = 100
+
+_current = ContextVar("request_profile", default=None)
+
+_WHITESPACE = re.compile(r"\s+")
+_PARAM_LIST = re.compile(r"%s(?:\s*,\s*%s)+")
+
+
+def normalize(sql):
+    """One-line SQL with placeholder lists collapsed: IN (%s, %s, %s) -> IN (%s, ...)."""
+    sql = _WHITESPACE.sub(" ", sql).strip()
+    return _PARAM_LIST.sub("%s, ...", sql)
+
+
+def current():
+    """Profile of the request being handled, or None."""
+    return _current.get()
+
+
+class RequestProfile:
+    def __init__(self, method, path):
+        self.method = method
+        self.path = path
+        self.route = None
+        self.started = time.time()
+        self._start = time.perf_counter()
+        self.status = None
+        self.total_ms = None
+        self.acquire_ms = 0.0
+        self.serialize_ms = 0.0
+        self.query_count = 0
+        self.query_ms = 0.0
+        self.queries = []
+
+    def add_query(self, sql, elapsed, rows=0):
+        """Record one statement; returns its entry so fetches can add rows to it."""
+        ms = elapsed * 1000
+        self.query_count += 1
+        self.query_ms += ms
+
+        entry = {"sql": normalize(sql), "ms": ms, "rows": rows}
+        if len(self.queries) < MAX_QUERIES:
+            self.queries.append(entry)
+        return entry
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self._start) * 1000
+
+    def server_timing(self):
+        total = self.elapsed_ms()
+        app = max(total - self.acquire_ms - self.query_ms - self.serialize_ms, 0)
+        return ", ".join([
+            f"acquire;dur={self.acquire_ms:.2f}",
+            f'db;dur={self.query_ms:.2f};desc="{self.query_count} queries"',
+            f"serialize;dur={self.serialize_ms:.2f}",
+            f"app;dur={app:.2f}",
+            f"total;dur={total:.2f}",
+        ])
+
+    def to_dict(self):
+        return {
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status": self.status,
+            "started": self.started,
+            "total_ms": round(self.total_ms, 2),
+            "acquire_ms": round(self.acquire_ms, 2),
+            "db_ms": round(self.query_ms, 2),
+            "serialize_ms": round(self.serialize_ms, 2),
+            "query_count": self.query_count,
+            "queries": [{**q, "ms": round(q["ms"], 2)} for q in self.queries],
+        }
+
+
+class ProfileStore:
+    """The last `size` finished requests."""
+
+    def __init__(self, size):
+        self._recent = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self.recorded = 0
+
+    def add(self, profile):
+        with self._lock:
+            self._recent.append(profile)
+            self.recorded += 1
+
+    def slowest(self, limit):
+        with self._lock:
+            recent = list(self._recent)
+        recent.sort(key=lambda p: p.total_ms, reverse=True)
+        return [p.to_dict() for p in recent[:limit]]
+
+    def clear(self):
+        with self._lock:
+            self._recent.clear()
+
+
+store = ProfileStore(config.PROFILE_HISTORY)
+
+
+# ------------------------------------------
+# Instrumented connection / cursor (backend.db)
+# ------------------------------------------
+
+class ProfiledCursor:
+    """Wraps a mysql cursor; execute/fetch timings and rows go to the profile."""
+
+    def __init__(self, cursor, profile):
+        self._cursor = cursor
+        self._profile = profile
+        self._entry = None
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def _run(self, method, sql, args, kwargs):
+        start = time.perf_counter()
+        try:
+            return method(sql, *args, **kwargs)
+        finally:
+            rows = 0 if sql.lstrip()[:6].upper() == "SELECT" else max(self._cursor.rowcount, 0)
+            self._entry = self._profile.add_query(sql, time.perf_counter() - start, rows)
+
+    def execute(self, sql, *args, **kwargs):
+        return self._run(self._cursor.execute, sql, args, kwargs)
+
+    def executemany(self, sql, *args, **kwargs):
+        return self._run(self._cursor.executemany, sql, args, kwargs)
+
+    def _fetched(self, start, count):
+        elapsed = (time.perf_counter() - start) * 1000
+        self._profile.query_ms += elapsed
+        if self._entry is not None:
+            self._entry["ms"] += elapsed
+            self._entry["rows"] += count
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = self._cursor.fetchone()
+        self._fetched(start, row is not None)
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        start = time.perf_counter()
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        self._fetched(start, len(rows))
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = self._cursor.fetchall()
+        self._fetched(start, len(rows))
+        return rows
+
+    def __iter__(self):
+        # Only rows are counted; time between rows belongs to the caller
+        for row in self._cursor:
+            if self._entry is not None:
+                self._entry["rows"] += 1
+            yield row
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._cursor.close()
+
+
+class ProfiledConnection:
+    """Wraps a pooled connection so cursor() returns ProfiledCursor."""
+
+    def __init__(self, conn, profile):
+        self._conn = conn
+        self._profile = profile
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def cursor(self, *args, **kwargs):
+        return ProfiledCursor(self._conn.cursor(*args, **kwargs), self._profile)
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def instrument(conn):
+    """Profiled view of a backend.db connection when a request is being profiled."""
+    profile = current()
+    return ProfiledConnection(conn, profile) if profile else conn
+
+
+def record_acquire(elapsed):
+    profile = current()
+    if profile:
+        profile.acquire_ms += elapsed * 1000
+
+
+@contextmanager
+def timed_query(sql):
+    """For the async_db helpers: time one statement; set entry["rows"] inside the block."""
+    profile = current()
+    entry = {"rows": 0}
+    start = time.perf_counter()
+    try:
+        yield entry
+    finally:
+        if profile:
+            profile.add_query(sql, time.perf_counter() - start, entry["rows"])
+
+
+# ------------------------------------------
+# Response + middleware
+# ------------------------------------------
+
+class ProfiledJSONResponse(JSONResponse):
+    """JSONResponse that records its render time in the request profile."""
+
+    def render(self, content):
+        start = time.perf_counter()
+        body = self.encode(content)
+
+        profile = current()
+        if profile:
+            profile.serialize_ms += (time.perf_counter() - start) * 1000
+        return body
+
+    def encode(self, content):
+        """Content -> body bytes; subclasses swap the encoder here."""
+        return super().render(content)
+
+
+class ProfilingMiddleware:
+    """ASGI middleware: one RequestProfile per HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        profile = RequestProfile(scope["method"], scope["path"])
+        token = _current.set(profile)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", profile.server_timing().encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            route = scope.get("route")
+            profile.route = route.path if route else None
+            profile.total_ms = profile.elapsed_ms()
+            store.add(profile)
@@ -0,0 +1,404 @@
+from fastapi import HTTPException
+
+from backend import async_db, events, flight_search, metrics, refdata, rollups
+from backend.flight_keys import fold
+
+# ------------------------------------------
+# Purchase engine
+#
+# seat_inventory keeps one row per (airline, flight, seat class) with the
+# seats still for sale. A purchase claims a seat with a conditional
+# decrement, which row-locks the counter until commit, so concurrent
+# buyers of the same class serialize on that row and can never oversell.
+# The capacity check is O(1) no matter how many tickets were sold.
+# ------------------------------------------
+
+RESERVE_SQL = """
+    UPDATE seat_inventory
+    SET seats_remaining = seats_remaining - 1
+    WHERE airline_name=%s AND flight_num=%s AND seat_class=%s
+      AND seats_remaining > 0
+"""
+
+INSERT_TICKET_SQL = """
+    INSERT INTO ticket (seat_class, airplane_id, flight_num, airline_name, price_charged)
+    VALUES (%s, %s, %s, %s, %s)
+"""
+
+INSERT_PURCHASE_SQL = """
+    INSERT INTO purchase (ticket_id, customer_email, agent_email, purchase_date)
+    VALUES (%s, %s, %s, CURDATE())
+"""
+
+# Only used to explain a failed reservation
+INVENTORY_SQL = """
+    SELECT seats_remaining
+    FROM seat_inventory
+    WHERE airline_name=%s AND flight_num=%s AND seat_class=%s
+"""
+
+FLIGHT_EXISTS_SQL = """
+    SELECT 1 AS found FROM flight
+    WHERE airline_name=%s AND flight_num=%s
+"""
+
+# Seeds the counters for a newly created flight
+CREATE_INVENTORY_SQL = """
+    INSERT INTO seat_inventory (airline_name, flight_num, seat_class, capacity, seats_remaining)
+    SELECT airline_name, %s, class, capacity, capacity
+    FROM seat_class
+    WHERE airline_name=%s AND airplane_id=%s
+"""
+
+
+def _reservation_error(inventory, flight_exists, seat_class):
+    if inventory:
+        return HTTPException(400, detail=f"{seat_class} is sold out.")
+    if not flight_exists:
+        return HTTPException(404, detail="Flight not found.")
+    return HTTPException(400, detail="Seat class not available for this airplane.")
+
+
+def _receipt(ticket_id, price):
+    return {
+        "message": "Ticket purchased successfully.",
+        "ticket_id": ticket_id,
+        "price_charged": float(price)
+    }
+
+
+def purchase_seat(conn, customer_email, agent_email, airline_name, flight_num, seat_class):
+    """Sell one seat in a single short transaction. Raises HTTPException on failure."""
+    cursor = conn.cursor(dictionary=True)
+
+    try:
+        # 1️⃣ Claim a seat (row lock held until commit)
+        cursor.execute(RESERVE_SQL, (airline_name, flight_num, seat_class))
+
+        if cursor.rowcount != 1:
+            cursor.execute(INVENTORY_SQL, (airline_name, flight_num, seat_class))
+            inventory = cursor.fetchone()
+            cursor.execute(FLIGHT_EXISTS_SQL, (airline_name, flight_num))
+            flight_exists = cursor.fetchone()
+            metrics.record_purchase(airline_name, "soldout" if inventory else "error")
+            raise _reservation_error(inventory, flight_exists, seat_class)
+
+        # 2️⃣ Airplane + final price (reference data cache)
+        row = refdata.flight_price(conn, airline_name, flight_num, seat_class)
+        if row is None:
+            metrics.record_purchase(airline_name, "error")
+            raise HTTPException(404, detail="Flight not found.")
+
+        # 3️⃣ Ticket + purchase record
+        cursor.execute(
+            INSERT_TICKET_SQL,
+            (seat_class, row["airplane_id"], flight_num, airline_name, row["price"])
+        )
+        ticket_id = cursor.lastrowid
+
+        cursor.execute(INSERT_PURCHASE_SQL, (ticket_id, customer_email, agent_email))
+
+        conn.commit()
+
+    except HTTPException:
+        conn.rollback()
+        raise
+
+    except Exception as e:
+        conn.rollback()
+        metrics.record_purchase(airline_name, "error")
+        raise HTTPException(400, detail=str(e))
+
+    finally:
+        cursor.close()
+
+    # 4️⃣ Search table seat count + analytics rollups, after the seat lock is released.
+    #    The sale is committed: these log their own failures and never raise.
+    flight_search.claim_seats(conn, [(1, airline_name, flight_num)])
+    rollups.record_sales(
+        conn,
+        [(airline_name, agent_email, customer_email, row["arrival_city"], row["price"])]
+    )
+    events.publish("tickets_purchased", sales=[(airline_name, agent_email, customer_email)])
+    return _receipt(ticket_id, row["price"])
+
+
+async def purchase_seat_async(conn, customer_email, agent_email, airline_name, flight_num, seat_class):
+    """Async counterpart of purchase_seat for the aiomysql path."""
+    try:
+        reserved, _ = await async_db.execute(conn, RESERVE_SQL, (airline_name, flight_num, seat_class))
+
+        if reserved != 1:
+            inventory = await async_db.fetchone(conn, INVENTORY_SQL, (airline_name, flight_num, seat_class))
+            flight_exists = await async_db.fetchone(conn, FLIGHT_EXISTS_SQL, (airline_name, flight_num))
+            metrics.record_purchase(airline_name, "soldout" if inventory else "error")
+            raise _reservation_error(inventory, flight_exists, seat_class)
+
+        row = await refdata.flight_price_async(conn, airline_name, flight_num, seat_class)
+        if row is None:
+            metrics.record_purchase(airline_name, "error")
+            raise HTTPException(404, detail="Flight not found.")
+
+        _, ticket_id = await async_db.execute(
+            conn,
+            INSERT_TICKET_SQL,
+            (seat_class, row["airplane_id"], flight_num, airline_name, row["price"])
+        )
+        await async_db.execute(conn, INSERT_PURCHASE_SQL, (ticket_id, customer_email, agent_email))
+
+        await conn.commit()
+
+    except HTTPException:
+        await conn.rollback()
+        raise
+
+    except Exception as e:
+        await conn.rollback()
+        metrics.record_purchase(airline_name, "error")
+        raise HTTPException(400, detail=str(e))
+
+    await flight_search.claim_seats_async(conn, [(1, airline_name, flight_num)])
+    await rollups.record_sales_async(
+        conn,
+        [(airline_name, agent_email, customer_email, row["arrival_city"], row["price"])]
+    )
+    events.publish("tickets_purchased", sales=[(airline_name, agent_email, customer_email)])
+    return _receipt(ticket_id, row["price"])
+
+
+# ------------------------------------------
+# Group purchases
+# ------------------------------------------
+
+MAX_BATCH_ITEMS = 500
+
+BATCH_FIELDS = ("customer_email", "airline_name", "flight_num", "seat_class")
+
+
+def _lock_inventory_sql(group_count):
+    keys = ", ".join(["(%s, %s, %s)"] * group_count)
+    return f"""
+        SELECT
+            I.airline_name, I.flight_num, I.seat_class, I.seats_remaining,
+            F.airplane_id, ROUND(F.price * S.price_factor, 2) AS price,
+            A.city AS arrival_city
+        FROM seat_inventory I
+        JOIN flight F
+            ON F.airline_name = I.airline_name
+           AND F.flight_num = I.flight_num
+        JOIN seat_class S
+            ON S.airline_name = F.airline_name
+           AND S.airplane_id = F.airplane_id
+           AND S.class = I.seat_class
+        JOIN airport A ON A.name = F.arrival_airport
+        WHERE (I.airline_name, I.flight_num, I.seat_class) IN ({keys})
+        FOR UPDATE OF I
+    """
+
+
+CLAIM_SEATS_SQL = """
+    UPDATE seat_inventory
+    SET seats_remaining = seats_remaining - %s
+    WHERE airline_name=%s AND flight_num=%s AND seat_class=%s
+"""
+
+
+def purchase_batch(conn, items, agent_email=None, all_or_nothing=False):
+    """
+    Sell seats for many passengers in one transaction.
+
+    Capacity is checked once per (airline, flight, seat class) under a row
+    lock, and purchases are written with a multi-row insert.
+    Returns one result per item, in input order.
+    """
+    try:
+        results = _sell_batch(conn, items, agent_email, all_or_nothing)
+    except HTTPException:
+        for item in items:
+            metrics.record_purchase(_item_airline(item), "error")
+        raise
+
+    # Successes are counted from the tickets_purchased event
+    for item, result in zip(items, results):
+        if not result["success"]:
+            outcome = "soldout" if result["detail"].endswith("sold out.") else "error"
+            metrics.record_purchase(_item_airline(item), outcome)
+    return results
+
+
+def _item_airline(item):
+    return item.get("airline_name") if isinstance(item, dict) else None
+
+
+def _sell_batch(conn, items, agent_email, all_or_nothing):
+    results = [None] * len(items)
+    groups = {}     # fold(key) -> (key as first spelled, [item index, ...])
+
+    # 1️⃣ Validate items and group them by seat counter. The counters match
+    #    case-insensitively, so "economy" and "Economy" share one group.
+    for idx, item in enumerate(items):
+        values = [str(item.get(f) or "").strip() for f in BATCH_FIELDS] if isinstance(item, dict) else []
+        if not values or not all(values):
+            results[idx] = {"index": idx, "success": False, "detail": "Missing purchase fields."}
+            continue
+
+        key = tuple(values[1:])
+        groups.setdefault(fold(key), (key, []))[1].append(idx)
+
+    if not groups:
+        return results
+
+    cursor = conn.cursor(dictionary=True)
+
+    try:
+        # 2️⃣ Lock every counter involved + read prices in one query
+        params = [v for key, _ in groups.values() for v in key]
+        cursor.execute(_lock_inventory_sql(len(groups)), params)
+        inventory = {
+            fold((r["airline_name"], r["flight_num"], r["seat_class"])): r
+            for r in cursor.fetchall()
+        }
+
+        # 3️⃣ Decide who gets a seat
+        claims = []
+        ticket_rows = []
+        sold_items = []
+
+        for folded, (key, indexes) in groups.items():
+            row = inventory.get(folded)
+
+            if not row:
+                for idx in indexes:
+                    results[idx] = {
+                        "index": idx, "success": False,
+                        "detail": "Flight or seat class not found."
+                    }
+                continue
+
+            # Write the stored spelling, as single-seat purchases do via the UPDATE
+            airline_name, flight_num, seat_class = row["airline_name"], row["flight_num"], row["seat_class"]
+            granted = indexes[:row["seats_remaining"]]
+            for idx in indexes[len(granted):]:
+                results[idx] = {"index": idx, "success": False, "detail": f"{key[2]} is sold out."}
+
+            if granted:
+                claims.append((len(granted), airline_name, flight_num, seat_class))
+
+            for idx in granted:
+                ticket_rows.append((seat_class, row["airplane_id"], flight_num, airline_name, row["price"]))
+                sold_items.append((idx, row))
+
+        if all_or_nothing and len(sold_items) < len(items):
+            conn.rollback()
+            for idx, _ in sold_items:
+                results[idx] = {"index": idx, "success": False, "detail": "Not purchased: another item failed."}
+            return results
+
+        if not sold_items:
+            conn.rollback()
+            return results
+
+        # 4️⃣ Claim seats, one UPDATE per counter
+        cursor.executemany(CLAIM_SEATS_SQL, claims)
+
+        # 5️⃣ Tickets one row at a time: with innodb_autoinc_lock_mode=2 a
+        #    multi-row INSERT's ids need not be consecutive, so each id comes
+        #    from its own lastrowid. Purchases still go in one multi-row INSERT.
+        purchase_rows = []
+        sales = []
+        for ticket_row, (idx, row) in zip(ticket_rows, sold_items):
+            cursor.execute(INSERT_TICKET_SQL, ticket_row)
+            ticket_id = cursor.lastrowid
+            customer_email = str(items[idx]["customer_email"]).strip()
+            item_agent = items[idx].get("agent_email") or agent_email
+
+            purchase_rows.append((ticket_id, customer_email, item_agent))
+            sales.append((row["airline_name"], item_agent, customer_email, row["arrival_city"], row["price"]))
+            results[idx] = {"index": idx, "success": True, **_receipt(ticket_id, row["price"])}
+
+        cursor.executemany(INSERT_PURCHASE_SQL, purchase_rows)
+        conn.commit()
+
+    except Exception as e:
+        conn.rollback()
+        raise HTTPException(400, detail=str(e))
+
+    finally:
+        cursor.close()
+
+    # 6️⃣ Search table seat counts + analytics rollups, after the seat locks are released
+    per_flight = {}
+    for seats, airline_name, flight_num, _ in claims:
+        per_flight[(airline_name, flight_num)] = per_flight.get((airline_name, flight_num), 0) + seats
+    flight_search.claim_seats(conn, [(n, a, f) for (a, f), n in per_flight.items()])
+    rollups.record_sales(conn, sales)
+    events.publish("tickets_purchased", sales=[sale[:3] for sale in sales])
+    return results
+
+
+# ------------------------------------------
+# Seat availability for many flights
+# ------------------------------------------
+
+MAX_AVAILABILITY_FLIGHTS = 200
+
+
+def _availability_sql(flight_count):
+    keys = ", ".join(["(%s, %s)"] * flight_count)
+    return f"""
+        SELECT
+            I.airline_name, I.flight_num, I.seat_class, I.capacity,
+            I.capacity - I.seats_remaining AS sold, I.seats_remaining AS remaining,
+            S.price_factor, ROUND(F.price * S.price_factor, 2) AS price
+        FROM seat_inventory I
+        JOIN flight F
+            ON F.airline_name = I.airline_name
+           AND F.flight_num = I.flight_num
+        JOIN seat_class S
+            ON S.airline_name = F.airline_name
+           AND S.airplane_id = F.airplane_id
+           AND S.class = I.seat_class
+        WHERE (I.airline_name, I.flight_num) IN ({keys})
+        ORDER BY S.price_factor
+    """
+
+
+def _group_availability(keys, rows):
+    # Rows carry the stored spelling; the IN list matched case-insensitively
+    classes = {}
+    for row in rows:
+        classes.setdefault(fold((row["airline_name"], row["flight_num"])), []).append({
+            "seat_class": row["seat_class"],
+            "capacity": row["capacity"],
+            "sold": int(row["sold"]),
+            "remaining": row["remaining"],
+            "price_factor": float(row["price_factor"]),
+            "price": float(row["price"]),
+        })
+    return {key: classes.get(fold(key), []) for key in keys}
+
+
+def seat_availability(conn, keys):
+    """
+    {(airline_name, flight_num): [seat class rows]} for every key, in one query.
+    Unknown flights map to an empty list.
+    """
+    keys = list(dict.fromkeys(keys))
+    if not keys:
+        return {}
+
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(_availability_sql(len(keys)), [v for key in keys for v in key])
+        return _group_availability(keys, cursor.fetchall())
+    finally:
+        cursor.close()
+
+
+async def seat_availability_async(conn, keys):
+    keys = list(dict.fromkeys(keys))
+    if not keys:
+        return {}
+
+    rows = await async_db.fetchall(conn, _availability_sql(len(keys)), [v for key in keys for v in key])
+    return _group_availability(keys, rows)
@@ -0,0 +1,68 @@
+# ------------------------------------------
+# Shared SQL for queries over purchase / ticket / flight.
+#
+# A flight is identified by (airline_name, flight_num). Flight numbers
+# repeat across airlines, so joining ticket to flight on flight_num
+# alone matches every airline's flight with that number and multiplies
+# the rows. Routes build their purchase queries from the joins below
+# so the composite key is always used.
+# ------------------------------------------
+
+JOIN_TICKET = "JOIN ticket T ON P.ticket_id = T.ticket_id"
+
+JOIN_FLIGHT = """JOIN flight F
+    ON T.airline_name = F.airline_name
+   AND T.flight_num = F.flight_num"""
+
+LEFT_JOIN_FLIGHT = "LEFT " + JOIN_FLIGHT
+
+JOIN_CUSTOMER = "JOIN customer C ON P.customer_email = C.email"
+
+# One row of a customer's trip list (dashboard, flights page, staff lookup)
+TRIP_COLUMNS = (
+    "T.ticket_id",
+    "F.flight_num",
+    "F.airline_name",
+    "F.departure_airport",
+    "F.arrival_airport",
+    "F.departure_time",
+    "F.arrival_time",
+    "F.status",
+    "T.seat_class",
+    "T.price_charged",
+    "P.purchase_date",
+)
+
+# One row of an agent's sold-tickets list
+AGENT_TICKET_COLUMNS = (
+    "T.ticket_id",
+    "C.name AS customer_name",
+    "F.airline_name",
+    "F.flight_num",
+    "F.departure_airport AS from_airport",
+    "F.arrival_airport AS to_airport",
+    "F.departure_time",
+    "F.arrival_time",
+    "T.price_charged",
+)
+
+
+def purchases(columns, where, joins=(JOIN_TICKET, JOIN_FLIGHT), group_by=None, order_by=None, limit=None):
+    """
+    SELECT <columns> FROM purchase P <joins> WHERE <where AND ...> [GROUP BY] [ORDER BY] [LIMIT].
+
+    Without group_by/order_by/limit the result ends in the WHERE clause,
+    so callers can append further "AND ..." conditions.
+    """
+    sql = "\nSELECT\n    " + ",\n    ".join(columns)
+    sql += "\nFROM purchase P\n" + "\n".join(joins)
+    sql += "\nWHERE " + "\n  AND ".join(where)
+
+    if group_by:
+        sql += f"\nGROUP BY {group_by}"
+    if order_by:
+        sql += f"\nORDER BY {order_by}"
+    if limit:
+        sql += f"\nLIMIT {limit}"
+
+    return sql + "\n"
@@ -0,0 +1,140 @@
+from backend import async_db, config, events
+from backend.cache import TTLCache
+
+# ------------------------------------------
+# Reference data that changes a few times a day, cached per process.
+# Staff writes fire the events below, which drop the affected entries;
+# the TTL bounds staleness across multiple worker processes.
+# ------------------------------------------
+
+airlines_cache = TTLCache("airlines", config.REFDATA_CACHE_TTL, 1)
+airports_cache = TTLCache("airports", config.REFDATA_CACHE_TTL, 1)
+airplanes_cache = TTLCache("airplanes", config.REFDATA_CACHE_TTL, config.REFDATA_CACHE_SIZE)
+seat_classes_cache = TTLCache("seat_classes", config.REFDATA_CACHE_TTL, config.REFDATA_CACHE_SIZE)
+prices_cache = TTLCache("flight_prices", config.REFDATA_CACHE_TTL, config.REFDATA_CACHE_SIZE)
+
+AIRPLANE_EXISTS_SQL = """
+    SELECT 1 AS found FROM airplane
+    WHERE airline_name=%s AND airplane_id=%s
+"""
+
+SEAT_CLASSES_SQL = """
+    SELECT class, capacity, price_factor
+    FROM seat_class
+    WHERE airline_name=%s AND airplane_id=%s
+"""
+
+# Airplane, final price and destination for one seat class of a flight
+PRICE_SQL = """
+    SELECT
+        F.airplane_id,
+        ROUND(F.price * S.price_factor, 2) AS price,
+        A.city AS arrival_city
+    FROM flight F
+    JOIN seat_class S
+        ON S.airline_name = F.airline_name
+       AND S.airplane_id = F.airplane_id
+       AND S.class = %s
+    JOIN airport A ON A.name = F.arrival_airport
+    WHERE F.airline_name=%s AND F.flight_num=%s
+"""
+
+
+def _fetchall(conn, sql, params=()):
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def _fetchone(conn, sql, params=()):
+    rows = _fetchall(conn, sql, params)
+    return rows[0] if rows else None
+
+
+def airlines(conn):
+    return airlines_cache.get_or_load(
+        "all",
+        lambda: [a["name"] for a in _fetchall(conn, "SELECT name FROM airline")]
+    )
+
+
+def airports(conn):
+    return airports_cache.get_or_load(
+        "all",
+        lambda: _fetchall(conn, "SELECT name, city FROM airport")
+    )
+
+
+async def airports_async(conn):
+    return await airports_cache.get_or_load_async(
+        "all",
+        lambda: async_db.fetchall(conn, "SELECT name, city FROM airport")
+    )
+
+
+def airplanes(conn, airline):
+    return airplanes_cache.get_or_load(
+        airline,
+        lambda: _fetchall(conn, "SELECT airplane_id FROM airplane WHERE airline_name=%s", (airline,))
+    )
+
+
+def seat_classes(conn, airline, airplane_id):
+    """Seat classes of an airplane, or None if the airplane does not exist."""
+    def load():
+        if not _fetchone(conn, AIRPLANE_EXISTS_SQL, (airline, airplane_id)):
+            return None
+        return _fetchall(conn, SEAT_CLASSES_SQL, (airline, airplane_id))
+
+    return seat_classes_cache.get_or_load((airline, airplane_id), load)
+
+
+def flight_price(conn, airline, flight_num, seat_class):
+    """{"airplane_id", "price", "arrival_city"} for a seat class on a flight, or None."""
+    return prices_cache.get_or_load(
+        (airline, flight_num, seat_class),
+        lambda: _fetchone(conn, PRICE_SQL, (seat_class, airline, flight_num))
+    )
+
+
+async def flight_price_async(conn, airline, flight_num, seat_class):
+    return await prices_cache.get_or_load_async(
+        (airline, flight_num, seat_class),
+        lambda: async_db.fetchone(conn, PRICE_SQL, (seat_class, airline, flight_num))
+    )
+
+
+# ------------------------------------------
+# Invalidation hooks
+# ------------------------------------------
+@events.subscribe("airport_added")
+def _on_airport_added(name, city):
+    airports_cache.clear()
+
+
+@events.subscribe("airplane_added")
+def _on_airplane_added(airline_name, airplane_id):
+    airplanes_cache.invalidate(airline_name)
+    seat_classes_cache.invalidate((airline_name, airplane_id))
+
+
+@events.subscribe("airplanes_added")
+def _on_airplanes_added(airline_name, airplane_ids):
+    airplanes_cache.invalidate(airline_name)
+    for airplane_id in airplane_ids:
+        seat_classes_cache.invalidate((airline_name, airplane_id))
+
+
+@events.subscribe("flight_created")
+def _on_flight_created(airline_name, flight_num):
+    prices_cache.invalidate_where(lambda key, _: key[:2] == (airline_name, flight_num))
+
+
+@events.subscribe("flights_created")
+def _on_flights_created(airline_name, flight_nums):
+    created = set(flight_nums)
+    prices_cache.invalidate_where(lambda key, _: key[0] == airline_name and key[1] in created)
+
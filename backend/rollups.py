@@ -0,0 +1,186 @@
+"""
+Daily sales rollups behind the staff analytics page.
+
+Each committed purchase adds to three small aggregate tables, keyed by
+airline and day, so analytics reads pre-aggregated rows instead of
+scanning purchase x ticket x flight x airport:
+
+    sales_agent_daily        (airline, day, agent)        tickets, revenue
+    sales_destination_daily  (airline, day, destination)  tickets
+    sales_customer_daily     (airline, day, customer)     tickets
+
+Direct (non-agent) sales use agent_email = '', so every direct sale of
+an airline on a day hits the same row. The upserts therefore run after
+the purchase commits, in a short transaction of their own: the hot row
+is locked for three statements, never while seat_inventory is. Rows are
+upserted in key order so two concurrent batches cannot deadlock. If an
+upsert fails the sale still stands and the error is logged; a rebuild
+repairs the day. With ROLLUPS_INLINE=0 the purchase path skips the
+upserts and this module is run periodically:
+
+    python -m backend.rollups rebuild --days 2
+"""
+import argparse
+import logging
+from collections import Counter
+from datetime import date, timedelta
+
+from backend import async_db, config
+
+logger = logging.getLogger("backend.rollups")
+
+UPSERT_AGENT_SQL = """
+    INSERT INTO sales_agent_daily (airline_name, sale_date, agent_email, tickets, revenue)
+    VALUES (%s, CURDATE(), %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        tickets = tickets + VALUES(tickets),
+        revenue = revenue + VALUES(revenue)
+"""
+
+UPSERT_DESTINATION_SQL = """
+    INSERT INTO sales_destination_daily (airline_name, sale_date, destination_city, tickets)
+    VALUES (%s, CURDATE(), %s, %s)
+    ON DUPLICATE KEY UPDATE tickets = tickets + VALUES(tickets)
+"""
+
+UPSERT_CUSTOMER_SQL = """
+    INSERT INTO sales_customer_daily (airline_name, sale_date, customer_email, tickets)
+    VALUES (%s, CURDATE(), %s, %s)
+    ON DUPLICATE KEY UPDATE tickets = tickets + VALUES(tickets)
+"""
+
+# Full recomputation from the raw tables (backfill / periodic job)
+REBUILD_SQL = {
+    "sales_agent_daily": """
+        INSERT INTO sales_agent_daily (airline_name, sale_date, agent_email, tickets, revenue)
+        SELECT T.airline_name, P.purchase_date, COALESCE(P.agent_email, ''),
+               COUNT(*), SUM(T.price_charged)
+        FROM purchase P
+        JOIN ticket T ON P.ticket_id = T.ticket_id
+        WHERE P.purchase_date >= %s
+        GROUP BY T.airline_name, P.purchase_date, COALESCE(P.agent_email, '')
+    """,
+    "sales_destination_daily": """
+        INSERT INTO sales_destination_daily (airline_name, sale_date, destination_city, tickets)
+        SELECT T.airline_name, P.purchase_date, A.city, COUNT(*)
+        FROM purchase P
+        JOIN ticket T ON P.ticket_id = T.ticket_id
+        JOIN flight F
+            ON T.flight_num = F.flight_num
+           AND T.airline_name = F.airline_name
+        JOIN airport A ON F.arrival_airport = A.name
+        WHERE P.purchase_date >= %s
+        GROUP BY T.airline_name, P.purchase_date, A.city
+    """,
+    "sales_customer_daily": """
+        INSERT INTO sales_customer_daily (airline_name, sale_date, customer_email, tickets)
+        SELECT T.airline_name, P.purchase_date, P.customer_email, COUNT(*)
+        FROM purchase P
+        JOIN ticket T ON P.ticket_id = T.ticket_id
+        WHERE P.purchase_date >= %s
+        GROUP BY T.airline_name, P.purchase_date, P.customer_email
+    """,
+}
+
+
+def _aggregate(sales):
+    """
+    sales: iterable of (airline, agent_email, customer_email, destination_city, price)
+    Returns the parameter rows for the three upserts, sorted by key so
+    every transaction locks rollup rows in the same order.
+    """
+    agents, revenue = Counter(), Counter()
+    destinations, customers = Counter(), Counter()
+
+    for airline, agent_email, customer_email, city, price in sales:
+        agent_key = (airline, agent_email or "")
+        agents[agent_key] += 1
+        revenue[agent_key] += price
+        destinations[(airline, city)] += 1
+        customers[(airline, customer_email)] += 1
+
+    return (
+        [(a, e, n, revenue[(a, e)]) for (a, e), n in sorted(agents.items())],
+        [(a, c, n) for (a, c), n in sorted(destinations.items())],
+        [(a, c, n) for (a, c), n in sorted(customers.items())],
+    )
+
+
+def record_sales(conn, sales):
+    """Add committed purchases to today's rollups, in their own short transaction."""
+    if not config.ROLLUPS_INLINE:
+        return
+
+    agent_rows, destination_rows, customer_rows = _aggregate(sales)
+    cursor = None
+
+    try:
+        cursor = conn.cursor()
+        cursor.executemany(UPSERT_AGENT_SQL, agent_rows)
+        cursor.executemany(UPSERT_DESTINATION_SQL, destination_rows)
+        cursor.executemany(UPSERT_CUSTOMER_SQL, customer_rows)
+        conn.commit()
+
+    except Exception:
+        # The sale is already committed; never fail it over analytics
+        conn.rollback()
+        logger.exception("Rollup update failed; run `python -m backend.rollups rebuild --days 1`")
+
+    finally:
+        if cursor is not None:
+            cursor.close()
+
+
+async def record_sales_async(conn, sales):
+    if not config.ROLLUPS_INLINE:
+        return
+
+    agent_rows, destination_rows, customer_rows = _aggregate(sales)
+
+    try:
+        await async_db.executemany(conn, UPSERT_AGENT_SQL, agent_rows)
+        await async_db.executemany(conn, UPSERT_DESTINATION_SQL, destination_rows)
+        await async_db.executemany(conn, UPSERT_CUSTOMER_SQL, customer_rows)
+        await conn.commit()
+
+    except Exception:
+        await conn.rollback()
+        logger.exception("Rollup update failed; run `python -m backend.rollups rebuild --days 1`")
+
+
+def rebuild(conn, since=None):
+    """Recompute rollups for sale dates >= since (default: all history)."""
+    since = since or date(1970, 1, 1)
+    cursor = conn.cursor()
+
+    try:
+        for table, sql in REBUILD_SQL.items():
+            cursor.execute(f"DELETE FROM {table} WHERE sale_date >= %s", (since,))
+            cursor.execute(sql, (since,))
+        conn.commit()
+
+    except Exception:
+        conn.rollback()
+        raise
+
+    finally:
+        cursor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the sales rollup tables.")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.add_argument("--days", type=int, help="only rebuild the last N days (default: everything)")
+    args = parser.parse_args()
+
+    from backend.db import db_connection
+
+    since = date.today() - timedelta(days=args.days) if args.days else None
+    with db_connection("rollups:rebuild") as conn:
+        rebuild(conn, since)
+
+    print(f"Rollups rebuilt since {since or 'the beginning'}.")
+
+
+if __name__ == "__main__":
+    main()
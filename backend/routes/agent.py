@@ -1,12 +1,19 @@
-from fastapi import APIRouter, HTTPException
-from backend.db import get_connection
-from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query
+from backend.dashboards import dashboard_cache
+from backend.db import get_db
+from backend.history import history_response, wants_paging
+from backend.queries import (
+    AGENT_TICKET_COLUMNS, JOIN_CUSTOMER, JOIN_FLIGHT, JOIN_TICKET, LEFT_JOIN_FLIGHT, purchases
+)
+from backend.responses import FastJSONResponse, fetch_rows
+from calendar import monthrange
+from collections import Counter
+from datetime import datetime, time, timedelta
+from decimal import Decimal
 
 router = APIRouter(prefix="/agent", tags=["agent"])
 
-@router.get("/dashboard/{email}")
-def agent_dashboard(email: str):
-    conn = get_connection()
+def _load_dashboard(conn, email):
     cursor = conn.cursor(dictionary=True)
 
     # 30-day window
@@ -27,7 +34,6 @@ def agent_dashboard(email: str):
     row = cursor.fetchone()
 
     cursor.close()
-    conn.close()
 
     return {
         "tickets_sold": row["tickets_sold"] or 0,
@@ -35,160 +41,138 @@ def agent_dashboard(email: str):
         "avg_commission": float(row["avg_commission"] or 0)
     }
 
-@router.get("/flights/{email}")
-def agent_flights(email: str):
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
+# Cached until this agent sells another ticket
+@router.get("/dashboard/{email}")
+def agent_dashboard(email: str, conn=Depends(get_db)):
+    return dashboard_cache.get_or_load(("agent", email), lambda: _load_dashboard(conn, email))
 
-    cursor.execute("""
-        SELECT 
-            T.ticket_id,
-            C.name AS customer_name,
-            F.airline_name,
-            F.flight_num,
-            F.departure_airport AS from_airport,
-            F.arrival_airport AS to_airport,
-            F.departure_time,
-            F.arrival_time,
-            T.price_charged
-        FROM purchase P
-        JOIN ticket T ON P.ticket_id = T.ticket_id
-        JOIN flight F ON T.flight_num = F.flight_num
-        JOIN customer C ON P.customer_email = C.email
-        WHERE P.agent_email = %s
-        ORDER BY P.purchase_date DESC
-    """, (email,))
+# Keyset-paged / streamed variant of the flights page (backend/history.py)
+FLIGHT_HISTORY_SQL = purchases(
+    AGENT_TICKET_COLUMNS,
+    ["P.agent_email = %s"],
+    joins=[JOIN_TICKET, JOIN_FLIGHT, JOIN_CUSTOMER]
+)
 
-    flights = cursor.fetchall()
+# With limit/cursor/format: one page ({"flights", "next_cursor"}) or NDJSON
+@router.get("/flights/{email}")
+def agent_flights(
+    email: str,
+    section: str = None,
+    page_cursor: str = Query(None, alias="cursor"),
+    limit: int = None,
+    format: str = "json",
+    conn=Depends(get_db)
+):
+    if wants_paging(limit, page_cursor, format):
+        return history_response(
+            conn, FLIGHT_HISTORY_SQL, (email,), "GET /agent/flights/{email}",
+            section, page_cursor, limit, format
+        )
+
+    cursor = conn.cursor()
+
+    cursor.execute(FLIGHT_HISTORY_SQL + "ORDER BY P.purchase_date DESC", (email,))
+
+    flights = fetch_rows(cursor)
 
     cursor.close()
-    conn.close()
 
-    return {"flights": flights}
+    return FastJSONResponse({"flights": flights})
 
-@router.get("/analytics/{email}")
-def agent_analytics(email: str):
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
+# All of an agent's sales, one row per ticket; every analytics figure is
+# computed from this single result in one pass
+AGENT_SALES_SQL = purchases(
+    ["P.purchase_date", "C.name AS customer_name", "T.price_charged", "F.arrival_airport"],
+    ["P.agent_email = %s"],
+    joins=[JOIN_TICKET, JOIN_CUSTOMER, LEFT_JOIN_FLIGHT]
+)
 
-    now = datetime.now()
-    last_30 = now - timedelta(days=30)
-    last_90 = now - timedelta(days=90)
-    last_year = now - timedelta(days=365)
+COMMISSION_RATE = Decimal("0.10")
 
-    # ------------------------------------------
-    # 1️⃣ Summary (last 30 days)
-    # ------------------------------------------
-    cursor.execute("""
-        SELECT 
-            COUNT(*) AS tickets_sold,
-            SUM(T.price_charged * 0.10) AS total_commission,
-            AVG(T.price_charged * 0.10) AS avg_commission
-        FROM purchase P
-        JOIN ticket T ON P.ticket_id = T.ticket_id
-        WHERE P.agent_email = %s
-          AND P.purchase_date >= %s
-    """, (email, last_30))
-    summary = cursor.fetchone()
 
-    # ------------------------------------------
-    # 2️⃣ Tickets sold per month (last 12 months)
-    # ------------------------------------------
-    cursor.execute("""
-        SELECT 
-            DATE_FORMAT(P.purchase_date, '%Y-%m') AS month,
-            COUNT(*) AS tickets,
-            SUM(T.price_charged * 0.10) AS commission
-        FROM purchase P
-        JOIN ticket T ON P.ticket_id = T.ticket_id
-        WHERE P.agent_email = %s
-          AND P.purchase_date >= DATE_SUB(CURDATE(), INTERVAL 12 MONTH)
-        GROUP BY month
-        ORDER BY month ASC
-    """, (email,))
-    monthly = cursor.fetchall()
-
-    # ------------------------------------------
-    # 3️⃣ Top 5 customers (tickets)
-    # ------------------------------------------
-    cursor.execute("""
-        SELECT 
-            C.name AS customer_name,
-            COUNT(*) AS ticket_count
-        FROM purchase P
-        JOIN customer C ON P.customer_email = C.email
-        WHERE P.agent_email = %s
-        GROUP BY customer_name
-        ORDER BY ticket_count DESC
-        LIMIT 5
-    """, (email,))
-    top_ticket_customers = cursor.fetchall()
-
-    # ------------------------------------------
-    # 4️⃣ Top 5 customers (commission)
-    # ------------------------------------------
-    cursor.execute("""
-        SELECT 
-            C.name AS customer_name,
-            SUM(T.price_charged * 0.10) AS commission_earned
-        FROM purchase P
-        JOIN ticket T ON P.ticket_id = T.ticket_id
-        JOIN customer C ON P.customer_email = C.email
-        WHERE P.agent_email = %s
-        GROUP BY customer_name
-        ORDER BY commission_earned DESC
-        LIMIT 5
-    """, (email,))
-    top_commission_customers = cursor.fetchall()
-
-    # ------------------------------------------
-    # 5️⃣ Top destinations (last 3 months)
-    # ------------------------------------------
-    cursor.execute("""
-        SELECT 
-            F.arrival_airport AS city,
-            COUNT(*) AS count
-        FROM purchase P
-        JOIN ticket T ON P.ticket_id = T.ticket_id
-        JOIN flight F ON T.flight_num = F.flight_num AND T.airline_name = F.airline_name
-        WHERE P.purchase_date >= %s
-          AND P.agent_email = %s
-        GROUP BY city
-        ORDER BY count DESC
-        LIMIT 5
-    """, (last_90, email))
-    top_3m = cursor.fetchall()
-
-    # ------------------------------------------
-    # 6️⃣ Top destinations (last 1 year)
-    # ------------------------------------------
-    cursor.execute("""
-        SELECT 
-            F.arrival_airport AS city,
-            COUNT(*) AS count
-        FROM purchase P
-        JOIN ticket T ON P.ticket_id = T.ticket_id
-        JOIN flight F ON T.flight_num = F.flight_num AND T.airline_name = F.airline_name
-        WHERE P.purchase_date >= %s
-          AND P.agent_email = %s
-        GROUP BY city
-        ORDER BY count DESC
-        LIMIT 5
-    """, (last_year, email))
-    top_year = cursor.fetchall()
+def _on_or_after(day, moment):
+    """SQL semantics of `date_column >= datetime`: the date counts as midnight."""
+    return datetime.combine(day, time()) >= moment
+
+
+def _months_ago(day, months):
+    """DATE_SUB(day, INTERVAL n MONTH): clamps to the end of shorter months."""
+    year, month = divmod(day.year * 12 + day.month - 1 - months, 12)
+    month += 1
+    return day.replace(year=year, month=month, day=min(day.day, monthrange(year, month)[1]))
 
-    cursor.close()
-    conn.close()
+
+def _top(counter, key, label, n=5):
+    rows = sorted(counter.items(), key=lambda kv: kv[1], reverse=True)[:n]
+    return [{key: k, label: v} for k, v in rows]
+
+
+def summarize_agent_sales(rows, now):
+    """
+    Single pass over (purchase_date, customer_name, price_charged, arrival_airport)
+    rows, producing the same figures as the old six per-metric queries.
+    """
+    last_30 = now - timedelta(days=30)
+    last_90 = now - timedelta(days=90)
+    last_year = now - timedelta(days=365)
+    last_12_months = _months_ago(now.date(), 12)
+
+    summary_count = 0
+    summary_commission = Decimal(0)
+    monthly = {}
+    customer_tickets = Counter()
+    customer_commission = Counter()
+    dest_3m = Counter()
+    dest_year = Counter()
+
+    for purchase_date, customer_name, price, arrival_airport in rows:
+        commission = price * COMMISSION_RATE
+
+        customer_tickets[customer_name] += 1
+        customer_commission[customer_name] += commission
+
+        if _on_or_after(purchase_date, last_30):
+            summary_count += 1
+            summary_commission += commission
+
+        if purchase_date >= last_12_months:
+            month = monthly.setdefault(
+                purchase_date.strftime("%Y-%m"),
+                {"tickets": 0, "commission": Decimal(0)}
+            )
+            month["tickets"] += 1
+            month["commission"] += commission
+
+        if arrival_airport is not None and _on_or_after(purchase_date, last_year):
+            dest_year[arrival_airport] += 1
+            if _on_or_after(purchase_date, last_90):
+                dest_3m[arrival_airport] += 1
 
     return {
         "summary": {
-            "tickets_sold": summary["tickets_sold"] or 0,
-            "total_commission": float(summary["total_commission"] or 0),
-            "avg_commission": float(summary["avg_commission"] or 0),
+            "tickets_sold": summary_count,
+            "total_commission": float(summary_commission),
+            "avg_commission": float(summary_commission / summary_count) if summary_count else 0.0,
         },
-        "monthly": monthly,
-        "top_tickets": top_ticket_customers,
-        "top_commission": top_commission_customers,
-        "top_destinations_3m": top_3m,
-        "top_destinations_year": top_year
+        "monthly": [
+            {"month": m, "tickets": v["tickets"], "commission": v["commission"]}
+            for m, v in sorted(monthly.items())
+        ],
+        "top_tickets": _top(customer_tickets, "customer_name", "ticket_count"),
+        "top_commission": _top(customer_commission, "customer_name", "commission_earned"),
+        "top_destinations_3m": _top(dest_3m, "city", "count"),
+        "top_destinations_year": _top(dest_year, "city", "count")
     }
+
+
+@router.get("/analytics/{email}")
+def agent_analytics(email: str, conn=Depends(get_db)):
+    # Plain tuple cursor, rows streamed from the server, not buffered
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute(AGENT_SALES_SQL, (email,))
+        return summarize_agent_sales(cursor, datetime.now())
+
+    finally:
+        cursor.close()
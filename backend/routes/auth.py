@@ -1,18 +1,44 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
+import logging
 import mysql
 from pydantic import BaseModel
-from backend.db import get_connection
+from starlette.concurrency import run_in_threadpool
+from backend import refdata
+from backend.db import get_db
+from backend.passwords import check_password_async, hash_password_async, hasher
+from backend.sessions import issue_token
 
-import bcrypt
 from typing import Optional
 
+logger = logging.getLogger("backend.auth")
+
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+# ------------------------------------------
+# Login and register are async: they await bcrypt in the hashing pool
+# without holding a threadpool thread, and run their (short) queries
+# through run_in_threadpool.
+# ------------------------------------------
+
+def _store_hash(conn, table, email, new_hash):
+    cursor = conn.cursor()
+    cursor.execute(f"UPDATE {table} SET password=%s WHERE email=%s", (new_hash, email))
+    conn.commit()
+    cursor.close()
+
+
+async def upgrade_password_hash(conn, table, email, password, hashed):
+    """After a successful login, re-hash at the configured bcrypt cost if it changed."""
+    try:
+        new_hash = await hasher.rehash_async(password, hashed)
+        if new_hash is None:
+            return
+
+        await run_in_threadpool(_store_hash, conn, table, email, new_hash)
 
-def check_password(password: str, hashed: str) -> bool:
-    return bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
+    except Exception:
+        # Never fail a login over this; it is retried on the next one
+        logger.warning("Could not upgrade password hash for %s", email, exc_info=True)
 
 # Customer
 class CustomerRegister(BaseModel):
@@ -29,14 +55,9 @@ class CustomerRegister(BaseModel):
     passport_country: Optional[str] = None
     date_of_birth: Optional[str] = None
 
-@router.post("/register/customer")
-def register_customer(data: CustomerRegister):
-    conn = get_connection()
+def _insert_customer(conn, data, hashed):
     cursor = conn.cursor()
 
-    # Hash password BEFORE storing
-    hashed = hash_password(data.password)
-
     cursor.execute("""
         INSERT INTO customer (email, name, password, building_number, street, city, state,
                               phone_number, passport_number, passport_expiration_date, 
@@ -59,7 +80,13 @@ def register_customer(data: CustomerRegister):
 
     conn.commit()
     cursor.close()
-    conn.close()
+
+
+@router.post("/register/customer")
+async def register_customer(data: CustomerRegister, conn=Depends(get_db)):
+    # Hash password BEFORE storing
+    hashed = await hash_password_async(data.password)
+    await run_in_threadpool(_insert_customer, conn, data, hashed)
 
     return {
         "role": "customer",
@@ -73,13 +100,9 @@ class AgentRegister(BaseModel):
     email: str
     password: str
 
-@router.post("/register/agent")
-def register_agent(data: AgentRegister):
-    conn = get_connection()
+def _insert_agent(conn, data, hashed):
     cursor = conn.cursor()
 
-    hashed = hash_password(data.password)
-
     cursor.execute("""
         INSERT INTO booking_agent (email, password)
         VALUES (%s, %s)
@@ -87,7 +110,12 @@ def register_agent(data: AgentRegister):
 
     conn.commit()
     cursor.close()
-    conn.close()
+
+
+@router.post("/register/agent")
+async def register_agent(data: AgentRegister, conn=Depends(get_db)):
+    hashed = await hash_password_async(data.password)
+    await run_in_threadpool(_insert_agent, conn, data, hashed)
 
     return {
         "role": "agent",
@@ -105,24 +133,26 @@ class StaffRegister(BaseModel):
     airline_name: str
     permission: str
 
-@router.post("/register/staff")
-def register_staff(data: StaffRegister):
-    conn = get_connection()
+def _insert_staff(conn, data, hashed):
     cursor = conn.cursor()
 
-    hashed = hash_password(data.password)
+    cursor.execute("""
+        INSERT INTO airline_staff (email, password, first_name, last_name, date_of_birth,
+                                airline_name, permission)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+    """, (data.email, hashed, data.first_name, data.last_name,
+        data.date_of_birth, data.airline_name, data.permission))
+
+    conn.commit()
+    cursor.close()
+
+
+@router.post("/register/staff")
+async def register_staff(data: StaffRegister, conn=Depends(get_db)):
+    hashed = await hash_password_async(data.password)
 
     try:
-        cursor.execute("""
-            INSERT INTO airline_staff (email, password, first_name, last_name, date_of_birth,
-                                    airline_name, permission)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-        """, (data.email, hashed, data.first_name, data.last_name,
-            data.date_of_birth, data.airline_name, data.permission))
-
-        conn.commit()
-        cursor.close()
-        conn.close()
+        await run_in_threadpool(_insert_staff, conn, data, hashed)
     except mysql.connector.Error as err:
         if err.errno == 1452:
             raise HTTPException(
@@ -142,8 +172,7 @@ def register_staff(data: StaffRegister):
 
 # Check if email exists for the role to ensure unique
 @router.get("/exists/{role}/{email}")
-def email_exists(role: str, email: str):
-    conn = get_connection()
+def email_exists(role: str, email: str, conn=Depends(get_db)):
     cursor = conn.cursor()
 
     table = {
@@ -156,7 +185,6 @@ def email_exists(role: str, email: str):
     exists = cursor.fetchone() is not None
 
     cursor.close()
-    conn.close()
 
     return {"exists": exists}
 
@@ -166,90 +194,83 @@ class LoginRequest(BaseModel):
     email: str | None = None
     password: str
     role:str
-    
+
+
+LOGIN_SQL = {
+    "customer": "SELECT email, name, password FROM customer WHERE email=%s",
+    "agent": "SELECT email, password FROM booking_agent WHERE email=%s",
+    "staff": "SELECT email, airline_name, permission, password FROM airline_staff WHERE email=%s",
+}
+
+AGENT_AIRLINES_SQL = """
+    SELECT airline_name
+    FROM agent_airline_authorization
+    WHERE agent_email=%s
+"""
+
+
+def _fetch(conn, sql, params, many=False):
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(sql, params)
+        return cursor.fetchall() if many else cursor.fetchone()
+    finally:
+        cursor.close()
+
+
 @router.post("/login")
-def login(data: LoginRequest):
+async def login(data: LoginRequest, conn=Depends(get_db)):
     email = data.email
     password = data.password
     role = data.role
 
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
+    if role not in LOGIN_SQL:
+        raise HTTPException(status_code=400, detail="Invalid role.")
+
+    user = await run_in_threadpool(_fetch, conn, LOGIN_SQL[role], (email,))
+
+    if not user:
+        raise HTTPException(status_code=404, detail="Account does not exist.")
+
+    if not await check_password_async(password, user["password"]):
+        raise HTTPException(status_code=401, detail="Incorrect password.")
 
     if role == "customer":
-        cursor.execute("""
-            SELECT email, name, password
-            FROM customer
-            WHERE email=%s
-        """, (email,))
-        user = cursor.fetchone()
-        
-        if not user:
-            raise HTTPException(status_code=404, detail="Account does not exist.")
-
-        if not check_password(password, user["password"]):
-            raise HTTPException(status_code=401, detail="Incorrect password.")
-
-        return {
+        await upgrade_password_hash(conn, "customer", user["email"], password, user["password"])
+
+        session = {
             "role": "customer",
             "email": user["email"],
             "name": user["name"]
         }
+        return {**session, "token": issue_token(session)}
 
     # AGENT LOGIN
     if role == "agent":
-        cursor.execute("""
-            SELECT email, password
-            FROM booking_agent
-            WHERE email=%s
-        """, (email,))
-        user = cursor.fetchone()
-        
-        if not user:
-            raise HTTPException(status_code=404, detail="Account does not exist.")
-
-        if not check_password(password, user["password"]):
-            raise HTTPException(status_code=401, detail="Incorrect password.")
-
-        return {
+        await upgrade_password_hash(conn, "booking_agent", user["email"], password, user["password"])
+
+        # Authorized airlines go into the token (new ones show up on next login)
+        rows = await run_in_threadpool(_fetch, conn, AGENT_AIRLINES_SQL, (user["email"],), True)
+        airlines = sorted(r["airline_name"] for r in rows)
+
+        session = {
             "role": "agent",
             "email": user["email"]
         }
+        return {**session, "token": issue_token({**session, "airlines": airlines})}
 
     # STAFF LOGIN
-    if role == "staff":
-        cursor.execute("""
-            SELECT email, airline_name, permission, password
-            FROM airline_staff
-            WHERE email=%s
-        """, (email,))
-        user = cursor.fetchone()
-        
-        if not user:
-            raise HTTPException(status_code=404, detail="Account does not exist.")
-
-        if not check_password(password, user["password"]):
-            raise HTTPException(status_code=401, detail="Incorrect password.")
-
-        return {
-            "role": "staff",
-            "email": user["email"],
-            "airline_name": user["airline_name"],
-            "permission": user["permission"]
-        }
+    await upgrade_password_hash(conn, "airline_staff", user["email"], password, user["password"])
 
-    raise HTTPException(status_code=400, detail="Invalid role.")
+    session = {
+        "role": "staff",
+        "email": user["email"],
+        "airline_name": user["airline_name"],
+        "permission": user["permission"]
+    }
+    return {**session, "token": issue_token(session)}
 
 # Get airlines
 @router.get("/airlines")
-def get_airlines():
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
-
-    cursor.execute("SELECT name FROM airline")
-    airlines = cursor.fetchall()
-
-    cursor.close()
-    conn.close()
-
-    return {"airlines": [a["name"] for a in airlines]}
+def get_airlines(conn=Depends(get_db)):
+    return {"airlines": refdata.airlines(conn)}
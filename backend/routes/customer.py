@@ -1,38 +1,26 @@
-from fastapi import APIRouter, HTTPException
-from backend.db import get_connection
+from fastapi import APIRouter, Depends, HTTPException, Query
+from backend import async_db, config
+from backend.async_db import get_async_db
+from backend.dashboards import dashboard_cache
+from backend.db import get_db
+from backend.history import history_response, wants_paging
+from backend.queries import JOIN_TICKET, TRIP_COLUMNS, purchases
+from backend.responses import FastJSONResponse, fetch_rows
 from datetime import datetime, timedelta
 
 router = APIRouter(prefix="/customer", tags=["customer"])
 
 
-# For customer dashboard display
-@router.get("/dashboard/{email}")
-def customer_dashboard(email: str):
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
+DASHBOARD_FLIGHTS_SQL = purchases(TRIP_COLUMNS, ["P.customer_email = %s"])
 
-    # Get next upcoming and last purchase
-    cursor.execute("""
-        SELECT 
-            F.flight_num,
-            F.airline_name,
-            F.departure_airport,
-            F.arrival_airport,
-            F.departure_time,
-            F.arrival_time,
-            F.status,
-            T.seat_class,
-            T.price_charged,
-            P.purchase_date
-        FROM purchase P
-        JOIN ticket T ON P.ticket_id = T.ticket_id
-        JOIN flight F ON T.flight_num = F.flight_num
-        WHERE P.customer_email = %s
-    """, (email,))
+DASHBOARD_SPENDING_SQL = purchases(
+    ["SUM(T.price_charged) AS total"],
+    ["P.customer_email = %s", "P.purchase_date >= DATE_SUB(CURDATE(), INTERVAL 12 MONTH)"],
+    joins=[JOIN_TICKET]
+)
 
-    all_flights = cursor.fetchall()
 
-    from datetime import datetime
+def _dashboard_payload(all_flights, spending12):
     now = datetime.now()
 
     upcoming = [f for f in all_flights if f["departure_time"] >= now]
@@ -45,19 +33,6 @@ def customer_dashboard(email: str):
     next_upcoming = upcoming[0] if upcoming else None
     last_purchase = past[0]["purchase_date"] if past else None
 
-    # Past 12 months spending
-    cursor.execute("""
-        SELECT SUM(T.price_charged) AS total
-        FROM purchase P
-        JOIN ticket T ON P.ticket_id = T.ticket_id
-        WHERE P.customer_email = %s
-          AND P.purchase_date >= DATE_SUB(CURDATE(), INTERVAL 12 MONTH)
-    """, (email,))
-    spending12 = cursor.fetchone()["total"] or 0
-
-    cursor.close()
-    conn.close()
-
     return {
         "next_upcoming": next_upcoming,
         "total_spending_12mo": float(spending12),
@@ -67,14 +42,53 @@ def customer_dashboard(email: str):
     }
 
 
+def _load_dashboard(conn, email):
+    cursor = conn.cursor(dictionary=True)
+
+    # Get next upcoming and last purchase
+    cursor.execute(DASHBOARD_FLIGHTS_SQL, (email,))
+    all_flights = cursor.fetchall()
+
+    # Past 12 months spending
+    cursor.execute(DASHBOARD_SPENDING_SQL, (email,))
+    spending12 = cursor.fetchone()["total"] or 0
+
+    cursor.close()
+
+    return _dashboard_payload(all_flights, spending12)
+
+
+async def _load_dashboard_async(conn, email):
+    all_flights = await async_db.fetchall(conn, DASHBOARD_FLIGHTS_SQL, (email,))
+    spending12 = (await async_db.fetchone(conn, DASHBOARD_SPENDING_SQL, (email,)))["total"] or 0
+
+    return _dashboard_payload(all_flights, spending12)
+
+
+# For customer dashboard display (cached until this customer buys a ticket
+# or their next flight changes status)
+def customer_dashboard(email: str, conn=Depends(get_db)):
+    return dashboard_cache.get_or_load(("customer", email), lambda: _load_dashboard(conn, email))
+
+
+async def customer_dashboard_async(email: str, conn=Depends(get_async_db)):
+    return await dashboard_cache.get_or_load_async(
+        ("customer", email),
+        lambda: _load_dashboard_async(conn, email)
+    )
+
+
+router.get("/dashboard/{email}")(customer_dashboard_async if config.DB_ASYNC else customer_dashboard)
+
+
 # Get spending for my spending page
 @router.get("/spending/{email}")
 def get_customer_spending(
     email: str,
     start: str = None,
-    end: str = None
+    end: str = None,
+    conn=Depends(get_db)
 ):
-    conn = get_connection()
     cursor = conn.cursor(dictionary=True)
 
     # If user provides date range, convert them to datetime
@@ -113,7 +127,6 @@ def get_customer_spending(
     monthly = cursor.fetchall()
 
     cursor.close()
-    conn.close()
 
     return {
         "email": email,
@@ -123,64 +136,55 @@ def get_customer_spending(
         "monthly": monthly
     }
 
+# Keyset-paged / streamed variant of the flights page (backend/history.py)
+FLIGHT_HISTORY_SQL = purchases(TRIP_COLUMNS, ["P.customer_email = %s"])
+
+UPCOMING_TRIPS_SQL = purchases(
+    TRIP_COLUMNS,
+    ["P.customer_email = %s", "F.departure_time >= %s"],
+    order_by="F.departure_time ASC"
+)
+
+PAST_TRIPS_SQL = purchases(
+    TRIP_COLUMNS,
+    ["P.customer_email = %s", "F.departure_time < %s"],
+    order_by="F.departure_time DESC"
+)
+
 # Get flights for my flights page
+# With limit/cursor/format: one page ({"flights", "next_cursor"}) or NDJSON
 @router.get("/flights/{email}")
-def get_customer_flights(email: str):
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
+def get_customer_flights(
+    email: str,
+    section: str = None,
+    page_cursor: str = Query(None, alias="cursor"),
+    limit: int = None,
+    format: str = "json",
+    conn=Depends(get_db)
+):
+    if wants_paging(limit, page_cursor, format):
+        return history_response(
+            conn, FLIGHT_HISTORY_SQL, (email,), "GET /customer/flights/{email}",
+            section, page_cursor, limit, format
+        )
+
+    cursor = conn.cursor()
 
     now = datetime.now()
 
     # Upcoming flights
-    cursor.execute("""
-        SELECT 
-            F.flight_num,
-            F.airline_name,
-            F.departure_airport,
-            F.arrival_airport,
-            F.departure_time,
-            F.arrival_time,
-            F.status,
-            T.seat_class,
-            T.price_charged,
-            P.purchase_date
-        FROM purchase P
-        JOIN ticket T ON P.ticket_id = T.ticket_id
-        JOIN flight F ON T.flight_num = F.flight_num
-        WHERE P.customer_email = %s
-          AND F.departure_time >= %s
-        ORDER BY F.departure_time ASC
-    """, (email, now))
+    cursor.execute(UPCOMING_TRIPS_SQL, (email, now))
 
-    upcoming = cursor.fetchall()
+    upcoming = fetch_rows(cursor)
 
     # Past flights
-    cursor.execute("""
-        SELECT 
-            F.flight_num,
-            F.airline_name,
-            F.departure_airport,
-            F.arrival_airport,
-            F.departure_time,
-            F.arrival_time,
-            F.status,
-            T.seat_class,
-            T.price_charged,
-            P.purchase_date
-        FROM purchase P
-        JOIN ticket T ON P.ticket_id = T.ticket_id
-        JOIN flight F ON T.flight_num = F.flight_num
-        WHERE P.customer_email = %s
-          AND F.departure_time < %s
-        ORDER BY F.departure_time DESC
-    """, (email, now))
+    cursor.execute(PAST_TRIPS_SQL, (email, now))
 
-    past = cursor.fetchall()
+    past = fetch_rows(cursor)
 
     cursor.close()
-    conn.close()
 
-    return {
+    return FastJSONResponse({
         "upcoming": upcoming,
         "past": past
-    }
\ No newline at end of file
+    })
\ No newline at end of file
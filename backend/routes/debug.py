@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Query
+from backend import profiling
+from backend.cache import cache_stats
+from backend.db import pool
+from backend.passwords import hasher
+
+router = APIRouter(prefix="/debug", tags=["debug"])
+
+
+# Hit/miss counters for every in-process cache
+@router.get("/cache")
+def get_cache_stats():
+    return {"caches": cache_stats()}
+
+
+# Connection pool usage
+@router.get("/pool")
+def get_pool_stats():
+    return pool.status()
+
+
+# Password hashing workers: queue depth, rejections, bcrypt latency
+@router.get("/passwords")
+def get_password_stats():
+    return hasher.status()
+
+
+# Slowest recent requests with their per-statement breakdown
+@router.get("/profile")
+def get_profile(limit: int = Query(20, ge=1, le=500)):
+    return {"recorded": profiling.store.recorded, "slowest": profiling.store.slowest(limit)}
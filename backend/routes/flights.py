@@ -1,65 +1,76 @@
-from fastapi import APIRouter, HTTPException
-from backend.db import get_connection
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from backend import async_db, boards, config
+from backend.async_db import get_async_db
+from backend.db import get_db
+from backend.flight_keys import flight_keys
+from backend.flight_status import MAX_STATUS_FLIGHTS, flight_status, flight_statuses
+from backend.location_index import get_index, get_index_async
+from backend.purchase import seat_availability, seat_availability_async
+from backend.responses import FastJSONResponse, fetch_rows
+from backend.sessions import get_session, session_for
 from datetime import datetime, timedelta
 
 router = APIRouter(prefix="/flights", tags=["flights"])
 
 
-# Search for upcoming flights by airport or city
-@router.get("/search")
-def search_flights(
-    from_loc: str,
-    to_loc: str,
-    date: str | None = None,
-    role: str = "customer",
-    email: str | None = None
-):
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
-
-    try:
-        # Normalize inputs (case-insensitive)
-        from_loc = from_loc.strip().lower()
-        to_loc = to_loc.strip().lower()
-
-        # Base search query: airport name OR city (case-insensitive)
-        sql = """
-            SELECT 
-                F.flight_num,
-                F.airline_name,
-                F.airplane_id,
-                F.departure_airport,
-                F.arrival_airport,
-                F.departure_time,
-                F.arrival_time,
-                F.status,
-                F.price,
-                A1.city AS depart_city,
-                A2.city AS arrive_city
-            FROM flight F
-            JOIN airport A1 ON F.departure_airport = A1.name
-            JOIN airport A2 ON F.arrival_airport = A2.name
-            WHERE (
-                LOWER(A1.name) LIKE %s OR LOWER(A1.city) LIKE %s
-            )
-              AND (
-                LOWER(A2.name) LIKE %s OR LOWER(A2.city) LIKE %s
-              )
-              AND F.departure_time >= NOW()
-        """
-
-        params = [
-            f"%{from_loc}%", f"%{from_loc}%",
-            f"%{to_loc}%", f"%{to_loc}%"
-        ]
-
-        # Optional date filter
-        if date:
-            sql += " AND DATE(F.departure_time) = %s"
-            params.append(date)
-
-        # Agent restrictions
-        if role == "agent" and email:
+def _in_list(column, codes, params):
+    """Append `column IN (...)` for a set of airport codes or airlines (None = no filter)."""
+    if codes is None:
+        return ""
+    params.extend(sorted(codes))
+    return f" AND {column} IN ({', '.join(['%s'] * len(codes))})"
+
+
+def _search_query(from_codes, to_codes, date, role, email, session=None):
+    """
+    Build the flight search SQL shared by the sync and async handlers.
+    from_codes/to_codes come from the location index (None = any airport).
+    A matching session token supplies the agent's/staff's airlines.
+    """
+    # flight_search (backend/flight_search.py) is keyed by
+    # (departure_airport, departure_date, arrival_airport, departure_time),
+    # so this is one range scan of its clustered index, with no joins
+    sql = """
+        SELECT
+            F.flight_num,
+            F.airline_name,
+            F.airplane_id,
+            F.departure_airport,
+            F.arrival_airport,
+            F.departure_time,
+            F.arrival_time,
+            F.status,
+            F.price,
+            F.depart_city,
+            F.arrive_city,
+            F.min_price,
+            F.seats_remaining
+        FROM flight_search F
+        WHERE F.departure_time >= NOW()
+    """
+
+    params = []
+
+    # Indexed lookups instead of LIKE '%x%' over airport name/city
+    sql += _in_list("F.departure_airport", from_codes, params)
+
+    # Date bucket column instead of DATE(departure_time) on every row
+    if date:
+        sql += " AND F.departure_date = %s"
+        params.append(date)
+    else:
+        sql += " AND F.departure_date >= CURDATE()"
+
+    sql += _in_list("F.arrival_airport", to_codes, params)
+
+    # Agent restrictions
+    if role == "agent" and email:
+        agent = session_for(session, "agent", email)
+
+        if agent:
+            sql += _in_list("F.airline_name", agent["airlines"], params) if agent["airlines"] else " AND FALSE"
+        else:
             sql += """
                 AND F.airline_name IN (
                     SELECT airline_name 
@@ -69,8 +80,14 @@ def search_flights(
             """
             params.append(email)
 
-        # Staff restrictions
-        if role == "staff" and email:
+    # Staff restrictions
+    if role == "staff" and email:
+        staff = session_for(session, "staff", email)
+
+        if staff:
+            sql += " AND F.airline_name = %s"
+            params.append(staff["airline_name"])
+        else:
             sql += """
                 AND F.airline_name = (
                     SELECT airline_name
@@ -80,64 +97,132 @@ def search_flights(
             """
             params.append(email)
 
-        sql += " ORDER BY F.departure_time ASC"
+    sql += " ORDER BY F.departure_time ASC"
+
+    return sql, params
+
+
+def _with_availability(flights, classes):
+    """Attach each flight's seat classes (purchase.seat_availability) to its result row."""
+    for flight in flights:
+        flight["seat_classes"] = classes[(flight["airline_name"], flight["flight_num"])]
+    return flights
+
+
+# Search for upcoming flights by airport or city
+# availability=true embeds sold/capacity/remaining/price per seat class
+def search_flights(
+    from_loc: str,
+    to_loc: str,
+    date: str | None = None,
+    role: str = "customer",
+    email: str | None = None,
+    availability: bool = False,
+    conn=Depends(get_db),
+    session=Depends(get_session)
+):
+    index = get_index(conn)
+    from_codes, to_codes = index.match(from_loc), index.match(to_loc)
+
+    # Unknown airport/city: nothing can match
+    if from_codes == set() or to_codes == set():
+        return {"results": []}
+
+    cursor = conn.cursor()
+
+    try:
+        sql, params = _search_query(from_codes, to_codes, date, role, email, session)
 
         cursor.execute(sql, params)
-        flights = cursor.fetchall()
+        flights = fetch_rows(cursor)
+
+        if availability and flights:
+            flights = flights.dicts()
+            keys = [(f["airline_name"], f["flight_num"]) for f in flights]
+            _with_availability(flights, seat_availability(conn, keys))
 
-        return {"results": flights}
+        return FastJSONResponse({"results": flights})
 
     finally:
         cursor.close()
-        conn.close()
 
-# Search for flight status
+
+async def search_flights_async(
+    from_loc: str,
+    to_loc: str,
+    date: str | None = None,
+    role: str = "customer",
+    email: str | None = None,
+    availability: bool = False,
+    conn=Depends(get_async_db),
+    session=Depends(get_session)
+):
+    index = await get_index_async(conn)
+    from_codes, to_codes = index.match(from_loc), index.match(to_loc)
+
+    if from_codes == set() or to_codes == set():
+        return {"results": []}
+
+    sql, params = _search_query(from_codes, to_codes, date, role, email, session)
+    flights = await async_db.fetchall(conn, sql, params)
+
+    if availability and flights:
+        keys = [(f["airline_name"], f["flight_num"]) for f in flights]
+        _with_availability(flights, await seat_availability_async(conn, keys))
+
+    return FastJSONResponse({"results": flights})
+
+
+router.get("/search")(search_flights_async if config.DB_ASYNC else search_flights)
+
+
+# Typeahead for the airport/city search boxes
+@router.get("/locations")
+def search_locations(q: str, limit: int = 10, conn=Depends(get_db)):
+    limit = max(1, min(limit, 50))
+    return {"results": get_index(conn).suggest(q, limit)}
+
+# Search for flight status (live status derived from the row, see backend/flight_status.py)
 @router.get("/status")
-def get_flight_status(airline: str, flight_num: str):
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
+def get_flight_status(airline: str, flight_num: str, conn=Depends(get_db)):
+    flight = flight_status(conn, airline, flight_num)
 
-    try:
-        cursor.execute(
-            """
-            SELECT
-                airline_name,
-                flight_num,
-                airplane_id,
-                departure_airport,
-                arrival_airport,
-                departure_time,
-                arrival_time,
-                status,
-                price
-            FROM flight
-            WHERE airline_name = %s
-              AND flight_num = %s
-            """,
-            (airline, flight_num)
-        )
-
-        flight = cursor.fetchone()
-
-        if not flight:
-            raise HTTPException(status_code=404, detail="Flight not found.")
-
-        # Mark "in-progress" if current time is between departure & arrival
-        now_query = """
-            SELECT 
-                CASE 
-                    WHEN NOW() BETWEEN %s AND %s THEN 'in-progress'
-                    ELSE 'scheduled'
-                END AS live_status
-        """
-
-        cursor.execute(now_query, (flight["departure_time"], flight["arrival_time"]))
-        live = cursor.fetchone()
-
-        flight["live_status"] = live["live_status"]
-
-        return flight
+    if not flight:
+        raise HTTPException(status_code=404, detail="Flight not found.")
 
-    finally:
-        cursor.close()
-        conn.close()
+    return flight
+
+
+# Many flights at once, for departure boards:
+# {"flights": [{"airline_name", "flight_num"}, ...]}
+@router.post("/status/batch")
+def get_flight_statuses(data: dict, conn=Depends(get_db)):
+    keys = flight_keys(data, MAX_STATUS_FLIGHTS)
+
+    found = flight_statuses(conn, keys)
+    return {
+        "flights": [found[key] for key in keys if key in found],
+        "not_found": [
+            {"airline_name": airline, "flight_num": flight_num}
+            for airline, flight_num in keys if (airline, flight_num) not in found
+        ],
+    }
+
+
+# Departure / arrival board of one airport (see backend/boards.py)
+@router.get("/board/{airport}")
+def get_board(airport: str, hours_before: int = 1, hours_after: int = 12, conn=Depends(get_db)):
+    return boards.board(conn, airport, hours_before, hours_after)
+
+
+# Same board as Server-Sent Events: the full board, then each status change
+@router.get("/board/{airport}/stream")
+async def stream_board(airport: str, hours_before: int = 1, hours_after: int = 12):
+    tag = "GET /flights/board/{airport}/stream"
+    snapshot = await boards.first_snapshot(airport, hours_before, hours_after, tag)
+
+    return StreamingResponse(
+        boards.board_stream(snapshot, hours_before, hours_after, tag),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
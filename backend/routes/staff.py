@@ -1,6 +1,14 @@
-from fastapi import APIRouter, HTTPException
-from datetime import datetime, timedelta
-from backend.db import get_connection
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from datetime import date, datetime, timedelta
+from backend import events, exports, fleet_import, flight_search, refdata, schedule_import
+from backend.dashboards import dashboard_cache
+from backend.db import get_db
+from backend.history import history_response, wants_paging
+from backend.location_index import get_index
+from backend.purchase import CREATE_INVENTORY_SQL
+from backend.queries import JOIN_TICKET, TRIP_COLUMNS, purchases
+from backend.responses import FastJSONResponse, Rows, fetch_rows
+from backend.sessions import get_session, staff_airline
 
 router = APIRouter(prefix="/staff", tags=["staff"])
 
@@ -23,27 +31,52 @@ def db_error(e):
     # Fallback: safe generic message
     return msg
 
+# Dashboard sales figures. ticket carries the airline, so these need no
+# join to flight at all.
+FREQUENT_CUSTOMER_SQL = purchases(
+    ["P.customer_email", "COUNT(*) AS trips"],
+    ["T.airline_name = %s", "P.purchase_date >= %s"],
+    joins=[JOIN_TICKET],
+    group_by="P.customer_email",
+    order_by="trips DESC",
+    limit=1
+)
+
+TOP_AGENT_SQL = purchases(
+    ["P.agent_email", "COUNT(*) AS sold"],
+    ["T.airline_name = %s", "P.agent_email IS NOT NULL", "P.purchase_date >= %s"],
+    joins=[JOIN_TICKET],
+    group_by="P.agent_email",
+    order_by="sold DESC",
+    limit=1
+)
+
+MONTHLY_SALES_SQL = purchases(
+    ["DATE_FORMAT(P.purchase_date, '%b') AS month", "COUNT(*) AS tickets"],
+    ["T.airline_name = %s"],
+    joins=[JOIN_TICKET],
+    group_by="YEAR(P.purchase_date), MONTH(P.purchase_date)",
+    order_by="YEAR(P.purchase_date), MONTH(P.purchase_date) ASC"
+)
+
 # Gets for dashboard page
 @router.get("/dashboard/{email}")
-def staff_dashboard(email: str):
-    conn = get_connection()
+def staff_dashboard(email: str, conn=Depends(get_db), session=Depends(get_session)):
+    cached = dashboard_cache.get(("staff", email))
+    if cached is not None:
+        return cached
+
     cursor = conn.cursor(dictionary=True)
 
     try:
         # -------------------------------------
-        # Validate staff account
+        # Validate staff account (session token or one lookup)
         # -------------------------------------
-        cursor.execute(
-            "SELECT airline_name, first_name FROM airline_staff WHERE email=%s",
-            (email,)
-        )
-        staff = cursor.fetchone()
+        airline = staff_airline(cursor, email, session)
 
-        if not staff:
+        if not airline:
             raise HTTPException(404, detail="No staff account found for this email.")
 
-        airline = staff["airline_name"]
-
         now = datetime.now()
         next_30 = now + timedelta(days=30)
         last_30 = now - timedelta(days=30)
@@ -93,69 +126,25 @@ def staff_dashboard(email: str):
         # -------------------------------------
         # Most frequent customer (past 12 months)
         # -------------------------------------
-        cursor.execute(
-            """
-            SELECT 
-                P.customer_email,
-                COUNT(*) AS trips
-            FROM purchase P
-            JOIN ticket T ON P.ticket_id = T.ticket_id
-            JOIN flight F ON T.flight_num = F.flight_num
-            WHERE F.airline_name=%s
-              AND P.purchase_date >= %s
-            GROUP BY P.customer_email
-            ORDER BY trips DESC
-            LIMIT 1
-            """,
-            (airline, last_12)
-        )
+        cursor.execute(FREQUENT_CUSTOMER_SQL, (airline, last_12))
         frequent_customer = cursor.fetchone() or {"customer_email": None, "trips": 0}
 
         # -------------------------------------
         # Top booking agent (past 30 days)
         # -------------------------------------
-        cursor.execute(
-            """
-            SELECT 
-                P.agent_email,
-                COUNT(*) AS sold
-            FROM purchase P
-            JOIN ticket T ON P.ticket_id = T.ticket_id
-            JOIN flight F ON T.flight_num = F.flight_num
-            WHERE F.airline_name=%s
-              AND P.agent_email IS NOT NULL
-              AND P.purchase_date >= %s
-            GROUP BY agent_email
-            ORDER BY sold DESC
-            LIMIT 1
-            """,
-            (airline, last_30)
-        )
+        cursor.execute(TOP_AGENT_SQL, (airline, last_30))
         top_agent = cursor.fetchone() or {"agent_email": None, "sold": 0}
 
         # -------------------------------------
         # Ticket sales grouped by month
         # -------------------------------------
-        cursor.execute(
-            """
-            SELECT 
-                DATE_FORMAT(P.purchase_date, '%b') AS month,
-                COUNT(*) AS tickets
-            FROM purchase P 
-            JOIN ticket T ON P.ticket_id = T.ticket_id
-            JOIN flight F ON T.flight_num = F.flight_num 
-            WHERE F.airline_name=%s
-            GROUP BY YEAR(P.purchase_date), MONTH(P.purchase_date)
-            ORDER BY YEAR(P.purchase_date), MONTH(P.purchase_date) ASC
-            """,
-            (airline,)
-        )
+        cursor.execute(MONTHLY_SALES_SQL, (airline,))
         monthly_sales = cursor.fetchall() or []
 
         # -------------------------------------
         # FINAL RETURN PAYLOAD
         # -------------------------------------
-        return {
+        payload = {
             "success": True,
             "airline": airline,
             "upcoming_count": upcoming_count,
@@ -164,6 +153,8 @@ def staff_dashboard(email: str):
             "top_agent": top_agent,
             "monthly_sales": monthly_sales,
         }
+        dashboard_cache.set(("staff", email), payload)
+        return payload
 
     except HTTPException:
         raise
@@ -173,7 +164,6 @@ def staff_dashboard(email: str):
 
     finally:
         cursor.close()
-        conn.close()
 
 # Gets for flights page
 @router.get("/flights/{email}")
@@ -182,24 +172,19 @@ def staff_flights(
     from_loc: str | None = None,
     to_loc: str | None = None,
     date_from: str | None = None,
-    date_to: str | None = None
+    date_to: str | None = None,
+    conn=Depends(get_db),
+    session=Depends(get_session)
 ):
-    conn = get_connection()
     cursor = conn.cursor(dictionary=True)
 
     try:
         # Identify staff airline
-        cursor.execute(
-            "SELECT airline_name FROM airline_staff WHERE email=%s",
-            (email,)
-        )
-        staff = cursor.fetchone()
+        airline = staff_airline(cursor, email, session)
 
-        if not staff:
+        if not airline:
             raise HTTPException(404, "Staff account not found.")
 
-        airline = staff["airline_name"]
-
         now = datetime.now()
         next_30 = now + timedelta(days=30)
         filters_used = any([from_loc, to_loc, date_from, date_to])
@@ -235,32 +220,23 @@ def staff_flights(
             params += [now, next_30]
 
         # ------------------------------------------------------
-        # FROM fuzzy search (case-insensitive)
-        # Matches NRT, nrt, Tokyo, tokyo, etc.
+        # FROM / TO search (case-insensitive, airport code or city)
+        # Matches NRT, nrt, Tokyo, tokyo, etc. Resolved to airport
+        # codes by the location index, then an indexed IN lookup.
         # ------------------------------------------------------
-        if from_loc:
-            t = f"%{from_loc.lower()}%"
-            sql += """
-                AND (
-                    LOWER(A1.name) LIKE %s OR
-                    LOWER(A1.city) LIKE %s
-                )
-            """
-            params += [t, t]
+        index = get_index(conn)
 
-        # ------------------------------------------------------
-        # TO fuzzy search (case-insensitive)
-        # Matches PVG, SHA, Shanghai, shanghai, etc.
-        # ------------------------------------------------------
-        if to_loc:
-            t = f"%{to_loc.lower()}%"
-            sql += """
-                AND (
-                    LOWER(A2.name) LIKE %s OR
-                    LOWER(A2.city) LIKE %s
-                )
-            """
-            params += [t, t]
+        for column, text in (("F.departure_airport", from_loc), ("F.arrival_airport", to_loc)):
+            codes = index.match(text)
+
+            if codes is None:
+                continue
+            if not codes:
+                sql += " AND FALSE"
+                continue
+
+            sql += f" AND {column} IN ({', '.join(['%s'] * len(codes))})"
+            params += sorted(codes)
 
         # ------------------------------------------------------
         # Optional date range
@@ -275,247 +251,149 @@ def staff_flights(
 
         sql += " ORDER BY F.departure_time ASC"
 
-        cursor.execute(sql, params)
-        flights = cursor.fetchall() or []
+        # Tuple rows, encoded straight to JSON (backend/responses.py)
+        rows_cursor = conn.cursor()
+        try:
+            rows_cursor.execute(sql, params)
+            flights = fetch_rows(rows_cursor)
+        finally:
+            rows_cursor.close()
 
-        return {
+        return FastJSONResponse({
             "success": True,
             "airline": airline,
             "filters_used": filters_used,
             "count": len(flights),
             "flights": flights
-        }
+        })
 
     finally:
         cursor.close()
-        conn.close()
 
 
 # Gets for analytics page
+# Reads the daily rollup tables (backend/rollups.py), not raw purchases
 @router.get("/analytics/{email}")
-def staff_analytics(email: str):
-    conn = get_connection()
+def staff_analytics(email: str, conn=Depends(get_db), session=Depends(get_session)):
     cursor = conn.cursor(dictionary=True)
 
     try:
         # Validate staff
-        cursor.execute(
-            "SELECT airline_name FROM airline_staff WHERE email=%s",
-            (email,)
-        )
-        staff = cursor.fetchone()
+        airline = staff_airline(cursor, email, session)
 
-        if not staff:
+        if not airline:
             raise HTTPException(404, "Staff not found.")
 
-        airline = staff["airline_name"]
-
-        now = datetime.now()
-        last_month = now - timedelta(days=30)
-        last_year = now - timedelta(days=365)
-        last_3mo = now - timedelta(days=90)
-
-        # ----------------------------------------------------
-        # TOTAL FLIGHTS
-        # ----------------------------------------------------
-        cursor.execute(
-            "SELECT COUNT(*) AS total_flights FROM flight WHERE airline_name=%s",
-            (airline,)
-        )
-        total_flights = cursor.fetchone()["total_flights"]
-
-        # ----------------------------------------------------
-        # TICKETS SOLD PER MONTH
-        # ----------------------------------------------------
-        end_date = datetime.today()
-        start_date = end_date - timedelta(days=365)
-        cursor.execute(
-            """
-            SELECT 
-                DATE_FORMAT(P.purchase_date, '%b') AS month,
-                COUNT(*) AS tickets
-            FROM purchase P
-            JOIN ticket T ON P.ticket_id=T.ticket_id
-            WHERE T.airline_name=%s
-              AND P.purchase_date BETWEEN %s AND %s
-            GROUP BY month
-            ORDER BY month ASC;
-            """,
-            (airline,start_date, end_date)
-        )
-        ticket_monthly = cursor.fetchall()
+        # purchase_date >= (now - N days) on a DATE column means
+        # sale_date > that day, which is what the rollups compare against
+        today = datetime.now().date()
+        last_month = today - timedelta(days=30)
+        last_year = today - timedelta(days=365)
+        last_3mo = today - timedelta(days=90)
 
         # ----------------------------------------------------
-        # FREQUENT CUSTOMER (past year)
+        # FLIGHT + STATUS STATS (one pass over the airline's flights)
         # ----------------------------------------------------
         cursor.execute(
             """
-            SELECT 
-                P.customer_email,
-                COUNT(*) AS flights
-            FROM purchase P
-            JOIN ticket T ON P.ticket_id=T.ticket_id
-            WHERE T.airline_name=%s
-              AND P.purchase_date >= %s
-            GROUP BY P.customer_email
-            ORDER BY flights DESC
-            LIMIT 1
+            SELECT
+                COUNT(*) AS total,
+                COALESCE(SUM(status='delayed'), 0) AS delayed
+            FROM flight
+            WHERE airline_name=%s
             """,
-            (airline, last_year)
-        )
-        freq_customer = cursor.fetchone() or {"customer_email": None, "flights": 0}
-
-        # ----------------------------------------------------
-        # STATUS STATS
-        # ----------------------------------------------------
-        cursor.execute(
-            "SELECT COUNT(*) AS c FROM flight WHERE airline_name=%s AND status='delayed'",
             (airline,)
         )
-        delayed = cursor.fetchone()["c"]
-
-        cursor.execute(
-            "SELECT COUNT(*) AS c FROM flight WHERE airline_name=%s",
-            (airline,)
-        )
-        total = cursor.fetchone()["c"]
-
-        on_time = total - delayed
+        flight_stats = cursor.fetchone()
+        total = flight_stats["total"]
+        delayed = int(flight_stats["delayed"])
 
         status_stats = {
-            "on_time": on_time,
+            "on_time": total - delayed,
             "delayed": delayed,
             "total": total
         }
 
         # ----------------------------------------------------
-        # TOP AGENTS — LAST MONTH (tickets)
-        # ----------------------------------------------------
-        cursor.execute(
-            """
-            SELECT 
-                P.agent_email,
-                COUNT(*) AS sold
-            FROM purchase P
-            JOIN ticket T ON P.ticket_id=T.ticket_id
-            WHERE T.airline_name=%s
-              AND P.agent_email IS NOT NULL
-              AND P.purchase_date >= %s
-            GROUP BY P.agent_email
-            ORDER BY sold DESC
-            LIMIT 5
-            """,
-            (airline, last_month)
-        )
-        top_agents_month_tickets = cursor.fetchall() or []
-
-        # ----------------------------------------------------
-        # TOP AGENTS — LAST MONTH (commission)
-        # ----------------------------------------------------
-        cursor.execute(
-            """
-            SELECT 
-                P.agent_email,
-                SUM(T.price_charged * 0.10) AS commission
-            FROM purchase P
-            JOIN ticket T ON P.ticket_id=T.ticket_id
-            WHERE T.airline_name=%s
-              AND P.agent_email IS NOT NULL
-              AND P.purchase_date >= %s
-            GROUP BY P.agent_email
-            ORDER BY commission DESC
-            LIMIT 5
-            """,
-            (airline, last_month)
-        )
-        top_agents_month_comm = cursor.fetchall() or []
-
-        # ----------------------------------------------------
-        # TOP AGENTS — LAST YEAR (ticket)
+        # TICKETS SOLD PER MONTH
         # ----------------------------------------------------
         cursor.execute(
             """
             SELECT 
-                P.agent_email,
-                COUNT(*) AS sold
-            FROM purchase P
-            JOIN ticket T ON P.ticket_id=T.ticket_id
-            WHERE T.airline_name=%s
-              AND P.agent_email IS NOT NULL
-              AND P.purchase_date >= %s
-            GROUP BY P.agent_email
-            ORDER BY sold DESC
-            LIMIT 5
+                DATE_FORMAT(sale_date, '%b') AS month,
+                SUM(tickets) AS tickets
+            FROM sales_agent_daily
+            WHERE airline_name=%s
+              AND sale_date > %s
+            GROUP BY month
+            ORDER BY month ASC;
             """,
             (airline, last_year)
         )
-        top_agents_year_tickets = cursor.fetchall() or []
+        ticket_monthly = cursor.fetchall()
 
         # ----------------------------------------------------
-        # TOP AGENTS — LAST YEAR (commission)
+        # FREQUENT CUSTOMER (past year)
         # ----------------------------------------------------
         cursor.execute(
             """
             SELECT 
-                P.agent_email,
-                SUM(T.price_charged * 0.10) AS commission
-            FROM purchase P
-            JOIN ticket T ON P.ticket_id=T.ticket_id
-            WHERE T.airline_name=%s
-              AND P.agent_email IS NOT NULL
-              AND P.purchase_date >= %s
-            GROUP BY P.agent_email
-            ORDER BY commission DESC
-            LIMIT 5
+                customer_email,
+                SUM(tickets) AS flights
+            FROM sales_customer_daily
+            WHERE airline_name=%s
+              AND sale_date > %s
+            GROUP BY customer_email
+            ORDER BY flights DESC
+            LIMIT 1
             """,
             (airline, last_year)
         )
-        top_agents_year_comm = cursor.fetchall() or []
+        freq_customer = cursor.fetchone() or {"customer_email": None, "flights": 0}
 
         # ----------------------------------------------------
-        # TOP DESTINATIONS — LAST 3 MONTHS (CITY)
+        # TOP AGENTS — LAST MONTH / LAST YEAR (tickets + commission)
         # ----------------------------------------------------
-        cursor.execute(
-            """
-            SELECT 
-                A2.city AS destination,
-                COUNT(*) AS count
-            FROM ticket T
-            JOIN flight F ON T.flight_num=F.flight_num
-                AND T.airline_name = F.airline_name
-            JOIN purchase P ON T.ticket_id=P.ticket_id
-            JOIN airport A2 ON F.arrival_airport = A2.name
-            WHERE F.airline_name=%s
-              AND P.purchase_date >= %s
-            GROUP BY destination
-            ORDER BY count DESC
-            LIMIT 5
-            """,
-            (airline, last_3mo)
-        )
-        top_dest_3mo = cursor.fetchall() or []
+        def top_agents(since, order_by):
+            cursor.execute(
+                f"""
+                SELECT
+                    agent_email,
+                    SUM(tickets) AS sold,
+                    SUM(revenue) * 0.10 AS commission
+                FROM sales_agent_daily
+                WHERE airline_name=%s
+                  AND agent_email <> ''
+                  AND sale_date > %s
+                GROUP BY agent_email
+                ORDER BY {order_by} DESC
+                LIMIT 5
+                """,
+                (airline, since)
+            )
+            rows = cursor.fetchall()
+            metric = "sold" if order_by == "sold" else "commission"
+            return [{"agent_email": r["agent_email"], metric: r[metric]} for r in rows]
 
         # ----------------------------------------------------
-        # TOP DESTINATIONS — LAST YEAR (CITY)
+        # TOP DESTINATIONS — LAST 3 MONTHS / LAST YEAR (CITY)
         # ----------------------------------------------------
-        cursor.execute(
-            """
-            SELECT 
-                A2.city AS destination,
-                COUNT(*) AS count
-            FROM ticket T
-            JOIN flight F ON T.flight_num=F.flight_num
-            JOIN purchase P ON T.ticket_id=P.ticket_id
-            JOIN airport A2 ON F.arrival_airport = A2.name
-            WHERE F.airline_name=%s
-              AND P.purchase_date >= %s
-            GROUP BY destination
-            ORDER BY count DESC
-            LIMIT 5
-            """,
-            (airline, last_year)
-        )
-        top_dest_year = cursor.fetchall() or []
+        def top_destinations(since):
+            cursor.execute(
+                """
+                SELECT 
+                    destination_city AS destination,
+                    SUM(tickets) AS count
+                FROM sales_destination_daily
+                WHERE airline_name=%s
+                  AND sale_date > %s
+                GROUP BY destination
+                ORDER BY count DESC
+                LIMIT 5
+                """,
+                (airline, since)
+            )
+            return cursor.fetchall()
 
         # ----------------------------------------------------
         # FINAL RETURN
@@ -523,29 +401,49 @@ def staff_analytics(email: str):
         return {
             "success": True,
             "airline": airline,
-            "total_flights": total_flights,
+            "total_flights": total,
             "ticket_monthly": ticket_monthly,
             "freq_customer": freq_customer,
             "status_stats": status_stats,
             "top_agents_month": {
-                "tickets": top_agents_month_tickets,
-                "commission": top_agents_month_comm
+                "tickets": top_agents(last_month, "sold"),
+                "commission": top_agents(last_month, "commission")
             },
             "top_agents_year": {
-                "tickets": top_agents_year_tickets,
-                "commission": top_agents_year_comm
+                "tickets": top_agents(last_year, "sold"),
+                "commission": top_agents(last_year, "commission")
             },
-            "top_dest_3mo": top_dest_3mo,
-            "top_dest_year": top_dest_year
+            "top_dest_3mo": top_destinations(last_3mo),
+            "top_dest_year": top_destinations(last_year)
         }
 
     finally:
         cursor.close()
-        conn.close()
+
+# Sales export for finance: streamed, so any date range is safe
+@router.get("/export_sales/{email}")
+def export_sales(
+    email: str,
+    start: date,
+    end: date = None,
+    fmt: str = Query("csv", alias="format"),
+    conn=Depends(get_db),
+    session=Depends(get_session)
+):
+    cursor = conn.cursor(dictionary=True)
+    try:
+        airline = staff_airline(cursor, email, session)
+    finally:
+        cursor.close()
+    if not airline:
+        raise HTTPException(404, "Staff not found.")
+
+    return exports.sales_export(airline, start, end or date.today(), fmt, "GET /staff/export_sales/{email}")
+
 
 # Add airport
 @router.post("/add_airport")
-def add_airport(data: dict):
+def add_airport(data: dict, conn=Depends(get_db)):
     name = (data.get("name") or "").strip()
     city = (data.get("city") or "").strip()
 
@@ -555,7 +453,6 @@ def add_airport(data: dict):
     if not city:
         raise HTTPException(400, detail="Airport city is required.")
 
-    conn = get_connection()
     cursor = conn.cursor()
 
     try:
@@ -564,6 +461,7 @@ def add_airport(data: dict):
             (name, city)
         )
         conn.commit()
+        events.publish("airport_added", name=name, city=city)
 
         return {
             "success": True,
@@ -576,11 +474,10 @@ def add_airport(data: dict):
 
     finally:
         cursor.close()
-        conn.close()
 
 # Add airplane and seat classes
 @router.post("/add_airplane")
-def add_airplane(data: dict):
+def add_airplane(data: dict, conn=Depends(get_db)):
     airplane_id = (data.get("airplane_id") or "").strip()
     airline_name = (data.get("airline_name") or "").strip()
     seat_classes = data.get("seat_classes", [])
@@ -594,10 +491,12 @@ def add_airplane(data: dict):
     if not airline_name:
         raise HTTPException(400, detail="Airline name is required.")
 
-    if not isinstance(seat_classes, list) or len(seat_classes) == 0:
-        raise HTTPException(400, detail="At least one seat class must be provided.")
+    # Check every seat class before writing anything
+    try:
+        rows = fleet_import.seat_class_rows(seat_classes)
+    except ValueError as e:
+        raise HTTPException(400, detail=str(e))
 
-    conn = get_connection()
     cursor = conn.cursor()
 
     try:
@@ -613,50 +512,15 @@ def add_airplane(data: dict):
         )
 
         # -----------------------
-        # INSERT SEAT CLASSES
+        # INSERT SEAT CLASSES (one multi-row INSERT)
         # -----------------------
-        for idx, sc in enumerate(seat_classes, start=1):
-            class_name = (sc.get("class") or "").strip()
-            capacity = sc.get("capacity")
-            price_factor = sc.get("price_factor")
-
-            # Validations
-            if not class_name:
-                raise HTTPException(
-                    400, 
-                    detail=f"Seat class #{idx}: Class name is required."
-                )
-
-            try:
-                capacity = int(capacity)
-                price_factor = float(price_factor)
-            except:
-                raise HTTPException(
-                    400,
-                    detail=f"Seat class '{class_name}': Capacity must be an integer and price factor must be a number."
-                )
-
-            if capacity <= 0:
-                raise HTTPException(
-                    400,
-                    detail=f"Seat class '{class_name}': Capacity must be greater than 0."
-                )
-
-            if price_factor <= 0:
-                raise HTTPException(
-                    400,
-                    detail=f"Seat class '{class_name}': Price factor must be greater than 0."
-                )
-
-            cursor.execute(
-                """
-                INSERT INTO seat_class (class, airplane_id, airline_name, capacity, price_factor)
-                VALUES (%s, %s, %s, %s, %s)
-                """,
-                (class_name, airplane_id, airline_name, capacity, price_factor)
-            )
+        cursor.executemany(
+            fleet_import.INSERT_SEAT_CLASS_SQL,
+            [(c, airplane_id, airline_name, cap, factor) for c, cap, factor in rows]
+        )
 
         conn.commit()
+        events.publish("airplane_added", airline_name=airline_name, airplane_id=airplane_id)
 
         return {
             "success": True,
@@ -678,11 +542,29 @@ def add_airplane(data: dict):
 
     finally:
         cursor.close()
-        conn.close()
+
+@router.post("/import_fleet/{email}")
+def import_fleet(email: str, data: dict, conn=Depends(get_db), session=Depends(get_session)):
+    cursor = conn.cursor(dictionary=True)
+    try:
+        airline_name = staff_airline(cursor, email, session)
+    finally:
+        cursor.close()
+    if not airline_name:
+        raise HTTPException(404, detail="Staff not found.")
+
+    try:
+        return fleet_import.import_fleet(
+            conn, airline_name, data.get("airplanes"), dry_run=bool(data.get("dry_run"))
+        )
+    except fleet_import.FleetError as e:
+        raise HTTPException(400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(400, detail=db_error(e))
 
 # Create flight
 @router.post("/create_flight")
-def create_flight(data: dict):
+def create_flight(data: dict, conn=Depends(get_db)):
     flight_num = (data.get("flight_num") or "").strip()
     airline_name = (data.get("airline_name") or "").strip()
     from_airport = (data.get("from_airport") or "").strip()
@@ -717,7 +599,6 @@ def create_flight(data: dict):
     if dt_arrive <= dt_depart:
         raise HTTPException(400, detail="Arrival time must be later than departure time.")
 
-    conn = get_connection()
     cursor = conn.cursor(dictionary=True)
 
     try:
@@ -793,7 +674,18 @@ def create_flight(data: dict):
             )
         )
 
+        # --------------------------------------------
+        # 5️⃣ Seat counters for the purchase engine
+        # --------------------------------------------
+        cursor.execute(CREATE_INVENTORY_SQL, (flight_num, airline_name, airplane_id))
+
+        # --------------------------------------------
+        # 6️⃣ Row in the search table
+        # --------------------------------------------
+        flight_search.refresh(cursor, airline_name, flight_num)
+
         conn.commit()
+        events.publish("flight_created", airline_name=airline_name, flight_num=flight_num)
         return {
             "success": True,
             "message": "Flight created successfully.",
@@ -812,17 +704,58 @@ def create_flight(data: dict):
 
     finally:
         cursor.close()
-        conn.close()
+
+# ------------------------------------------
+# Bulk schedule import (see backend/schedule_import.py)
+# ------------------------------------------
+
+MAX_IMPORT_BYTES = 20 * 1024 * 1024
+
+
+async def raw_body(request: Request):
+    """The request body as bytes, read before the (sync) route runs in the threadpool."""
+    body = await request.body()
+    if len(body) > MAX_IMPORT_BYTES:
+        raise HTTPException(413, detail="Schedule file is too large; split it up.")
+    return body
+
+
+@router.post("/import_schedule/{email}")
+def import_schedule(
+    email: str,
+    request: Request,
+    body: bytes = Depends(raw_body),
+    fmt: str = Query(None, alias="format", pattern="^(csv|ndjson)$"),
+    dry_run: bool = False,
+    conn=Depends(get_db),
+    session=Depends(get_session)
+):
+    # CSV unless told otherwise, by ?format= or the content type
+    if fmt is None:
+        fmt = "ndjson" if "json" in request.headers.get("content-type", "") else "csv"
+
+    cursor = conn.cursor(dictionary=True)
+    try:
+        airline_name = staff_airline(cursor, email, session)
+    finally:
+        cursor.close()
+    if not airline_name:
+        raise HTTPException(404, detail="Staff not found.")
+
+    try:
+        return schedule_import.import_schedule(conn, airline_name, body, fmt, dry_run)
+    except schedule_import.ScheduleError as e:
+        raise HTTPException(400, detail=str(e))
+
 
 @router.post("/authorize_agent")
-def authorize_agent(data: dict):
+def authorize_agent(data: dict, conn=Depends(get_db)):
     agent_email = data.get("agent_email")
     airline_name = data.get("airline_name")
 
     if not agent_email or not airline_name:
         raise HTTPException(status_code=400, detail="Missing authorization fields.")
 
-    conn = get_connection()
     cursor = conn.cursor()
 
     try:
@@ -838,11 +771,10 @@ def authorize_agent(data: dict):
 
     finally:
         cursor.close()
-        conn.close()
 
 # Update flight status
 @router.post("/update_flight_status")
-def update_flight_status(data: dict):
+def update_flight_status(data: dict, conn=Depends(get_db)):
     flight_num = (data.get("flight_num") or "").strip()
     airline_name = (data.get("airline_name") or "").strip()
     status = (data.get("status") or "").strip()
@@ -861,7 +793,6 @@ def update_flight_status(data: dict):
     if status not in allowed_status:
         raise HTTPException(400, detail=f"Invalid status. Allowed: {', '.join(allowed_status)}.")
 
-    conn = get_connection()
     cursor = conn.cursor(dictionary=True)
 
     try:
@@ -870,7 +801,9 @@ def update_flight_status(data: dict):
         # -----------------------------------
         cursor.execute(
             """
-            SELECT 1 FROM flight
+            SELECT airline_name, flight_num, departure_airport, arrival_airport,
+                   departure_time, arrival_time
+            FROM flight
             WHERE flight_num=%s AND airline_name=%s
             """,
             (flight_num, airline_name)
@@ -894,7 +827,13 @@ def update_flight_status(data: dict):
             """,
             (status, flight_num, airline_name)
         )
+        flight_search.update_status(cursor, airline_name, flight_num, status)
         conn.commit()
+        events.publish(
+            "flight_status_changed",
+            airline_name=airline_name, flight_num=flight_num, status=status,
+            flight={**flight, "status": status}
+        )
 
         return {
             "success": True,
@@ -910,11 +849,10 @@ def update_flight_status(data: dict):
 
     finally:
         cursor.close()
-        conn.close()
 
 # Authorize agent
 @router.post("/authorize_agent")
-def authorize_agent(data: dict):
+def authorize_agent(data: dict, conn=Depends(get_db)):
     agent_email = (data.get("agent_email") or "").strip()
     airline_name = (data.get("airline_name") or "").strip()
 
@@ -923,7 +861,6 @@ def authorize_agent(data: dict):
     if not airline_name:
         raise HTTPException(400, detail="Airline name is required.")
 
-    conn = get_connection()
     cursor = conn.cursor(dictionary=True)
 
     try:
@@ -984,25 +921,17 @@ def authorize_agent(data: dict):
 
     finally:
         cursor.close()
-        conn.close()
 
 # Get airplanes
 @router.get("/get_airplanes/{airline}")
-def get_airplanes(airline: str):
+def get_airplanes(airline: str, conn=Depends(get_db)):
     airline = (airline or "").strip()
 
     if not airline:
         raise HTTPException(400, detail="Airline name is required.")
 
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
-
     try:
-        cursor.execute(
-            "SELECT airplane_id FROM airplane WHERE airline_name=%s",
-            (airline,)
-        )
-        airplanes = cursor.fetchall() or []
+        airplanes = refdata.airplanes(conn, airline) or []
 
         return {
             "success": True,
@@ -1013,13 +942,9 @@ def get_airplanes(airline: str):
     except Exception as e:
         raise HTTPException(400, detail=db_error(e))
 
-    finally:
-        cursor.close()
-        conn.close()
-
 # Get seat classes
 @router.get("/get_seat_classes/{airline}/{airplane_id}")
-def get_seat_classes(airline: str, airplane_id: str):
+def get_seat_classes(airline: str, airplane_id: str, conn=Depends(get_db)):
     airline = (airline or "").strip()
     airplane_id = (airplane_id or "").strip()
 
@@ -1028,41 +953,16 @@ def get_seat_classes(airline: str, airplane_id: str):
     if not airplane_id:
         raise HTTPException(400, detail="Airplane ID is required.")
 
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
-
     try:
-        # -----------------------------
-        # Confirm airplane exists
-        # -----------------------------
-        cursor.execute(
-            """
-            SELECT 1 FROM airplane
-            WHERE airline_name=%s AND airplane_id=%s
-            """,
-            (airline, airplane_id)
-        )
-        existing = cursor.fetchone()
+        # None means the airplane does not exist
+        classes = refdata.seat_classes(conn, airline, airplane_id)
 
-        if not existing:
+        if classes is None:
             raise HTTPException(
                 404,
                 detail=f"Airplane '{airplane_id}' does not exist for airline '{airline}'."
             )
 
-        # -----------------------------
-        # Fetch seat classes
-        # -----------------------------
-        cursor.execute(
-            """
-            SELECT class, capacity, price_factor
-            FROM seat_class
-            WHERE airline_name=%s AND airplane_id=%s
-            """,
-            (airline, airplane_id)
-        )
-        classes = cursor.fetchall() or []
-
         return {
             "success": True,
             "airline": airline,
@@ -1076,35 +976,39 @@ def get_seat_classes(airline: str, airplane_id: str):
     except Exception as e:
         raise HTTPException(400, detail=db_error(e))
 
-    finally:
-        cursor.close()
-        conn.close()
-
 # Customer history
+CUSTOMER_HISTORY_SQL = purchases(
+    TRIP_COLUMNS,
+    ["P.customer_email = %s", "F.airline_name = %s"]
+)
+
 @router.get("/customer-history/{staff_email}/{customer_email}")
-def staff_customer_history(staff_email: str, customer_email: str):
+def staff_customer_history(
+    staff_email: str,
+    customer_email: str,
+    section: str = None,
+    page_cursor: str = Query(None, alias="cursor"),
+    limit: int = None,
+    format: str = "json",
+    conn=Depends(get_db),
+    session=Depends(get_session)
+):
     """
     Staff lookup of a specific customer's flight history
     for the staff member's airline only.
+    With limit/cursor/format: one keyset page or an NDJSON stream.
     """
 
-    conn = get_connection()
     cursor = conn.cursor(dictionary=True)
 
     try:
         # -----------------------------------------
         # 1️⃣ Validate staff & get their airline
         # -----------------------------------------
-        cursor.execute(
-            "SELECT airline_name FROM airline_staff WHERE email=%s",
-            (staff_email,)
-        )
-        staff = cursor.fetchone()
-        if not staff:
+        airline = staff_airline(cursor, staff_email, session)
+        if not airline:
             raise HTTPException(status_code=403, detail="Staff account not found.")
 
-        staff_airline = staff["airline_name"]
-
         # -----------------------------------------
         # 2️⃣ Validate customer exists
         # -----------------------------------------
@@ -1115,61 +1019,50 @@ def staff_customer_history(staff_email: str, customer_email: str):
         if not cursor.fetchone():
             raise HTTPException(status_code=404, detail="Customer not found.")
 
+        if wants_paging(limit, page_cursor, format):
+            return history_response(
+                conn, CUSTOMER_HISTORY_SQL, (customer_email, airline),
+                "GET /staff/customer-history/{staff_email}/{customer_email}",
+                section, page_cursor, limit, format
+            )
+
         now = datetime.now()
 
         # -----------------------------------------
         # 3️⃣ Get ALL flights for this customer
         #     under THIS staff's airline only
         # -----------------------------------------
-        cursor.execute(
-            """
-            SELECT 
-                F.flight_num,
-                F.airline_name,
-                F.departure_airport,
-                F.arrival_airport,
-                F.departure_time,
-                F.arrival_time,
-                F.status,
-                P.purchase_date,
-                T.ticket_id,
-                T.seat_class,
-                T.price_charged
-            FROM purchase P
-            JOIN ticket T 
-                ON P.ticket_id = T.ticket_id
-            JOIN flight F 
-                ON T.flight_num = F.flight_num
-               AND T.airline_name = F.airline_name
-            WHERE P.customer_email = %s
-              AND F.airline_name = %s
-            ORDER BY F.departure_time DESC
-            """,
-            (customer_email, staff_airline)
-        )
-        all_flights = cursor.fetchall() or []
+        rows_cursor = conn.cursor()
+        try:
+            rows_cursor.execute(
+                CUSTOMER_HISTORY_SQL + " ORDER BY F.departure_time DESC",
+                (customer_email, airline)
+            )
+            all_flights = fetch_rows(rows_cursor)
+        finally:
+            rows_cursor.close()
 
         # -----------------------------------------
         # 4️⃣ Split into upcoming & past in Python
         # -----------------------------------------
         upcoming = []
         past = []
+        departure = all_flights.index("departure_time")
 
-        for row in all_flights:
-            # row["departure_time"] is a datetime from mysql connector
-            if row["departure_time"] >= now:
+        for row in all_flights.rows:
+            # departure_time is a datetime from mysql connector
+            if row[departure] >= now:
                 upcoming.append(row)
             else:
                 past.append(row)
 
-        return {
+        return FastJSONResponse({
             "staff_email": staff_email,
-            "airline": staff_airline,
+            "airline": airline,
             "customer_email": customer_email,
-            "upcoming": upcoming,
-            "past": past,
-        }
+            "upcoming": Rows(all_flights.columns, upcoming),
+            "past": Rows(all_flights.columns, past),
+        })
 
     finally:
-        cursor.close()
-        conn.close()
\ No newline at end of file
+        cursor.close()
\ No newline at end of file
@@ -1,10 +1,27 @@
-from fastapi import APIRouter, HTTPException
-from backend.db import get_connection
+from fastapi import APIRouter, Depends, HTTPException
+from backend import async_db, config
+from backend.async_db import get_async_db
+from backend.db import get_db
+from backend.flight_keys import flight_keys
+from backend.purchase import (
+    FLIGHT_EXISTS_SQL, MAX_AVAILABILITY_FLIGHTS, MAX_BATCH_ITEMS,
+    purchase_batch, purchase_seat, purchase_seat_async,
+    seat_availability, seat_availability_async
+)
 
 router = APIRouter(prefix="/tickets", tags=["Tickets"])
 
-@router.post("/purchase")
-def purchase_ticket(data: dict):
+# SQL shared by the sync and async handlers
+SOLD_SQL = """
+    SELECT capacity, capacity - seats_remaining AS sold
+    FROM seat_inventory
+    WHERE airline_name=%s
+      AND flight_num=%s
+      AND seat_class=%s
+"""
+
+
+def _purchase_fields(data):
     customer_email = data.get("customer_email")
     agent_email = data.get("agent_email")
     airline_name = data.get("airline_name")
@@ -14,163 +31,119 @@ def purchase_ticket(data: dict):
     if not all([customer_email, airline_name, flight_num, seat_class]):
         raise HTTPException(status_code=400, detail="Missing purchase fields.")
 
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
+    return customer_email, agent_email, airline_name, flight_num, seat_class
 
-    try:
-        # 1️⃣ Load flight + airplane
-        cursor.execute(
-            """
-            SELECT airplane_id, price
-            FROM flight
-            WHERE airline_name=%s AND flight_num=%s
-            """,
-            (airline_name, flight_num)
-        )
-        flight = cursor.fetchone()
-
-        if not flight:
-            raise HTTPException(404, detail="Flight not found.")
-
-        airplane_id = flight["airplane_id"]
-        base_price = float(flight["price"])
-
-        # 2️⃣ Seat class validation
-        cursor.execute(
-            """
-            SELECT capacity, price_factor
-            FROM seat_class
-            WHERE airline_name=%s AND airplane_id=%s AND class=%s
-            """,
-            (airline_name, airplane_id, seat_class)
-        )
-        sc = cursor.fetchone()
-
-        if not sc:
-            raise HTTPException(400, detail="Seat class not available for this airplane.")
-
-        capacity = sc["capacity"]
-        price_factor = float(sc["price_factor"])
-
-        # 3️⃣ Seats sold
-        cursor.execute(
-            """
-            SELECT COUNT(*) AS sold
-            FROM ticket
-            WHERE airline_name=%s AND flight_num=%s AND seat_class=%s
-            """,
-            (airline_name, flight_num, seat_class)
-        )
-        sold = cursor.fetchone()["sold"]
 
-        if sold >= capacity:
-            raise HTTPException(400, detail=f"{seat_class} is sold out.")
+def purchase_ticket(data: dict, conn=Depends(get_db)):
+    return purchase_seat(conn, *_purchase_fields(data))
 
-        # 4️⃣ Final price
-        final_price = round(base_price * price_factor, 2)
 
-        # 5️⃣ Create ticket (NOW includes price)
-        cursor.execute(
-            """
-            INSERT INTO ticket (seat_class, airplane_id, flight_num, airline_name, price_charged)
-            VALUES (%s, %s, %s, %s, %s)
-            """,
-            (seat_class, airplane_id, flight_num, airline_name, final_price)
-        )
+async def purchase_ticket_async(data: dict, conn=Depends(get_async_db)):
+    return await purchase_seat_async(conn, *_purchase_fields(data))
+
+
+router.post("/purchase")(purchase_ticket_async if config.DB_ASYNC else purchase_ticket)
 
-        ticket_id = cursor.lastrowid
 
-        # 6️⃣ Purchase record
-        cursor.execute(
-            """
-            INSERT INTO purchase (ticket_id, customer_email, agent_email, purchase_date)
-            VALUES (%s, %s, %s, CURDATE())
-            """,
-            (ticket_id, customer_email, agent_email)
+# Group booking: many passengers, one or more flights, one transaction
+@router.post("/purchase_batch")
+def purchase_ticket_batch(data: dict, conn=Depends(get_db)):
+    items = data.get("items")
+    agent_email = data.get("agent_email")
+    all_or_nothing = bool(data.get("all_or_nothing", False))
+
+    if not isinstance(items, list) or len(items) == 0:
+        raise HTTPException(status_code=400, detail="At least one item is required.")
+    if len(items) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_ITEMS} items per batch.")
+
+    results = purchase_batch(conn, items, agent_email, all_or_nothing)
+    purchased = sum(1 for r in results if r["success"])
+
+    return {
+        "message": f"{purchased} of {len(items)} tickets purchased.",
+        "purchased": purchased,
+        "failed": len(items) - purchased,
+        "results": results
+    }
+
+
+def _sold_error(flight_exists):
+    if not flight_exists:
+        return HTTPException(
+            status_code=404,
+            detail="Flight not found for this airline."
         )
+    return HTTPException(
+        status_code=400,
+        detail="Seat class not available for this airplane."
+    )
 
-        conn.commit()
-        return {
-            "message": "Ticket purchased successfully.",
-            "ticket_id": ticket_id,
-            "price_charged": final_price
-        }
 
-    except Exception as e:
-        conn.rollback()
-        raise HTTPException(400, detail=str(e))
+def _sold_payload(airline, flight_num, seat_class, sold, capacity):
+    return {
+        "airline": airline,
+        "flight_num": flight_num,
+        "seat_class": seat_class,
+        "sold": sold,
+        "capacity": capacity,
+        "remaining": max(capacity - sold, 0)
+    }
 
-    finally:
-        cursor.close()
-        conn.close()
 
-@router.get("/sold/{airline}/{flight_num}/{seat_class}")
-def get_tickets_sold(airline: str, flight_num: str, seat_class: str):
-    conn = get_connection()
+def get_tickets_sold(airline: str, flight_num: str, seat_class: str, conn=Depends(get_db)):
     cursor = conn.cursor(dictionary=True)
 
     try:
-        # 1️⃣ Validate flight exists
-        cursor.execute(
-            """
-            SELECT airplane_id 
-            FROM flight
-            WHERE airline_name=%s AND flight_num=%s
-            """,
-            (airline, flight_num)
-        )
-        flight = cursor.fetchone()
-
-        if not flight:
-            raise HTTPException(
-                status_code=404,
-                detail="Flight not found for this airline."
-            )
-
-        airplane_id = flight["airplane_id"]
-
-        # 2️⃣ Validate seat class exists for this airplane
-        cursor.execute(
-            """
-            SELECT capacity
-            FROM seat_class
-            WHERE airline_name=%s AND airplane_id=%s AND class=%s
-            """,
-            (airline, airplane_id, seat_class)
-        )
-        sc = cursor.fetchone()
-
-        if not sc:
-            raise HTTPException(
-                status_code=400,
-                detail="Seat class not available for this airplane."
-            )
-
-        capacity = sc["capacity"]
-
-        # 3️⃣ Count tickets sold for this class
-        cursor.execute(
-            """
-            SELECT COUNT(*) AS sold
-            FROM ticket
-            WHERE airline_name=%s
-              AND flight_num=%s
-              AND seat_class=%s
-            """,
-            (airline, flight_num, seat_class)
-        )
-        sold = cursor.fetchone()["sold"]
-
-        # 4️⃣ Return a clean payload
-        return {
-            "airline": airline,
-            "flight_num": flight_num,
-            "seat_class": seat_class,
-            "sold": sold,
-            "capacity": capacity,
-            "remaining": max(capacity - sold, 0)
-        }
+        # 1️⃣ Capacity and sold count from the inventory counter
+        cursor.execute(SOLD_SQL, (airline, flight_num, seat_class))
+        inventory = cursor.fetchone()
+
+        # 2️⃣ Explain a missing counter: unknown flight or seat class
+        if not inventory:
+            cursor.execute(FLIGHT_EXISTS_SQL, (airline, flight_num))
+            raise _sold_error(cursor.fetchone())
+
+        # 3️⃣ Return a clean payload
+        return _sold_payload(airline, flight_num, seat_class, int(inventory["sold"]), inventory["capacity"])
 
     finally:
         cursor.close()
-        conn.close()
+
+
+async def get_tickets_sold_async(airline: str, flight_num: str, seat_class: str, conn=Depends(get_async_db)):
+    inventory = await async_db.fetchone(conn, SOLD_SQL, (airline, flight_num, seat_class))
+
+    if not inventory:
+        raise _sold_error(await async_db.fetchone(conn, FLIGHT_EXISTS_SQL, (airline, flight_num)))
+
+    return _sold_payload(airline, flight_num, seat_class, int(inventory["sold"]), inventory["capacity"])
+
+
+router.get("/sold/{airline}/{flight_num}/{seat_class}")(
+    get_tickets_sold_async if config.DB_ASYNC else get_tickets_sold
+)
+
+
+# Sold / capacity / remaining / price of every seat class for many flights,
+# in one query (instead of one /sold call per flight and class)
+def _availability_payload(keys, classes):
+    return {
+        "flights": [
+            {"airline_name": airline, "flight_num": flight_num, "seat_classes": classes[(airline, flight_num)]}
+            for airline, flight_num in keys
+        ]
+    }
+
+
+def get_availability(data: dict, conn=Depends(get_db)):
+    keys = flight_keys(data, MAX_AVAILABILITY_FLIGHTS)
+    return _availability_payload(keys, seat_availability(conn, keys))
+
+
+async def get_availability_async(data: dict, conn=Depends(get_async_db)):
+    keys = flight_keys(data, MAX_AVAILABILITY_FLIGHTS)
+    return _availability_payload(keys, await seat_availability_async(conn, keys))
+
+
+router.post("/availability")(get_availability_async if config.DB_ASYNC else get_availability)
@@ -0,0 +1,318 @@
+"""
+Bulk flight schedule import (POST /staff/import_schedule/{email}).
+
+A schedule is CSV (header row) or NDJSON (one object per line) with the
+same fields create_flight takes:
+
+    flight_num, airplane_id, from_airport, to_airport,
+    departure_time, arrival_time            required
+    price, status                           optional (100, 'upcoming')
+    repeat, count | until                   optional recurrence
+
+A row with repeat = daily | weekly expands into one flight per
+occurrence, `count` times or up to the `until` date (inclusive). Each
+occurrence gets the departure date appended to its number:
+
+    AA100,P-1,JFK,LAX,2025-06-01 08:00,2025-06-01 11:30,,,daily,90
+        -> AA100-250601, AA100-250602, ... AA100-250829
+
+Every row is checked against the airline's airplanes, seat classes and
+flight numbers and the airport list, loaded once up front, so
+validation costs no queries per row. Like the database's collation, the
+checks ignore case: "aa100" clashes with an existing "AA100", and
+"p-1" / "jfk" resolve to the stored "P-1" / "JFK". Valid flights are
+then inserted in chunks of IMPORT_CHUNK, one transaction each: multi-row
+INSERTs for flight and seat_inventory plus one flight_search refresh. A
+chunk that fails is rolled back and its rows reported; the others still
+commit.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime, timedelta
+
+from backend import events, flight_search, refdata
+
+IMPORT_CHUNK = 1000
+MAX_IMPORT_FLIGHTS = 50000   # after recurrence expansion
+MAX_REPORTED_ERRORS = 1000
+
+DEFAULT_PRICE = 100
+STATUSES = ("upcoming", "in-progress", "delayed")
+REPEAT_DAYS = {"daily": 1, "weekly": 7}
+FLIGHT_NUM_LENGTH = 15
+
+INSERT_FLIGHT_SQL = """
+    INSERT INTO flight
+        (flight_num, airline_name, airplane_id,
+         departure_airport, departure_time,
+         arrival_airport, arrival_time, status, price)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+INSERT_INVENTORY_SQL = """
+    INSERT INTO seat_inventory (airline_name, flight_num, seat_class, capacity, seats_remaining)
+    VALUES (%s, %s, %s, %s, %s)
+"""
+
+
+class ScheduleError(ValueError):
+    """A schedule that cannot be read at all (bad format, too large)."""
+
+
+# ------------------------------------------
+# Parsing
+# ------------------------------------------
+
+def parse(body, fmt):
+    """[(line number, row dict or error message), ...]"""
+    try:
+        text = body.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise ScheduleError("Schedule must be UTF-8 text.")
+
+    if fmt == "csv":
+        reader = csv.DictReader(io.StringIO(text))
+        if not reader.fieldnames:
+            raise ScheduleError("CSV schedule needs a header row.")
+        rows = []
+        for row in reader:
+            # Fields beyond the header land in a list under the key None
+            if None in row:
+                rows.append((reader.line_num, "Row has more fields than the header."))
+            elif any((v or "").strip() for v in row.values()):
+                rows.append((reader.line_num, row))
+        return rows
+
+    rows = []
+    for line_num, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            rows.append((line_num, "Invalid JSON."))
+            continue
+        if not isinstance(row, dict):
+            row = "Each line must be a JSON object."
+        rows.append((line_num, row))
+    return rows
+
+
+def _text(row, key):
+    value = row.get(key)
+    return "" if value is None else str(value).strip()
+
+
+def expand(row):
+    """One flight tuple per occurrence of a row; ValueError with a readable message if invalid."""
+    flight_num = _text(row, "flight_num")
+    fields = {key: _text(row, key) for key in ("airplane_id", "from_airport", "to_airport")}
+    for key, label in (("airplane_id", "Airplane ID"), ("from_airport", "Departure airport"),
+                       ("to_airport", "Arrival airport")):
+        if not fields[key]:
+            raise ValueError(f"{label} is required.")
+    if not flight_num:
+        raise ValueError("Flight number is required.")
+
+    try:
+        depart = datetime.fromisoformat(_text(row, "departure_time"))
+        arrive = datetime.fromisoformat(_text(row, "arrival_time"))
+    except ValueError:
+        raise ValueError("Invalid date format. Use ISO 'YYYY-MM-DD HH:MM'.")
+    if arrive <= depart:
+        raise ValueError("Arrival time must be later than departure time.")
+
+    try:
+        price = float(_text(row, "price") or DEFAULT_PRICE)
+    except ValueError:
+        raise ValueError("Price must be a number.")
+    if price <= 0:
+        raise ValueError("Price must be positive.")
+
+    status = _text(row, "status") or "upcoming"
+    if status not in STATUSES:
+        raise ValueError(f"Status must be one of {', '.join(STATUSES)}.")
+
+    # Recurrence
+    repeat = _text(row, "repeat").lower()
+    if not repeat:
+        departures = [depart]
+    else:
+        if repeat not in REPEAT_DAYS:
+            raise ValueError("Repeat must be 'daily' or 'weekly'.")
+        step = timedelta(days=REPEAT_DAYS[repeat])
+        try:
+            if _text(row, "count"):
+                count = int(_text(row, "count"))
+            elif _text(row, "until"):
+                until = date.fromisoformat(_text(row, "until")[:10])
+                count = (until - depart.date()) // step + 1
+            else:
+                raise ValueError
+        except ValueError:
+            raise ValueError("Repeat needs a whole-number count or an ISO until date.")
+        if count < 1 or count > MAX_IMPORT_FLIGHTS:
+            raise ValueError(f"Repeat must produce between 1 and {MAX_IMPORT_FLIGHTS} flights.")
+        departures = [depart + step * i for i in range(count)]
+
+    duration = arrive - depart
+    flights = []
+    for departure in departures:
+        number = f"{flight_num}-{departure:%y%m%d}" if repeat else flight_num
+        if len(number) > FLIGHT_NUM_LENGTH:
+            raise ValueError(f"Flight number '{number}' is longer than {FLIGHT_NUM_LENGTH} characters.")
+        flights.append((
+            number, fields["airplane_id"], fields["from_airport"], departure,
+            fields["to_airport"], departure + duration, status, price
+        ))
+    return flights
+
+
+# ------------------------------------------
+# Validation against preloaded reference data
+# ------------------------------------------
+
+def load_context(cursor, airline_name):
+    """
+    Airplanes of an airline as {casefolded id: (airplane_id, [(class, capacity), ...])}
+    and its existing flight numbers, casefolded.
+    """
+    cursor.execute(
+        """
+        SELECT A.airplane_id, S.class, S.capacity
+        FROM airplane A
+        LEFT JOIN seat_class S ON S.airline_name = A.airline_name AND S.airplane_id = A.airplane_id
+        WHERE A.airline_name = %s
+        """,
+        (airline_name,)
+    )
+    planes = {}
+    for airplane_id, seat_class, capacity in cursor.fetchall():
+        _, classes = planes.setdefault(airplane_id.casefold(), (airplane_id, []))
+        if seat_class is not None:
+            classes.append((seat_class, capacity))
+
+    cursor.execute("SELECT flight_num FROM flight WHERE airline_name = %s", (airline_name,))
+    existing = {flight_num.casefold() for (flight_num,) in cursor.fetchall()}
+
+    return planes, existing
+
+
+def _resolve(flight, planes, airports, existing, seen, airline_name):
+    """(error, None) or (None, flight with the stored airplane id and airport codes)."""
+    flight_num, airplane_id, from_airport, departure, to_airport = flight[:5]
+
+    plane = planes.get(airplane_id.casefold())
+    if plane is None:
+        return "The selected airplane does not belong to this airline or does not exist.", None
+    if not plane[1]:
+        return "This airplane has no seat classes.", None
+    if from_airport.casefold() not in airports:
+        return f"Unknown airport '{from_airport}'.", None
+    if to_airport.casefold() not in airports:
+        return f"Unknown airport '{to_airport}'.", None
+    if from_airport.casefold() == to_airport.casefold():
+        return "Departure and arrival airports must differ.", None
+    if flight_num.casefold() in existing:
+        return f"Flight number '{flight_num}' already exists for {airline_name}.", None
+    if flight_num.casefold() in seen:
+        return f"Flight number '{flight_num}' appears earlier in this schedule.", None
+
+    return None, (
+        flight_num, plane[0], airports[from_airport.casefold()], departure,
+        airports[to_airport.casefold()], *flight[5:]
+    )
+
+
+# ------------------------------------------
+# Import
+# ------------------------------------------
+
+def _insert_chunk(conn, cursor, airline_name, chunk, planes):
+    cursor.executemany(INSERT_FLIGHT_SQL, [(f[0], airline_name, *f[1:]) for f in chunk])
+    cursor.executemany(
+        INSERT_INVENTORY_SQL,
+        [(airline_name, f[0], c, cap, cap) for f in chunk for c, cap in planes[f[1].casefold()][1]]
+    )
+    flight_search.refresh_many(cursor, airline_name, [f[0] for f in chunk])
+    conn.commit()
+
+
+def import_schedule(conn, airline_name, body, fmt, dry_run=False):
+    rows = parse(body, fmt)
+    airports = {a["name"].casefold(): a["name"] for a in refdata.airports(conn)}
+    cursor = conn.cursor()
+
+    errors = []
+    valid = []     # (line number, flight tuple)
+    total = 0
+
+    def fail(line, flight_num, detail):
+        errors.append({"row": line, "flight_num": flight_num, "error": detail})
+
+    try:
+        planes, existing = load_context(cursor, airline_name)
+        seen = set()
+
+        # 1️⃣ Expand and validate every row in memory
+        for line, row in rows:
+            if isinstance(row, str):
+                fail(line, None, row)
+                continue
+
+            row_airline = _text(row, "airline_name")
+            if row_airline and row_airline.casefold() != airline_name.casefold():
+                fail(line, _text(row, "flight_num") or None, f"Staff can only import flights for {airline_name}.")
+                continue
+
+            try:
+                flights = expand(row)
+            except ValueError as e:
+                fail(line, _text(row, "flight_num") or None, str(e))
+                continue
+
+            total += len(flights)
+            if total > MAX_IMPORT_FLIGHTS:
+                raise ScheduleError(f"Schedule expands to more than {MAX_IMPORT_FLIGHTS} flights; split it up.")
+
+            for flight in flights:
+                problem, resolved = _resolve(flight, planes, airports, existing, seen, airline_name)
+                if problem:
+                    fail(line, flight[0], problem)
+                else:
+                    seen.add(flight[0].casefold())
+                    valid.append((line, resolved))
+
+        # 2️⃣ Chunked inserts, one transaction per chunk
+        imported = 0
+        if not dry_run:
+            for start in range(0, len(valid), IMPORT_CHUNK):
+                chunk = valid[start:start + IMPORT_CHUNK]
+                flights = [f for _, f in chunk]
+                try:
+                    _insert_chunk(conn, cursor, airline_name, flights, planes)
+                except Exception as e:
+                    conn.rollback()
+                    for line, flight in chunk:
+                        fail(line, flight[0], f"Not imported, chunk rolled back: {e}")
+                    continue
+
+                imported += len(flights)
+                events.publish("flights_created", airline_name=airline_name, flight_nums=[f[0] for f in flights])
+
+    finally:
+        cursor.close()
+
+    errors.sort(key=lambda e: e["row"])
+    return {
+        "success": not errors,
+        "dry_run": dry_run,
+        "rows": len(rows),
+        "flights": total,
+        "valid": len(valid),
+        "imported": imported,
+        "failed": len(errors),
+        "errors": errors[:MAX_REPORTED_ERRORS],
+        "errors_truncated": len(errors) > MAX_REPORTED_ERRORS,
+    }
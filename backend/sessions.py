@@ -0,0 +1,86 @@
+import base64
+import hashlib
+import hmac
+import json
+import time
+
+from fastapi import Request
+
+from backend import config
+
+# ------------------------------------------
+# Signed session tokens.
+#
+# /auth/login returns a token carrying who the caller is and what they
+# may see (staff airline + permission, agent's authorized airlines), so
+# role-scoped endpoints can skip the airline_staff /
+# agent_airline_authorization lookup. Tokens are HMAC-SHA256 signed and
+# need no server-side storage:
+#
+#     base64url(json claims) . base64url(signature)
+#
+# A missing, expired or tampered token is simply ignored and the
+# endpoint falls back to looking the principal up in the database.
+# ------------------------------------------
+
+
+def _b64encode(raw):
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _sign(payload):
+    return hmac.new(config.SESSION_SECRET.encode(), payload.encode(), hashlib.sha256).digest()
+
+
+def issue_token(claims):
+    claims = {**claims, "exp": int(time.time() + config.SESSION_TTL)}
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    return f"{payload}.{_b64encode(_sign(payload))}"
+
+
+def verify_token(token):
+    """Claims of a valid, unexpired token, else None."""
+    try:
+        payload, signature = token.split(".")
+        if not hmac.compare_digest(_b64decode(signature), _sign(payload)):
+            return None
+
+        claims = json.loads(_b64decode(payload))
+        if claims["exp"] < time.time():
+            return None
+        return claims
+
+    except Exception:
+        return None
+
+
+async def get_session(request: Request):
+    """FastAPI dependency: claims from `Authorization: Bearer <token>`, or None."""
+    header = request.headers.get("authorization", "")
+    scheme, _, token = header.partition(" ")
+
+    if scheme.lower() != "bearer" or not token:
+        return None
+    return verify_token(token)
+
+
+def session_for(session, role, email):
+    """The session if it belongs to this role + email, else None."""
+    if session and session.get("role") == role and session.get("email") == email:
+        return session
+    return None
+
+
+def staff_airline(cursor, email, session):
+    """Airline of a staff member: from the token when it is theirs, else one query."""
+    staff = session_for(session, "staff", email)
+    if staff:
+        return staff["airline_name"]
+
+    cursor.execute("SELECT airline_name FROM airline_staff WHERE email=%s", (email,))
+    row = cursor.fetchone()
+    return row["airline_name"] if row else None
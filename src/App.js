@@ -1,4 +1,5 @@
 import React, { useState, useEffect } from "react";
+import axios from "axios";
 import "./App.css";
 
 import Flight from "./components/ui/Flights";
@@ -19,6 +20,17 @@ import StaffFlights from "./components/staff/StaffFlights";
 import StaffAnalytics from "./components/staff/StaffAnalytics";
 import Management from "./components/staff/Management";
 
+// Send the session token from /auth/login with every API call
+axios.interceptors.request.use((config) => {
+  const saved = localStorage.getItem("userInfo");
+  const token = saved ? JSON.parse(saved).token : null;
+
+  if (token) {
+    config.headers.Authorization = `Bearer ${token}`;
+  }
+  return config;
+});
+
 function App() {
   // SESSION STATE --------------------
   const [userInfo, setUserInfo] = useState(() => {
@@ -43,7 +43,7 @@ export default function Flight({ userInfo }) {
 
     try {
       const res = await axios.get("http://localhost:8080/flights/search", {
-        params: { from_loc: leaving, to_loc: going, date, role, email }
+        params: { from_loc: leaving, to_loc: going, date, role, email, availability: true }
       });
 
       setResults(res.data.results || []);
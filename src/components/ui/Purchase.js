@@ -50,31 +50,30 @@ export default function Purchase({ flight, userInfo, navigate, close }) {
     : "";
 
   // ============================================================
-  // LOAD SEAT CLASSES + SOLD COUNT + PRICE FACTOR
+  // LOAD SEAT CLASSES + SOLD COUNT + PRICE
+  // Search results carry them already (availability=true);
+  // otherwise one /tickets/availability call covers every class
   // ============================================================
   useEffect(() => {
     const loadSeatClasses = async () => {
       try {
-        const classRes = await axios.get(
-          `http://localhost:8080/staff/get_seat_classes/${flight.airline_name}/${flight.airplane_id}`
-        );
-
-        const classes = classRes.data.classes || [];
-
-        const classData = await Promise.all(
-          classes.map(async (sc) => {
-            const soldRes = await axios.get(
-              `http://localhost:8080/tickets/sold/${flight.airline_name}/${flight.flight_num}/${sc.class}`
-            );
-
-            return {
-              ...sc,
-              sold: soldRes.data.sold,
-              available: sc.capacity - soldRes.data.sold,
-              final_price: (flight.price * sc.price_factor).toFixed(2)
-            };
-          })
-        );
+        let classes = flight.seat_classes;
+
+        if (!classes) {
+          const res = await axios.post("http://localhost:8080/tickets/availability", {
+            flights: [{ airline_name: flight.airline_name, flight_num: flight.flight_num }]
+          });
+          classes = res.data.flights[0]?.seat_classes || [];
+        }
+
+        const classData = classes.map((sc) => ({
+          class: sc.seat_class,
+          capacity: sc.capacity,
+          price_factor: sc.price_factor,
+          sold: sc.sold,
+          available: sc.remaining,
+          final_price: sc.price.toFixed(2)
+        }));
 
         setSeatClasses(classData);
         setBasePrice(flight.price);